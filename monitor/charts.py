@@ -122,31 +122,45 @@ def top_stakers_chart(data: dict):
     return graph
 
 
-def nodes_geolocation_map(nodes_dict: dict, ip2loc: IP2Location):
+def nodes_geolocation_map(nodes_dict: dict, ip2loc: IP2Location, geolocations: dict = None):
+    """
+    `geolocations` optionally memoizes (longitude, latitude, country) per host across calls, so that only new
+    or changed hosts are looked up; hosts no longer present are dropped from it.
+    """
     longitudes = []
     latitudes = []
     staker_text = []
     status_colors = []
 
     # determine geo locations
+    memo = geolocations if geolocations is not None else dict()
+    hosts = set()
     for bucket in nodes_dict:
         nodes = nodes_dict[bucket]
         for node_info in nodes:
             rest_url = node_info['rest_url'][:-5]  # remove port number
+            hosts.add(rest_url)
             try:
-                # get_all is called even if more specific element is requested eg. get_longitude
-                geo_info = ip2loc.get_all(rest_url)
-                long = geo_info.longitude
-                lat = geo_info.latitude
-                country = geo_info.country_long
-
+                location = memo[rest_url]
+            except KeyError:
+                try:
+                    # get_all is called even if more specific element is requested eg. get_longitude
+                    geo_info = ip2loc.get_all(rest_url)
+                    location = (geo_info.longitude, geo_info.latitude, geo_info.country_long)
+                except OSError:
+                    # TODO: log something? nothing to see here
+                    location = None
+                memo[rest_url] = location
+
+            if location is not None:
+                long, lat, country = location
                 longitudes.append(long)
                 latitudes.append(lat)
                 staker_text.append(f"{node_info['staker_address']} ({country})")
                 status_colors.append(node_info['status']['color'])
-            except OSError:
-                # TODO: log something? nothing to see here
-                pass
+
+    for host in set(memo) - hosts:
+        memo.pop(host, None)
 
     fig = go.Figure(
         data=go.Scattergeo(
@@ -5,11 +5,15 @@ from nucypher.blockchain.eth.registry import InMemoryContractRegistry, LocalCont
 from nucypher.crypto.keypairs import HostingKeypair
 from nucypher.network.server import TLSHostingPower
 
+from monitor.registry import ContractRegistryCache
 
-def _get_registry(registry_filepath, network):
+
+def _get_registry(registry_filepath, network, registry_cache: ContractRegistryCache = None):
 
     if registry_filepath:
-        registry = LocalContractRegistry.from_latest_publication(network=network)
+        registry = LocalContractRegistry(filepath=registry_filepath)
+    elif registry_cache:
+        registry = registry_cache.registry
     else:
         registry = InMemoryContractRegistry.from_latest_publication(network=network)
 
@@ -15,9 +15,12 @@ from nucypher.characters.lawful import Ursula
 from monitor.cli._utils import _get_registry, _get_deployer
 from monitor.crawler import Crawler
 from monitor.dashboard import Dashboard
+from monitor.registry import ContractRegistryCache
+from monitor.storage import InfluxDBStorage
 
 CRAWLER = "Crawler"
 DASHBOARD = "Dashboard"
+MIGRATION = "Migration"
 
 MONITOR_BANNER = r"""
  _____         _ _           
@@ -45,6 +48,11 @@ def monitor():
 @click.option('--provider', 'provider_uri', help="Blockchain provider's URI", type=click.STRING, required=True)
 @click.option('--influx-host', help="InfluxDB host URI", type=click.STRING, default='0.0.0.0')
 @click.option('--influx-port', help="InfluxDB network port", type=NETWORK_PORT, default=8086)
+@click.option('--influx-udp', help="Write to InfluxDB over UDP (fire-and-forget)", is_flag=True, default=False)
+@click.option('--influx-udp-port', help="InfluxDB UDP listener port", type=NETWORK_PORT, default=8089)
+@click.option('--timeseries-storage-filepath', help="Use an embedded SQLite time series database at this filepath instead of InfluxDB", type=click.STRING)
+@click.option('--durable-node-storage', help="Keep known nodes, fleet states and teacher across restarts", is_flag=True, default=False)
+@click.option('--learning-fan-out', help="Number of teachers to learn from concurrently per learning round", type=click.IntRange(min=1), default=Crawler.DEFAULT_LEARNING_FAN_OUT)
 @click.option('--http-port', help="Crawler HTTP port for JSON endpoint", type=NETWORK_PORT, default=Crawler.DEFAULT_CRAWLER_HTTP_PORT)
 @click.option('--dry-run', '-x', help="Execute normally without actually starting the crawler", is_flag=True)
 @click.option('--eager', help="Start learning and scraping before starting up other services", is_flag=True, default=False)
@@ -58,6 +66,11 @@ def crawl(general_config,
           provider_uri,
           influx_host,
           influx_port,
+          influx_udp,
+          influx_udp_port,
+          timeseries_storage_filepath,
+          durable_node_storage,
+          learning_fan_out,
           http_port,
           dry_run,
           eager,
@@ -67,6 +80,10 @@ def crawl(general_config,
     Gather NuCypher network information.
     """
 
+    if influx_udp and timeseries_storage_filepath:
+        raise click.BadOptionUsage(option_name='--influx-udp',
+                                   message="--influx-udp is not applicable to embedded time series storage")
+
     # Banner
     emitter = general_config.emitter
     emitter.clear()
@@ -74,7 +91,8 @@ def crawl(general_config,
 
     # Setup
     BlockchainInterfaceFactory.initialize_interface(provider_uri=provider_uri, poa=poa)
-    registry = _get_registry(registry_filepath, network)
+    registry_cache = ContractRegistryCache(network=network) if not registry_filepath else None
+    registry = _get_registry(registry_filepath, network, registry_cache=registry_cache)
     middleware = RestMiddleware()
 
     # Teacher Ursula
@@ -90,18 +108,32 @@ def crawl(general_config,
                       network_middleware=middleware,
                       known_nodes=[sage_node] if teacher_uri else None,
                       registry=registry,
+                      registry_cache=registry_cache,
                       start_learning_now=eager,
                       learn_on_same_thread=learn_on_launch,
                       influx_host=influx_host,
-                      influx_port=influx_port)
+                      influx_port=influx_port,
+                      timeseries_storage_filepath=timeseries_storage_filepath,
+                      influx_udp_port=influx_udp_port if influx_udp else None,
+                      durable_node_storage=durable_node_storage,
+                      learning_fan_out=learning_fan_out)
 
     emitter.message(f"Network: {network.capitalize()}", color='blue')
-    emitter.message(f"InfluxDB: {influx_host}:{influx_port}", color='blue')
+    if timeseries_storage_filepath:
+        emitter.message(f"Time Series DB: {timeseries_storage_filepath}", color='blue')
+    else:
+        emitter.message(f"InfluxDB: {influx_host}:{influx_port}", color='blue')
+        if influx_udp:
+            emitter.message(f"InfluxDB UDP: {influx_host}:{influx_udp_port}", color='blue')
     emitter.message(f"Provider: {provider_uri}", color='blue')
     emitter.message(f"Refresh Rate: {crawler._refresh_rate}s", color='blue')
+    if learning_fan_out > 1:
+        emitter.message(f"Learning Fan-out: {learning_fan_out} teachers", color='blue')
     message = f"Running Nucypher Crawler JSON endpoint at http://localhost:{http_port}/stats"
     emitter.message(message, color='green', bold=True)
     if not dry_run:
+        if registry_cache:
+            registry_cache.start()
         crawler.start(eager=eager)
         reactor.run()
 
@@ -117,6 +149,8 @@ def crawl(general_config,
 @click.option('--network', help="Network Domain Name", type=click.Choice(choices=NetworksInventory.NETWORKS), required=True)
 @click.option('--influx-host', help="InfluxDB host URI", type=click.STRING)
 @click.option('--influx-port', help="InfluxDB network port", type=NETWORK_PORT, default=8086)
+@click.option('--timeseries-storage-filepath', help="Use an embedded SQLite time series database at this filepath instead of InfluxDB", type=click.STRING)
+@click.option('--historical-cache-filepath', help="SQLite filepath for caching completed days of historical data", type=click.STRING)
 @click.option('--crawler-host', help="Crawler's HTTP host address", type=click.STRING, default='localhost')
 @click.option('--crawler-port', help="Crawler's HTTP port serving JSON", type=NETWORK_PORT, default=Crawler.DEFAULT_CRAWLER_HTTP_PORT)
 @click.option('--dry-run', '-x', help="Execute normally without actually starting the dashboard", is_flag=True)
@@ -131,6 +165,8 @@ def dashboard(general_config,
               network,
               influx_host,
               influx_port,
+              timeseries_storage_filepath,
+              historical_cache_filepath,
               crawler_host,
               crawler_port,
               dry_run,
@@ -147,7 +183,8 @@ def dashboard(general_config,
 
     # Setup
     BlockchainInterfaceFactory.initialize_interface(provider_uri=provider_uri, poa=poa)
-    registry = _get_registry(registry_filepath, network)
+    registry_cache = ContractRegistryCache(network=network) if not registry_filepath else None
+    registry = _get_registry(registry_filepath, network, registry_cache=registry_cache)
 
     #
     # WSGI Service
@@ -163,11 +200,14 @@ def dashboard(general_config,
     Dashboard(flask_server=rest_app,
               route_url='/',
               registry=registry,
+              registry_cache=registry_cache,
               network=network,
               influx_host=influx_host,
               influx_port=influx_port,
               crawler_host=crawler_host,
-              crawler_port=crawler_port)
+              crawler_port=crawler_port,
+              timeseries_storage_filepath=timeseries_storage_filepath,
+              historical_cache_filepath=historical_cache_filepath)
 
     #
     # Server
@@ -182,11 +222,52 @@ def dashboard(general_config,
     # Pre-Launch Info
     emitter.message(f"Network: {network.capitalize()}", color='blue')
     emitter.message(f"Crawler: {crawler_host}:{crawler_port}", color='blue')
-    emitter.message(f"InfluxDB: {influx_host}:{influx_port}", color='blue')
+    if timeseries_storage_filepath:
+        emitter.message(f"Time Series DB: {timeseries_storage_filepath}", color='blue')
+    else:
+        emitter.message(f"InfluxDB: {influx_host}:{influx_port}", color='blue')
     emitter.message(f"Provider: {provider_uri}", color='blue')
     if not dry_run:
+        if registry_cache:
+            registry_cache.start()
         emitter.message(f"Running Monitor Dashboard - https://{host}:{http_port}", color='green', bold=True)
         try:
             deployer.run()  # <--- Blocking
         finally:
             click.secho("Shutting Down")
+
+
+@monitor.command('migrate-influx')
+@group_general_config
+@click.option('--influx-host', help="InfluxDB host URI", type=click.STRING, default='0.0.0.0')
+@click.option('--influx-port', help="InfluxDB network port", type=NETWORK_PORT, default=8086)
+@click.option('--chunk-size', help="Number of points migrated at a time", type=click.IntRange(min=1), default=InfluxDBStorage.DEFAULT_MIGRATION_CHUNK_SIZE)
+@click.option('--drop-legacy', help="Drop the schema v1 data once migrated", is_flag=True, default=False)
+def migrate_influx(general_config, influx_host, influx_port, chunk_size, drop_legacy):
+    """
+    Migrate InfluxDB data to the current schema.
+    """
+
+    # Banner
+    emitter = general_config.emitter
+    emitter.clear()
+    emitter.banner(MONITOR_BANNER.format(MIGRATION))
+
+    emitter.message(f"InfluxDB: {influx_host}:{influx_port}", color='blue')
+    storage = InfluxDBStorage(host=influx_host, port=influx_port)
+    try:
+        storage.initialize()
+
+        emitter.message(f"Migrating {Crawler.LEGACY_EVENT_MEASUREMENT} to {Crawler.EVENT_MEASUREMENT}...", color='blue')
+        num_events = 0
+        for num_migrated in storage.migrate_legacy_events(chunk_size=chunk_size):
+            num_events += num_migrated
+            emitter.message(f"... {num_events} events migrated")
+
+        if drop_legacy:
+            storage.drop_legacy_events()
+            emitter.message(f"Dropped {Crawler.LEGACY_EVENT_MEASUREMENT}", color='blue')
+    finally:
+        storage.close()
+
+    emitter.message(f"Migration complete - {num_events} events migrated", color='green', bold=True)
@@ -4,6 +4,7 @@ import dash_html_components as html
 import dash_table
 import nucypher
 from maya import MayaDT
+from monitor.metadata import ContractMetadata
 from monitor.utils import get_etherscan_url, EtherscanURLType
 from nucypher.blockchain.eth.token import NU
 from pendulum.parsing import ParserError
@@ -57,11 +58,11 @@ NOT_YET_CONNECTED_TO_NODE = "Not Yet Connected to Node"
 #     return html.Div([html.Div(f'v{nucypher.__version__}', id='version')], className="logo-widget")
 
 
-def make_contract_row(network: str, agent, balance: NU = None):
-    contract_name = agent.contract_name
-    contract_address = agent.contract_address
+def make_contract_row(network: str, contract: ContractMetadata, balance: NU = None):
+    contract_name = contract.name
+    contract_address = contract.address
     cells = [
-        html.A(f'{contract_name} {contract_address} ({agent.contract.version})',
+        html.A(f'{contract_name} {contract_address} ({contract.version})',
                id=f"{contract_name}-contract-address",
                href=get_etherscan_url(network, EtherscanURLType.ADDRESS, contract_address))
     ]
@@ -130,11 +131,22 @@ def generate_node_row(network: str, node_info: dict) -> dict:
 
 
 def get_last_seen(node_info):
+    last_seen = node_info['last_seen']
+
+    # node may have been reached by the prober since learning last contacted it
+    reachability = node_info.get('reachability')
+    if reachability and reachability['last_reachable']:
+        try:
+            if MayaDT.from_rfc3339(last_seen) < MayaDT.from_rfc3339(reachability['last_reachable']):
+                last_seen = reachability['last_reachable']
+        except ParserError:
+            last_seen = reachability['last_reachable']  # not yet contacted by learning
+
     try:
-        slang_last_seen = MayaDT.from_rfc3339(node_info['last_seen']).slang_time()
+        slang_last_seen = MayaDT.from_rfc3339(last_seen).slang_time()
     except ParserError:
         # Show whatever we have anyways
-        slang_last_seen = str(node_info['last_seen'])
+        slang_last_seen = str(last_seen)
 
     if slang_last_seen == NO_CONNECTION_TO_NODE:
         slang_last_seen = NOT_YET_CONNECTED_TO_NODE
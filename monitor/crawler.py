@@ -1,18 +1,26 @@
 import os
 import random
-import sqlite3
-from collections import defaultdict
-from typing import Tuple
+import threading
+import time
+from collections import defaultdict, namedtuple, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
 
 import click
 import maya
-import requests
 from constant_sorrow.constants import NOT_STAKING
+from cryptography import x509
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives.serialization import Encoding
 from flask import Flask, jsonify
 from hendrix.deploy.base import HendrixDeploy
-from influxdb import InfluxDBClient
 from maya import MayaDT
-from monitor.utils import collector, DelayedLoopingCall
+from monitor.learning import TeacherStatistics
+from monitor.prober import NodeProber
+from monitor.registry import ContractRegistryCache
+from monitor.utils import collector, DelayedLoopingCall, escape_field_string, escape_tag_value, SQLiteConnectionPool
+from monitor.writer import ChangeTracker, MeasurementWriter
 from nucypher.blockchain.economics import EconomicsFactory
 from nucypher.blockchain.eth.agents import (
     ContractAgency,
@@ -32,10 +40,13 @@ from nucypher.network.nodes import Learner
 from twisted.internet import reactor
 from twisted.logger import Logger
 
+NodeMetadataChanges = namedtuple('NodeMetadataChanges', ['version', 'changed', 'removed'])
+
 
 class SQLiteForgetfulNodeStorage(ForgetfulNodeStorage):
     """
-    SQLite forgetful storage of node metadata
+    SQLite forgetful storage of node metadata. Durable storage instead keeps the database, including the
+    serialized nodes and their certificates, across restarts so that known nodes can be loaded at startup.
     """
     _name = 'sqlite'
     DB_FILE_NAME = 'nodes.sqlite'
@@ -45,19 +56,157 @@ class SQLiteForgetfulNodeStorage(ForgetfulNodeStorage):
     NODE_DB_SCHEMA = [('staker_address', 'text primary key'), ('rest_url', 'text'), ('nickname', 'text'),
                       ('timestamp', 'text'), ('last_seen', 'text'), ('fleet_state_icon', 'text')]
 
-    def __init__(self, db_filepath: str = DEFAULT_DB_FILEPATH, *args, **kwargs):
+    # every written row gets a new change version, and removed nodes leave a tombstone, so that consumers
+    # can obtain only the nodes changed since the version they last obtained
+    NODE_DB_CHANGE_VERSION = ('change_version', 'integer')
+    NODE_DB_CHANGE_VERSION_INDEX = 'node_info_change_version'
+    NODE_TOMBSTONE_DB_NAME = 'node_info_tombstone'
+    NODE_TOMBSTONE_DB_SCHEMA = [('staker_address', 'text primary key'), NODE_DB_CHANGE_VERSION]
+
+    # serialized nodes, only kept by durable storage
+    NODE_METADATA_DB_NAME = 'node_metadata'
+    NODE_METADATA_DB_SCHEMA = [('staker_address', 'text primary key'), ('metadata', 'blob'), ('certificate', 'blob')]
+
+    # durable storage with a different schema version is re-created
+    DB_SCHEMA_VERSION = 1
+
+    def __init__(self, db_filepath: str = DEFAULT_DB_FILEPATH, durable: bool = False, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        self.log = Logger(self.__class__.__name__)
         self.db_filepath = db_filepath
+        self.durable = durable
+        self._db_connections = SQLiteConnectionPool(db_filepath=db_filepath)
+
+        # writes are buffered while batching, and written in a single transaction
+        self._pending_lock = threading.RLock()
+        self._batch_depth = 0
+        self._pending_nodes = dict()  # staker address -> node metadata
+
+        # in-memory index of written metadata, so that the crawler does not read back its own writes
+        self._node_index = dict()  # staker address -> node metadata
+        self._node_versions = dict()  # staker address -> change version
+        self._removed_versions = dict()  # staker address -> change version of tombstone
+        self._pending_versions = dict()  # staker address -> change version
+
+        # rendered metadata is reused for nodes whose timestamp and fleet state are unchanged
+        self._rendered_nodes = dict()  # staker address -> ((rendered timestamp, fleet state checksum), node metadata)
+        self._pending_metadata = dict()  # staker address -> (serialized node, certificate)
+        self._change_version = 0
+
         self.init_db_tables()
 
     def __del__(self):
-        if os.path.exists(self.db_filepath):
-            os.remove(self.db_filepath)
+        if not self.durable:
+            self._remove_db_files()
 
     def store_node_metadata(self, node, filepath: str = None):
         self.__write_node_metadata(node)
         return super().store_node_metadata(node=node, filepath=filepath)
 
+    def get_known_nodes_metadata(self) -> Dict:
+        """Returns the metadata of stored nodes by staker address; the metadata dicts must not be modified."""
+        with self._pending_lock:
+            return dict(self._node_index)
+
+    def get_known_nodes_metadata_changes(self, since_version: int = 0) -> NodeMetadataChanges:
+        """
+        Returns the metadata of nodes changed since the provided change version, and the addresses of nodes
+        removed since then, along with the latest change version to provide next time.
+        """
+        with self._pending_lock:
+            changed = {staker_address: self._node_index[staker_address]
+                       for staker_address, version in self._node_versions.items() if version > since_version}
+            removed = [staker_address for staker_address, version in self._removed_versions.items()
+                       if version > since_version]
+            version = max([since_version, *self._node_versions.values(), *self._removed_versions.values()])
+        return NodeMetadataChanges(version=version, changed=changed, removed=removed)
+
+    def load_nodes(self) -> List:
+        """
+        Returns the nodes kept by durable storage eg. to seed a learner at startup; nodes are matured when
+        remembered.
+        """
+        if not self.durable:
+            return []
+        db_conn = self._db_connections.get()
+        rows = db_conn.execute(f"SELECT metadata, certificate FROM {self.NODE_METADATA_DB_NAME}").fetchall()
+        nodes = list()
+        for metadata, certificate in rows:
+            try:
+                nodes.append(self._deserialize_node(metadata, certificate))
+            except Exception as e:
+                self.log.warn(f"Unable to load stored node: {e}")
+        return nodes
+
+    def _serialize_node(self, node) -> Tuple[bytes, bytes]:
+        return bytes(node), node.certificate.public_bytes(Encoding.PEM)
+
+    def _deserialize_node(self, metadata: bytes, certificate: bytes):
+        # certificate is made available for verification of the node
+        self.store_node_certificate(certificate=x509.load_pem_x509_certificate(certificate, default_backend()))
+        # nodes are strangers, which use the registry of their learner rather than obtaining one
+        return self.character_class.from_bytes(metadata, fail_fast=True)
+
+    @contextmanager
+    def batch(self):
+        """
+        Buffers metadata stored within the context (eg. during a learning round), and writes it in a single
+        transaction on exit instead of a transaction per write.
+        """
+        with self._pending_lock:
+            self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self._pending_lock:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    self.flush()
+
+    def flush(self) -> None:
+        """Writes buffered metadata in a single transaction."""
+        with self._pending_lock:
+            with self._db_connections.get() as db_conn:
+                self._write_pending(db_conn)
+            self._clear_pending()
+
+    def _flush_unless_batching(self) -> None:
+        with self._pending_lock:
+            if self._batch_depth == 0:
+                self.flush()
+
+    def _next_change_version(self) -> int:
+        # seeded from existing tables (see _load_index), and from the clock so that versions keep increasing
+        # when the tables are re-created (eg. on restart)
+        self._change_version = max(self._change_version + 1, int(time.time() * 1_000_000))
+        return self._change_version
+
+    def _write_pending(self, db_conn) -> None:
+        # unchanged nodes keep their change version
+        changed_nodes = [node_metadata for staker_address, node_metadata in self._pending_nodes.items()
+                         if self._node_index.get(staker_address) != node_metadata]
+        self._pending_versions = {node_metadata['staker_address']: self._next_change_version()
+                                  for node_metadata in changed_nodes}
+        if changed_nodes:
+            db_conn.executemany(f'REPLACE INTO {self.NODE_DB_NAME} VALUES(?,?,?,?,?,?,?)',
+                                [(*node_metadata.values(), self._pending_versions[node_metadata['staker_address']])
+                                 for node_metadata in changed_nodes])
+            db_conn.executemany(f'DELETE FROM {self.NODE_TOMBSTONE_DB_NAME} WHERE staker_address=?',
+                                [(node_metadata['staker_address'], ) for node_metadata in changed_nodes])
+        if self._pending_metadata:
+            db_conn.executemany(f'REPLACE INTO {self.NODE_METADATA_DB_NAME} VALUES(?,?,?)',
+                                [(staker_address, *serialized)
+                                 for staker_address, serialized in self._pending_metadata.items()])
+
+    def _clear_pending(self) -> None:
+        self._node_index.update(self._pending_nodes)
+        self._node_versions.update(self._pending_versions)
+        for staker_address in self._pending_versions:
+            self._removed_versions.pop(staker_address, None)
+        self._pending_nodes.clear()
+        self._pending_versions.clear()
+        self._pending_metadata.clear()
+
     @validate_checksum_address
     def remove(self,
                checksum_address: str,
@@ -65,45 +214,157 @@ class SQLiteForgetfulNodeStorage(ForgetfulNodeStorage):
                certificate: bool = True
                ) -> Tuple[bool, str]:
 
+        # only what is held in memory is removed by the base storage eg. nodes can be stored without a certificate
+        result = super().remove(checksum_address=checksum_address,
+                                metadata=metadata is True and self._is_stored(checksum_address),
+                                certificate=certificate is True and self._is_stored(checksum_address,
+                                                                                    certificate_only=True))
         if metadata is True:
-            with sqlite3.connect(self.db_filepath) as db_conn:
-                db_conn.execute(f"DELETE FROM {self.NODE_DB_NAME} WHERE staker_address='{checksum_address}'")
-
-        return super().remove(checksum_address=checksum_address, metadata=metadata, certificate=certificate)
+            with self._pending_lock:
+                self._pending_nodes.pop(checksum_address, None)
+                self._pending_metadata.pop(checksum_address, None)
+                self._rendered_nodes.pop(checksum_address, None)
+                with self._db_connections.get() as db_conn:
+                    if self.durable:
+                        db_conn.execute(f"DELETE FROM {self.NODE_METADATA_DB_NAME} WHERE staker_address=?",
+                                        (checksum_address, ))
+                    deleted = db_conn.execute(f"DELETE FROM {self.NODE_DB_NAME} WHERE staker_address=?",
+                                              (checksum_address, )).rowcount
+                    if deleted:
+                        version = self._next_change_version()
+                        db_conn.execute(f"REPLACE INTO {self.NODE_TOMBSTONE_DB_NAME} VALUES(?,?)",
+                                        (checksum_address, version))
+                if deleted:
+                    self._removed_versions[checksum_address] = version
+                self._node_index.pop(checksum_address, None)
+                self._node_versions.pop(checksum_address, None)
+
+        return result
+
+    def _is_stored(self, checksum_address: str, certificate_only: bool = False) -> bool:
+        try:
+            self.get(federated_only=False, checksum_address=checksum_address, certificate_only=certificate_only)
+        except self.UnknownNode:
+            return False
+        return True
 
     def clear(self, metadata: bool = True, certificates: bool = True) -> None:
         if metadata is True:
-            with sqlite3.connect(self.db_filepath) as db_conn:
-                db_conn.execute(f"DELETE FROM {self.NODE_DB_NAME}")
+            with self._pending_lock:
+                self._pending_nodes.clear()
+                self._pending_metadata.clear()
+                self._rendered_nodes.clear()
+                version = self._next_change_version()
+                with self._db_connections.get() as db_conn:
+                    if self.durable:
+                        db_conn.execute(f"DELETE FROM {self.NODE_METADATA_DB_NAME}")
+                    db_conn.execute(f"REPLACE INTO {self.NODE_TOMBSTONE_DB_NAME} "
+                                    f"SELECT staker_address, ? FROM {self.NODE_DB_NAME}", (version, ))
+                    db_conn.execute(f"DELETE FROM {self.NODE_DB_NAME}")
+                self._removed_versions.update((staker_address, version) for staker_address in self._node_index)
+                self._node_index.clear()
+                self._node_versions.clear()
 
         super().clear(metadata=metadata, certificates=certificates)
 
     def initialize(self) -> bool:
-        if os.path.exists(self.db_filepath):
-            os.remove(self.db_filepath)
+        if not self.durable:
+            self._remove_db_files()
         self.init_db_tables()
         return super().initialize()
 
+    def _reuse_db_tables(self) -> bool:
+        """Durable storage keeps existing tables, provided that they have the current schema."""
+        if not self.durable:
+            return False
+        db_conn = self._db_connections.get()
+        schema_version, = db_conn.execute('PRAGMA user_version').fetchone()
+        return schema_version == self.DB_SCHEMA_VERSION
+
+    def _remove_db_files(self):
+        if os.path.exists(self.db_filepath):
+            self._db_connections.close()
+            for suffix in ('', '-wal', '-shm'):
+                if os.path.exists(self.db_filepath + suffix):
+                    os.remove(self.db_filepath + suffix)
+
     def init_db_tables(self):
-        with sqlite3.connect(self.db_filepath) as db_conn:
+        with self._pending_lock:
+            self._node_index.clear()
+            self._node_versions.clear()
+            self._removed_versions.clear()
+            self._rendered_nodes.clear()
+            if self._reuse_db_tables():
+                self._load_index(self._db_connections.get())
+                return
+
+        with self._db_connections.get() as db_conn:
             # ensure tables are empty
-            db_conn.execute(f"DROP TABLE IF EXISTS {self.NODE_DB_NAME}")
+            for table in [self.NODE_DB_NAME, self.NODE_TOMBSTONE_DB_NAME, self.NODE_METADATA_DB_NAME]:
+                db_conn.execute(f"DROP TABLE IF EXISTS {table}")
 
             # create fresh new node table (same column names as FleetStateTracker.abridged_nodes_details)
-            node_db_schema = ", ".join(f"{schema[0]} {schema[1]}" for schema in self.NODE_DB_SCHEMA)
+            node_db_schema = ", ".join(f"{schema[0]} {schema[1]}"
+                                       for schema in [*self.NODE_DB_SCHEMA, self.NODE_DB_CHANGE_VERSION])
             db_conn.execute(f"CREATE TABLE {self.NODE_DB_NAME} ({node_db_schema})")
+            db_conn.execute(f"CREATE INDEX {self.NODE_DB_CHANGE_VERSION_INDEX} "
+                            f"ON {self.NODE_DB_NAME} ({self.NODE_DB_CHANGE_VERSION[0]})")
+
+            # create new tombstone table for removed nodes
+            tombstone_schema = ", ".join(f"{schema[0]} {schema[1]}" for schema in self.NODE_TOMBSTONE_DB_SCHEMA)
+            db_conn.execute(f"CREATE TABLE {self.NODE_TOMBSTONE_DB_NAME} ({tombstone_schema})")
+
+            # create new serialized node table
+            if self.durable:
+                metadata_schema = ", ".join(f"{schema[0]} {schema[1]}" for schema in self.NODE_METADATA_DB_SCHEMA)
+                db_conn.execute(f"CREATE TABLE {self.NODE_METADATA_DB_NAME} ({metadata_schema})")
+
+            db_conn.execute(f"PRAGMA user_version={self.DB_SCHEMA_VERSION}")
+
+    def _load_index(self, db_conn) -> None:
+        """Populates the in-memory index from existing tables."""
+        columns = [schema[0] for schema in self.NODE_DB_SCHEMA]
+        version_column = self.NODE_DB_CHANGE_VERSION[0]
+        result = db_conn.execute(f"SELECT {', '.join(columns)}, {version_column} FROM {self.NODE_DB_NAME}")
+        for *row, version in result:
+            self._node_index[row[0]] = dict(zip(columns, row))
+            self._node_versions[row[0]] = version
+        for staker_address, version in db_conn.execute(f"SELECT staker_address, {version_column} "
+                                                       f"FROM {self.NODE_TOMBSTONE_DB_NAME}"):
+            self._removed_versions[staker_address] = version
+
+        # new versions follow those already written, even if the clock has since gone backwards
+        result = db_conn.execute(f"SELECT MAX({version_column}) FROM (SELECT {version_column} FROM {self.NODE_DB_NAME} "
+                                 f"UNION ALL SELECT {version_column} FROM {self.NODE_TOMBSTONE_DB_NAME})")
+        self._change_version = max(self._change_version, result.fetchone()[0] or 0)
+
+    @staticmethod
+    def _render_last_seen(node) -> str:
+        # as rendered by node details
+        try:
+            return node.last_seen.iso8601()
+        except AttributeError:
+            return str(node.last_seen)  # eg. not yet connected
 
     def __write_node_metadata(self, node):
         node.mature()
-        node_dict = node.node_details(node=node)
-        db_row = (node_dict['staker_address'],
-                  node_dict['rest_url'],
-                  node_dict['nickname'],
-                  node_dict['timestamp'],
-                  node_dict['last_seen'],
-                  node_dict['fleet_state_icon'])
-        with sqlite3.connect(self.db_filepath) as db_conn:
-            db_conn.execute(f'REPLACE INTO {self.NODE_DB_NAME} VALUES(?,?,?,?,?,?)', db_row)
+        # MayaDT equality is only to the second, so the timestamp is compared as rendered
+        render_key = (node.timestamp.iso8601(), node.fleet_state_checksum)
+        rendered = self._rendered_nodes.get(node.checksum_address)
+        if rendered is not None and rendered[0] == render_key:
+            # only last seen changes between contacts with an unchanged node, which is already serialized
+            node_metadata, serialized = dict(rendered[1], last_seen=self._render_last_seen(node)), None
+        else:
+            node_dict = node.node_details(node=node)
+            # ordered as the node table columns
+            node_metadata = {column: node_dict[column] for column, _ in self.NODE_DB_SCHEMA}
+            serialized = self._serialize_node(node) if self.durable else None
+            self._rendered_nodes[node.checksum_address] = (render_key, node_metadata)
+        with self._pending_lock:
+            self._pending_nodes[node_metadata['staker_address']] = node_metadata
+            if serialized is not None:
+                self._pending_metadata[node_metadata['staker_address']] = serialized
+            self._flush_unless_batching()
 
 
 class CrawlerNodeStorage(SQLiteForgetfulNodeStorage):
@@ -117,57 +378,149 @@ class CrawlerNodeStorage(SQLiteForgetfulNodeStorage):
                        ('symbol', 'text'),
                        ('color_hex', 'text'),
                        ('color_name', 'text'),
-                       ('updated', 'text')]
+                       ('updated', 'integer')]  # epoch
+    STATE_DB_INDEX = 'fleet_state_updated'
+
+    # fleet state history is pruned to the most recent states
+    STATE_RETENTION_ROWS = 1000
+    STATE_RETENTION_PERIOD = 60 * 60 * 24 * 30  # seconds
 
     TEACHER_DB_NAME = 'teacher'
     TEACHER_ID = 'current_teacher'
     TEACHER_DB_SCHEMA = [('id', 'text primary key'), ('checksum_address', 'text')]
 
-    def __init__(self, storage_filepath: str = DEFAULT_DB_FILEPATH, *args, **kwargs):
-        super().__init__(db_filepath=storage_filepath, federated_only=False, *args, **kwargs)
+    # a buffered fleet state superseded within this window is transient churn, and not written
+    STATE_DEBOUNCE_WINDOW = 5  # seconds
+
+    # number of most recent fleet states kept in the in-memory index
+    STATE_INDEX_SIZE = 20
+
+    def __init__(self, storage_filepath: str = DEFAULT_DB_FILEPATH, durable: bool = False, *args, **kwargs):
+        self._pending_states = list()  # db rows
+        self._last_state_buffered = 0
+        self._pending_teacher = None
+        self._state_index = dict()  # nickname -> db row
+        self._current_teacher = None
+        super().__init__(db_filepath=storage_filepath, durable=durable, federated_only=False, *args, **kwargs)
 
     def init_db_tables(self):
-        with sqlite3.connect(self.db_filepath) as db_conn:
+        if not self._reuse_db_tables():
+            with self._db_connections.get() as db_conn:
 
-            # ensure table is empty
-            for table in [self.STATE_DB_NAME, self.TEACHER_DB_NAME]:
-                db_conn.execute(f"DROP TABLE IF EXISTS {table}")
+                # ensure table is empty
+                for table in [self.STATE_DB_NAME, self.TEACHER_DB_NAME]:
+                    db_conn.execute(f"DROP TABLE IF EXISTS {table}")
 
-            # create fresh new state table (same column names as FleetStateTracker.abridged_state_details)
-            state_schema = ", ".join(f"{schema[0]} {schema[1]}" for schema in self.STATE_DB_SCHEMA)
-            db_conn.execute(f"CREATE TABLE {self.STATE_DB_NAME} ({state_schema})")
+                # create fresh new state table (same column names as FleetStateTracker.abridged_state_details)
+                state_schema = ", ".join(f"{schema[0]} {schema[1]}" for schema in self.STATE_DB_SCHEMA)
+                db_conn.execute(f"CREATE TABLE {self.STATE_DB_NAME} ({state_schema})")
+                db_conn.execute(f"CREATE INDEX {self.STATE_DB_INDEX} ON {self.STATE_DB_NAME} (updated)")
 
-            # create new teacher table
-            teacher_schema = ", ".join(f"{schema[0]} {schema[1]}" for schema in self.TEACHER_DB_SCHEMA)
-            db_conn.execute(f"CREATE TABLE {self.TEACHER_DB_NAME} ({teacher_schema})")
+                # create new teacher table
+                teacher_schema = ", ".join(f"{schema[0]} {schema[1]}" for schema in self.TEACHER_DB_SCHEMA)
+                db_conn.execute(f"CREATE TABLE {self.TEACHER_DB_NAME} ({teacher_schema})")
         super().init_db_tables()
 
     def clear(self, metadata: bool = True, certificates: bool = True) -> None:
         if metadata is True:
-            with sqlite3.connect(self.db_filepath) as db_conn:
-                # TODO Clear the states table here?
-                for table in [self.STATE_DB_NAME, self.TEACHER_DB_NAME]:
-                    db_conn.execute(f"DELETE FROM {table}")
+            with self._pending_lock:
+                self._pending_states.clear()
+                self._pending_teacher = None
+                self._state_index.clear()
+                self._current_teacher = None
+                with self._db_connections.get() as db_conn:
+                    # TODO Clear the states table here?
+                    for table in [self.STATE_DB_NAME, self.TEACHER_DB_NAME]:
+                        db_conn.execute(f"DELETE FROM {table}")
 
         super().clear(metadata=metadata, certificates=certificates)
 
     def store_state_metadata(self, state: dict):
-        # TODO Limit the size of this table - no reason to store really old state values
-
         db_row = (state['nickname'],
                   state['symbol'],
                   state['color_hex'],
                   state['color_name'],
-                  # convert to rfc3339 for ease of sqlite3 sorting; we lose millisecond precision, but meh!
-                  MayaDT.from_rfc2822(state['updated']).rfc3339())
-        sql = f'REPLACE INTO {self.STATE_DB_NAME} VALUES(?,?,?,?,?)'
-        with sqlite3.connect(self.db_filepath) as db_conn:
-            db_conn.execute(sql, db_row)
+                  # convert to epoch for indexed sorting; we lose millisecond precision, but meh!
+                  MayaDT.from_rfc2822(state['updated']).epoch)
+        now = time.monotonic()
+        with self._pending_lock:
+            if self._pending_states and now - self._last_state_buffered < self.STATE_DEBOUNCE_WINDOW:
+                self._pending_states.pop()  # superseded
+            self._pending_states.append(db_row)
+            self._last_state_buffered = now
+            self._flush_unless_batching()
 
     def store_current_teacher(self, teacher_checksum: str):
-        sql = f'REPLACE INTO {self.TEACHER_DB_NAME} VALUES (?,?)'
-        with sqlite3.connect(self.db_filepath) as db_conn:
-            db_conn.execute(sql, (self.TEACHER_ID, teacher_checksum))
+        with self._pending_lock:
+            self._pending_teacher = teacher_checksum
+            self._flush_unless_batching()
+
+    def get_previous_states_metadata(self, limit: int = STATE_INDEX_SIZE) -> List[Dict]:
+        """Returns the most recent fleet states (at most `STATE_INDEX_SIZE`), newest first."""
+        with self._pending_lock:
+            db_rows = sorted(self._state_index.values(), key=lambda db_row: db_row[-1], reverse=True)[:limit]
+        columns = [schema[0] for schema in self.STATE_DB_SCHEMA]
+        # updated is converted from epoch back to rfc2822, as is read from the state table
+        return [dict(zip(columns, db_row), updated=MayaDT(db_row[-1]).rfc2822()) for db_row in db_rows]
+
+    def get_current_teacher_checksum(self) -> str:
+        with self._pending_lock:
+            return self._current_teacher
+
+    def prune_states(self, now: int = None) -> int:
+        """
+        Removes fleet states older than the retention period, and all but the most recent retained number
+        of states. Returns the number of states removed.
+        """
+        now = now if now is not None else maya.now().epoch
+        with self._pending_lock:
+            for nickname, db_row in list(self._state_index.items()):
+                if db_row[-1] < now - self.STATE_RETENTION_PERIOD:
+                    del self._state_index[nickname]
+        with self._db_connections.get() as db_conn:
+            removed = db_conn.execute(f"DELETE FROM {self.STATE_DB_NAME} WHERE updated < ?",
+                                      (now - self.STATE_RETENTION_PERIOD, )).rowcount
+            removed += db_conn.execute(f"DELETE FROM {self.STATE_DB_NAME} WHERE updated < "
+                                       f"(SELECT updated FROM {self.STATE_DB_NAME} "
+                                       f"ORDER BY updated DESC LIMIT 1 OFFSET ?)",
+                                       (self.STATE_RETENTION_ROWS - 1, )).rowcount
+        return removed
+
+    def _write_pending(self, db_conn) -> None:
+        super()._write_pending(db_conn)
+        if self._pending_states:
+            db_conn.executemany(f'REPLACE INTO {self.STATE_DB_NAME} VALUES(?,?,?,?,?)', self._pending_states)
+        if self._pending_teacher is not None:
+            db_conn.execute(f'REPLACE INTO {self.TEACHER_DB_NAME} VALUES (?,?)',
+                            (self.TEACHER_ID, self._pending_teacher))
+
+    def _clear_pending(self) -> None:
+        super()._clear_pending()
+        for db_row in self._pending_states:
+            self._index_state(db_row)
+        if self._pending_teacher is not None:
+            self._current_teacher = self._pending_teacher
+        self._pending_states.clear()
+        self._pending_teacher = None
+
+    def _index_state(self, db_row: tuple) -> None:
+        self._state_index[db_row[0]] = db_row  # replaced by nickname, as in the state table
+        if len(self._state_index) > self.STATE_INDEX_SIZE:
+            oldest = min(self._state_index.values(), key=lambda row: row[-1])
+            del self._state_index[oldest[0]]
+
+    def _load_index(self, db_conn) -> None:
+        super()._load_index(db_conn)
+        for db_row in db_conn.execute(f"SELECT * FROM {self.STATE_DB_NAME} ORDER BY updated DESC LIMIT ?",
+                                      (self.STATE_INDEX_SIZE, )):
+            self._index_state(db_row)
+        row = db_conn.execute(f"SELECT checksum_address FROM {self.TEACHER_DB_NAME} LIMIT 1").fetchone()
+        self._current_teacher = row[0] if row else None
+
+
+# Node information tier kept in its own retention policy; `interval` is the granularity of the
+# per-staker values in the tier (None for raw data)
+InfluxTier = namedtuple('InfluxTier', ['retention_policy', 'duration', 'interval', 'measurement', 'resample_opts'])
 
 
 class Crawler(Learner):
@@ -179,9 +532,17 @@ class Crawler(Learner):
     _LONG_LEARNING_DELAY = 30
     _ROUNDS_WITHOUT_NODES_AFTER_WHICH_TO_SLOW_DOWN = 25
 
+    # the learning delay lengthens from the short to the long delay as fewer new nodes are discovered per round
+    LEARNING_DELAY_SMOOTHING = 0.5  # weight of the latest round
+
+    DEFAULT_LEARNING_FAN_OUT = 1  # teachers learned from concurrently per round
+
     LEARNING_TIMEOUT = 10
+    TEACHER_SELECTION_SIZE = 10  # teachers learned from before teachers are ranked again
     DEFAULT_REFRESH_RATE = 60  # seconds
     REFRESH_RATE_WINDOW = 0.25
+    FLEET_STATE_PRUNE_INTERVAL = 60 * 60  # seconds
+    NODE_PROBE_INTERVAL = 60 * 5  # seconds
 
     # InfluxDB Line Protocol Format (note the spaces, commas):
     # +-----------+--------+-+---------+-+---------+
@@ -198,15 +559,29 @@ class Crawler(Learner):
                          'last_confirmed_period={last_confirmed_period}i ' \
                          '{timestamp}'
 
-    EVENT_MEASUREMENT = 'crawler_event_info'
-    EVENT_LINE_PROTOCOL = '{measurement},txhash={txhash} ' \
-                          'contract_name="{contract_name}",' \
+    NETWORK_MEASUREMENT = 'crawler_network_info'
+    NETWORK_LINE_PROTOCOL = '{measurement} ' \
+                            'locked_stake={locked_stake},' \
+                            'num_stakers={num_stakers}i,' \
+                            'active_stakers={active_stakers}i,' \
+                            'pending_stakers={pending_stakers}i,' \
+                            'inactive_stakers={inactive_stakers}i,' \
+                            'known_nodes={known_nodes}i ' \
+                            '{timestamp}'
+
+    # Tags are limited to low-cardinality dimensions (sorted by key); `log_index` is the position of the event
+    # log within its block, which keeps events of the same block (same timestamp) distinct
+    EVENT_MEASUREMENT = 'crawler_events'
+    EVENT_LINE_PROTOCOL = '{measurement},contract_name={contract_name},event_name={event_name},log_index={log_index} ' \
+                          'txhash="{txhash}",' \
                           'contract_address="{contract_address}",' \
-                          'event_name="{event_name}",' \
                           'block_number={block_number}i,' \
                           'args="{args}" ' \
                           '{timestamp}'
 
+    # Schema v1 events, tagged by transaction hash (a series per event) - see `nucypher-monitor migrate-influx`
+    LEGACY_EVENT_MEASUREMENT = 'crawler_event_info'
+
     INFLUX_DB_NAME = 'network'
     INFLUX_RETENTION_POLICY_NAME = 'network_info_retention'
 
@@ -214,6 +589,46 @@ class Crawler(Learner):
     RETENTION = '5w'  # Weeks
     REPLICATION = '1'
 
+    # Downsampling tiers for node information, maintained by continuous queries that keep the latest
+    # value per staker for each interval; ordered from finest to coarsest
+    NODE_INFO_RAW_TIER = InfluxTier(retention_policy=INFLUX_RETENTION_POLICY_NAME,
+                                    duration=RETENTION,
+                                    interval=None,
+                                    measurement=NODE_MEASUREMENT,
+                                    resample_opts=None)
+    NODE_INFO_HOURLY_TIER = InfluxTier(retention_policy='network_info_hourly',
+                                       duration='52w',
+                                       interval='1h',
+                                       measurement='crawler_node_info_1h',
+                                       resample_opts='EVERY 1h FOR 2h')
+    NODE_INFO_DAILY_TIER = InfluxTier(retention_policy='network_info_daily',
+                                      duration='INF',
+                                      interval='1d',
+                                      measurement='crawler_node_info_1d',
+                                      resample_opts='EVERY 1h FOR 2d')  # today's value updated hourly
+    NODE_INFO_TIERS = (NODE_INFO_RAW_TIER, NODE_INFO_HOURLY_TIER, NODE_INFO_DAILY_TIER)
+    NODE_INFO_ROLLUP_FIELDS = ('stake', 'locked_stake', 'work_orders')
+
+    # Network totals written once per round; the daily tier shares the retention policy of the node information
+    # daily tier, and keeps the latest totals for each day
+    NETWORK_INFO_RAW_TIER = InfluxTier(retention_policy=INFLUX_RETENTION_POLICY_NAME,
+                                       duration=RETENTION,
+                                       interval=None,
+                                       measurement=NETWORK_MEASUREMENT,
+                                       resample_opts=None)
+    NETWORK_INFO_DAILY_TIER = InfluxTier(retention_policy=NODE_INFO_DAILY_TIER.retention_policy,
+                                         duration=NODE_INFO_DAILY_TIER.duration,
+                                         interval='1d',
+                                         measurement='crawler_network_info_1d',
+                                         resample_opts='EVERY 1h FOR 2d')
+    NETWORK_INFO_TIERS = (NETWORK_INFO_RAW_TIER, NETWORK_INFO_DAILY_TIER)
+    NETWORK_INFO_ROLLUP_FIELDS = ('locked_stake', 'num_stakers', 'active_stakers', 'pending_stakers',
+                                  'inactive_stakers', 'known_nodes')
+
+    # Node information is only written when it changes, but at least once a day per staker so that
+    # daily aggregations of the latest value per staker remain correct
+    NODE_INFO_KEYFRAME_INTERVAL = 60 * 60 * 24  # seconds
+
     METRICS_ENDPOINT = 'stats'
     DEFAULT_CRAWLER_HTTP_PORT = 9555
 
@@ -230,7 +645,12 @@ class Crawler(Learner):
                  influx_port: int,
                  crawler_http_port: int = DEFAULT_CRAWLER_HTTP_PORT,
                  registry: BaseContractRegistry = None,
+                 registry_cache: ContractRegistryCache = None,
                  node_storage_filepath: str = CrawlerNodeStorage.DEFAULT_DB_FILEPATH,
+                 durable_node_storage: bool = False,
+                 learning_fan_out: int = DEFAULT_LEARNING_FAN_OUT,
+                 timeseries_storage_filepath: str = None,
+                 influx_udp_port: int = None,
                  refresh_rate=DEFAULT_REFRESH_RATE,
                  restart_on_error=True,
                  *args, **kwargs):
@@ -239,24 +659,52 @@ class Crawler(Learner):
         self.federated_only = False  # Nope - for compatibility with Learner TODO # nucypher/466
         Teacher.set_federated_mode(False)
 
-        self.registry = registry or InMemoryContractRegistry.from_latest_publication()
+        if not registry:
+            if registry_cache:
+                registry = registry_cache.registry
+            else:
+                registry = InMemoryContractRegistry.from_latest_publication(network=kwargs.get('domain'))
+        self.registry = registry
+        if registry_cache:
+            registry_cache.subscribe(self._registry_updated)
         self.economics = EconomicsFactory.get_economics(registry=self.registry)
         self._refresh_rate = refresh_rate
         self._restart_on_error = restart_on_error
 
         # TODO: Needs cleanup
         # Tracking
-        node_storage = CrawlerNodeStorage(storage_filepath=node_storage_filepath)
+        node_storage = CrawlerNodeStorage(storage_filepath=node_storage_filepath,
+                                          durable=durable_node_storage,
+                                          registry=self.registry)
+
+        # known nodes are updated by one teacher at a time, when learning from teachers concurrently
+        self._remember_lock = threading.RLock()
+        remember_lock = self._remember_lock
+        self._fan_out_teacher = threading.local()  # teacher of a concurrent learning thread
+        fan_out_teacher = self._fan_out_teacher
 
         class MonitoringTracker(FleetSensor):
             def record_fleet_state(self, *args, **kwargs):
-                new_state_or_none = super().record_fleet_state(*args, **kwargs)
+                if getattr(fan_out_teacher, 'node', None) is not None:
+                    return None  # recorded once all teachers of a concurrent round were learned from
+                with remember_lock:
+                    new_state_or_none = super().record_fleet_state(*args, **kwargs)
                 if new_state_or_none:
                     _, new_state = new_state_or_none
                     state = self.abridged_state_details(new_state)
                     node_storage.store_state_metadata(state)
+
+            def mark_as(self, *args, **kwargs):
+                with remember_lock:
+                    return super().mark_as(*args, **kwargs)
         self.tracker_class = MonitoringTracker
 
+        # may be used to learn during Learner initialization
+        self._teacher_statistics = TeacherStatistics(failure_penalty=self.LEARNING_TIMEOUT)
+        self._learning_fan_out = learning_fan_out
+        self._new_nodes_average = 1  # new nodes per round; initially learn at the short delay
+        self._learning_delay = self._SHORT_LEARNING_DELAY
+
         super().__init__(save_metadata=True,
                          node_storage=node_storage,
                          verify_node_bonding=False,
@@ -264,16 +712,28 @@ class Crawler(Learner):
 
         self.log = Logger(self.__class__.__name__)
         self.log.info(f"Storing node metadata in DB: {node_storage.db_filepath}")
-        self.log.info(f"Storing blockchain metadata in DB: {influx_host}:{influx_port}")
+        if durable_node_storage:
+            self._load_stored_nodes()
+        if timeseries_storage_filepath:
+            self.log.info(f"Storing blockchain metadata in embedded DB: {timeseries_storage_filepath}")
+        else:
+            udp = f" (UDP writes to port {influx_udp_port})" if influx_udp_port else ""
+            self.log.info(f"Storing blockchain metadata in DB: {influx_host}:{influx_port}{udp}")
 
         # In-memory Metrics
         self._stats = {'status': 'initializing'}
-        self._crawler_client = None
+        self._known_nodes_metadata = dict()  # staker address -> (node metadata, timestamp)
+        self._known_nodes_version = 0  # node metadata change version last obtained
+        self._node_commitments = dict()  # staker address -> (period, last committed period, worker)
 
-        # Initialize InfluxDB
+        # Initialize time series storage
         self._db_host = influx_host
         self._db_port = influx_port
-        self._influx_client = None
+        self._db_udp_port = influx_udp_port
+        self._timeseries_storage_filepath = timeseries_storage_filepath
+        self._timeseries_storage = None
+        self._measurement_writer = None
+        self._node_info_changes = ChangeTracker(keyframe_interval=self.NODE_INFO_KEYFRAME_INTERVAL)
 
         # Agency
         self.staking_agent = ContractAgency.get_agent(StakingEscrowAgent, registry=self.registry)
@@ -292,44 +752,162 @@ class Crawler(Learner):
                                                          start_delay=random.randint(2, 15))  # random staggered start
         self._events_collection_task = DelayedLoopingCall(f=self._collect_events,
                                                           start_delay=random.randint(2, 15))  # random staggered start
+        self._fleet_state_pruning_task = DelayedLoopingCall(f=self._prune_fleet_states,
+                                                            start_delay=random.randint(2, 15))  # random staggered start
+
+        # Reachability of known nodes, independent of learning
+        self._node_prober = NodeProber()
+        self._node_probing_task = DelayedLoopingCall(f=self._probe_nodes,
+                                                     start_delay=random.randint(2, 15))  # random staggered start
 
         # JSON Endpoint
         self._crawler_http_port = crawler_http_port
         self._flask = None
 
-    def _initialize_influx(self):
-        try:
-            db_list = self._influx_client.get_list_database()
-        except requests.exceptions.ConnectionError:
-            raise ConnectionError(f"No connection to InfluxDB at {self._db_host}:{self._db_port}")
-        found_db = (list(filter(lambda db: db['name'] == self.INFLUX_DB_NAME, db_list)))
-        if len(found_db) == 0:
-            # db not previously created
-            self.log.info(f'Database {self.INFLUX_DB_NAME} not found, creating it')
-            self._influx_client.create_database(self.INFLUX_DB_NAME)
-            self._influx_client.create_retention_policy(name=self.INFLUX_RETENTION_POLICY_NAME,
-                                                        duration=self.RETENTION,
-                                                        replication=self.REPLICATION,
-                                                        database=self.INFLUX_DB_NAME,
-                                                        default=True)
-        else:
-            self.log.info(f'Database {self.INFLUX_DB_NAME} already exists, no need to create it')
+    def _load_stored_nodes(self) -> None:
+        """Seeds known nodes from durable node storage, instead of relearning the network from the teacher."""
+        stored_nodes = self.node_storage.load_nodes()
+        with self.node_storage.batch():
+            for node in stored_nodes:
+                self.remember_node(node=node, record_fleet_state=False)
+            if stored_nodes:
+                self.known_nodes.record_fleet_state()
+        self.log.info(f"Loaded {len(stored_nodes)} known nodes from {self.node_storage.db_filepath}")
+
+    def _registry_updated(self, registry: BaseContractRegistry) -> None:
+        self.log.info(f"Reloading agents for updated registry {registry.id[:16]}")
+        self.economics = EconomicsFactory.get_economics(registry=registry)
+        self.staking_agent = ContractAgency.get_agent(StakingEscrowAgent, registry=registry)
+        self.registry = registry
+        self.node_storage.registry = registry
+
+    def select_teacher_nodes(self):
+        """Selects the best ranked teachers, which are learned from in turn before teachers are ranked again."""
+        nodes_we_know_about = self.known_nodes.shuffled()  # unmeasured teachers are tried in random order
+        if not nodes_we_know_about:
+            raise self.NotEnoughTeachers("Need some nodes to start learning from.")
+        teachers = self._teacher_statistics.rank(nodes_we_know_about)[:self.TEACHER_SELECTION_SIZE]
+        self.teacher_nodes.extend(reversed(teachers))  # teachers are popped from the end
+
+    def current_teacher_node(self, cycle: bool = False):
+        teacher = getattr(self._fan_out_teacher, 'node', None)
+        if teacher is not None:
+            return teacher
+        return super().current_teacher_node(cycle=cycle)
+
+    def cycle_teacher_node(self):
+        # teachers of a concurrent round are cycled when selected
+        if getattr(self._fan_out_teacher, 'node', None) is None:
+            super().cycle_teacher_node()
+
+    def remember_node(self, *args, **kwargs):
+        with self._remember_lock:
+            return super().remember_node(*args, **kwargs)
 
     def learn_from_teacher_node(self, *args, **kwargs):
+        if self._learning_fan_out > 1:
+            return self._learn_from_teacher_nodes(*args, **kwargs)
+
         try:
             current_teacher = self.current_teacher_node(cycle=False)
         except self.NotEnoughTeachers as e:
             self.log.warn("Can't learn right now: {}".format(e.args[0]))
             return
 
-        new_nodes = super().learn_from_teacher_node(*args, **kwargs)
+        # node and fleet state metadata of the round is written in a single transaction
+        population = self._known_nodes_population()
+        with self.node_storage.batch():
+            new_nodes = self._learn_from_teacher(current_teacher, *args, **kwargs)
+
+            # update metadata of teacher - not just in memory but in the underlying storage system (db in this case)
+            self.node_storage.store_node_metadata(current_teacher)
+            self.node_storage.store_current_teacher(current_teacher.checksum_address)
 
-        # update metadata of teacher - not just in memory but in the underlying storage system (db in this case)
-        self.node_storage.store_node_metadata(current_teacher)
-        self.node_storage.store_current_teacher(current_teacher.checksum_address)
+        self._adapt_learning_delay(num_new_nodes=self._known_nodes_population() - population)
+        return new_nodes
+
+    def _learn_from_teacher_nodes(self, *args, **kwargs) -> List:
+        """
+        Learns from several teachers concurrently; nodes are deduplicated and written in a single transaction.
+        The fleet state is recorded once, after all teachers were learned from.
+        """
+        teachers = list()
+        try:
+            while len(teachers) < self._learning_fan_out:
+                teacher = self.current_teacher_node(cycle=False)
+                if teacher in teachers:
+                    break  # fewer teachers than the fan-out
+                teachers.append(teacher)
+                self.cycle_teacher_node()
+        except self.NotEnoughTeachers as e:
+            if not teachers:
+                self.log.warn("Can't learn right now: {}".format(e.args[0]))
+                return
 
+        new_nodes = dict()  # checksum address -> node
+        population = self._known_nodes_population()
+        learning_round = self._learning_round
+        with self.node_storage.batch():
+            with ThreadPoolExecutor(max_workers=len(teachers)) as executor:
+                results = [(teacher, executor.submit(self._learn_from_teacher_concurrently, teacher, *args, **kwargs))
+                           for teacher in teachers]
+            # rounds counted here since concurrent increments by the base round may be lost
+            self._learning_round = learning_round + len(teachers)
+            num_new_nodes = self._known_nodes_population() - population
+            if num_new_nodes:
+                self.known_nodes.record_fleet_state()
+            for teacher, result in results:
+                try:
+                    teacher_new_nodes = result.result()
+                except Exception as e:
+                    self.log.warn(f"Unable to learn from teacher {teacher}: {e}")
+                else:
+                    if isinstance(teacher_new_nodes, list):
+                        new_nodes.update((node.checksum_address, node) for node in teacher_new_nodes)
+                self.node_storage.store_node_metadata(teacher)
+            self.node_storage.store_current_teacher(teachers[0].checksum_address)
+
+        self._adapt_learning_delay(num_new_nodes=num_new_nodes)
+        return list(new_nodes.values())
+
+    def _learn_from_teacher_concurrently(self, teacher, *args, **kwargs):
+        self._fan_out_teacher.node = teacher
+        try:
+            return self._learn_from_teacher(teacher, *args, **kwargs)
+        finally:
+            self._fan_out_teacher.node = None
+
+    def _learn_from_teacher(self, teacher, *args, **kwargs):
+        start = time.monotonic()
+        try:
+            new_nodes = super().learn_from_teacher_node(*args, **kwargs)
+        except Exception:
+            self._teacher_statistics.record_failure(teacher.checksum_address, latency=time.monotonic() - start)
+            raise
+        # nothing is returned when the teacher could not be learned from eg. unresponsive, invalid
+        latency = time.monotonic() - start
+        if new_nodes is None:
+            self._teacher_statistics.record_failure(teacher.checksum_address, latency=latency)
+        else:
+            self._teacher_statistics.record_success(teacher.checksum_address, latency=latency)
         return new_nodes
 
+    def _known_nodes_population(self) -> int:
+        with self._remember_lock:
+            return len(self.known_nodes)
+
+    def _adapt_learning_delay(self, num_new_nodes: int) -> None:
+        num_new_nodes = max(num_new_nodes, 0)  # eg. nodes forgotten during the round
+        self._new_nodes_average += self.LEARNING_DELAY_SMOOTHING * (num_new_nodes - self._new_nodes_average)
+        discovery = min(self._new_nodes_average, 1)
+        self._learning_delay = self._LONG_LEARNING_DELAY - (self._LONG_LEARNING_DELAY -
+                                                            self._SHORT_LEARNING_DELAY) * discovery
+        self._learning_task.interval = self._learning_delay
+
+    def _adjust_learning(self, node_list):
+        # the learning delay is adapted per round instead (see _adapt_learning_delay)
+        self._learning_task.interval = self._learning_delay
+
     #
     # Measurements
     #
@@ -338,6 +916,10 @@ class Crawler(Learner):
     def stats(self) -> dict:
         return self._stats
 
+    @property
+    def teacher_stats(self) -> dict:
+        return self._teacher_statistics.stats
+
     @collector(label="Projected Stake and Stakers")
     def _measure_future_locked_tokens(self, periods: int = 365):
         period_range = range(1, periods + 1)
@@ -396,16 +978,17 @@ class Crawler(Learner):
         #
 
         payload = defaultdict(list)
-        known_nodes = self._crawler_client.get_known_nodes_metadata()
-        for staker_address in known_nodes:
+        self._update_known_nodes_metadata()
+        known_nodes = OrderedDict()
+        for staker_address in sorted(self._known_nodes_metadata):
+            node_metadata, timestamp = self._known_nodes_metadata[staker_address]
 
             #
             # Confirmation Status Scraping
             #
 
-            last_confirmed_period = self.staking_agent.get_last_committed_period(staker_address)
+            last_confirmed_period, worker = self._get_node_commitment(staker_address, current_period)
             missing_confirmations = current_period - last_confirmed_period
-            worker = self.staking_agent.get_worker_from_staker(staker_address)
             if worker == NULL_ADDRESS:
                 # missing_confirmations = NULL_ADDRESS
                 continue  # TODO: Skip this DetachedWorker and do not display it
@@ -420,7 +1003,6 @@ class Crawler(Learner):
             #
 
             now = maya.now()
-            timestamp = maya.MayaDT.from_iso8601(known_nodes[staker_address]['timestamp'])
             delta = now - timestamp
 
             node_qualifies_as_newborn = (delta.total_seconds() < shortest_uptime) and missing_confirmations == -1
@@ -438,8 +1020,10 @@ class Crawler(Learner):
             # Aggregate
             #
 
-            known_nodes[staker_address]['status'] = node_status
-            known_nodes[staker_address]['uptime'] = natural_uptime
+            known_nodes[staker_address] = dict(node_metadata,
+                                               status=node_status,
+                                               uptime=natural_uptime,
+                                               reachability=self._node_prober.node_stats(staker_address))
             payload[status_message.lower()].append(known_nodes[staker_address])
 
         # There are not always winners...
@@ -449,6 +1033,35 @@ class Crawler(Learner):
             known_nodes[uptime_king]['uptime_king'] = True
         return payload
 
+    def _update_known_nodes_metadata(self) -> None:
+        """Applies the node metadata changed since the last round; unchanged nodes are not re-read."""
+        changes = self.node_storage.get_known_nodes_metadata_changes(since_version=self._known_nodes_version)
+        for staker_address in changes.removed:
+            self._known_nodes_metadata.pop(staker_address, None)
+            self._node_commitments.pop(staker_address, None)
+        for staker_address, node_metadata in changes.changed.items():
+            self._node_commitments.pop(staker_address, None)  # re-read from the staking contract
+            previous = self._known_nodes_metadata.get(staker_address)
+            if previous is not None and previous[0]['timestamp'] == node_metadata['timestamp']:
+                timestamp = previous[1]  # eg. only last seen changed
+            else:
+                timestamp = maya.MayaDT.from_iso8601(node_metadata['timestamp'])
+            self._known_nodes_metadata[staker_address] = (node_metadata, timestamp)
+        self._known_nodes_version = changes.version
+
+    def _get_node_commitment(self, staker_address: str, current_period: int) -> tuple:
+        """
+        Returns the last committed period and worker of the staker. The staking contract is only read again
+        once the node changes or the period advances.
+        """
+        commitment = self._node_commitments.get(staker_address)
+        if commitment is not None and commitment[0] == current_period:
+            return commitment[1:]
+        last_committed_period = self.staking_agent.get_last_committed_period(staker_address)
+        worker = self.staking_agent.get_worker_from_staker(staker_address)
+        self._node_commitments[staker_address] = (current_period, last_committed_period, worker)
+        return last_committed_period, worker
+
     def _collect_stats(self, threaded: bool = True) -> None:
         # TODO: Handle faulty connection to provider (requests.exceptions.ReadTimeout)
         if threaded:
@@ -476,8 +1089,9 @@ class Crawler(Learner):
         next_period = self._measure_start_of_next_period()
 
         # Nodes
-        teacher = self._crawler_client.get_current_teacher_checksum()
-        states = self._crawler_client.get_previous_states_metadata()
+        teacher = self.node_storage.get_current_teacher_checksum()
+        states = self.node_storage.get_previous_states_metadata()
+        click.secho("✓ ... Latest Teacher and Previous Fleet States", color='blue')
 
         known_nodes = self.measure_known_nodes()
 
@@ -494,6 +1108,22 @@ class Crawler(Learner):
         # Write
         #
 
+        # network totals - charts read a single point per round rather than a point per staker
+        network_info = self.NETWORK_LINE_PROTOCOL.format(
+            measurement=self.NETWORK_MEASUREMENT,
+            locked_stake=float(NU.from_nunits(global_locked_tokens).to_tokens()),
+            # the same population as stakers counted from node information ie. stakers running nodes, rather
+            # than every staker of the contract
+            num_stakers=activity['active'] + activity['pending'],
+            active_stakers=activity['active'],
+            pending_stakers=activity['pending'],
+            inactive_stakers=activity['inactive'],
+            known_nodes=len(self.known_nodes),
+            timestamp=block_time)
+        if not self._measurement_writer.write([network_info]):
+            self.log.warn(f'Unable to write network information to database {self.INFLUX_DB_NAME} | '
+                          f'Period {current_period}')
+
         self._stats = {'blocknumber': block_number,
                        'blocktime': block_time,
 
@@ -509,6 +1139,11 @@ class Crawler(Learner):
                        'global_locked_tokens': global_locked_tokens,
                        #'future_locked_tokens': future_locked_tokens,
                        'top_stakers': top_stakers,
+
+                       'measurement_writer': self._measurement_writer.stats if self._measurement_writer else None,
+                       'node_info_changes': self._node_info_changes.stats,
+                       'teachers': self._teacher_statistics.stats,
+                       'node_prober': self._node_prober.stats,
                        }
         done = maya.now()
         delta = done - start
@@ -546,21 +1181,20 @@ class Crawler(Learner):
                         args = ", ".join(f"{k}:{v}" for k, v in record.args.items())
                         events_list.append(self.EVENT_LINE_PROTOCOL.format(
                             measurement=self.EVENT_MEASUREMENT,
+                            contract_name=escape_tag_value(agent.contract_name),
+                            event_name=escape_tag_value(event_name),
+                            log_index=event_record['logIndex'],
                             txhash=record.transaction_hash,
-                            contract_name=agent.contract_name,
                             contract_address=agent.contract_address,
-                            event_name=event_name,
                             block_number=record.block_number,
-                            args=args,
+                            args=escape_field_string(args),
                             timestamp=blockchain_client.w3.eth.getBlock(record.block_number).timestamp,
                         ))
 
-        success = self._influx_client.write_points(events_list,
-                                                   database=self.INFLUX_DB_NAME,
-                                                   time_precision='s',
-                                                   batch_size=10000,
-                                                   protocol='line')
-        self.__events_from_block = latest_block_number
+        success = self._measurement_writer.write(events_list)
+        if success:
+            # only move past these blocks once their events are queued or spooled
+            self.__events_from_block = latest_block_number
         self.__collecting_events = False
         if not success:
             # TODO: What do we do here - Event hook for alerting?
@@ -586,6 +1220,7 @@ class Crawler(Learner):
         self.log.info(log)
 
         data = list()
+        changes = list()
         for node in known_nodes:
 
             staker_address = node.checksum_address
@@ -611,12 +1246,18 @@ class Crawler(Learner):
 
             num_work_orders = 0  # len(node.work_orders())  # TODO: Only works for is_me with datastore attached
 
+            values = (worker, start_date, end_date, staked_nu_tokens, locked_nu_tokens,
+                      current_period, last_confirmed_period)
+            if not self._node_info_changes.should_write(staker_address, values, block_time):
+                continue  # unchanged since the last point written for this staker
+            changes.append((staker_address, values))
+
             # TODO: do we need to worry about how much information is in memory if number of nodes is
             #  large i.e. should I check for size of data and write within loop if too big
             data.append(self.NODE_LINE_PROTOCOL.format(
                 measurement=self.NODE_MEASUREMENT,
-                staker_address=staker_address,
-                worker_address=worker,
+                staker_address=escape_tag_value(staker_address),
+                worker_address=escape_field_string(worker),
                 start_date=start_date,
                 end_date=end_date,
                 stake=staked_nu_tokens,
@@ -627,17 +1268,35 @@ class Crawler(Learner):
                 work_orders=num_work_orders
             ))
 
-        success = self._influx_client.write_points(data,
-                                                   database=self.INFLUX_DB_NAME,
-                                                   time_precision='s',
-                                                   batch_size=10000,
-                                                   protocol='line')
+        success = self._measurement_writer.write(data)
+        if success:
+            for staker_address, values in changes:
+                self._node_info_changes.written(staker_address, values, block_time)
+        self.log.debug(f'Wrote {len(data)} changed node information points for {len(known_nodes)} nodes')
         self.__collecting_nodes = False
         if not success:
             # TODO: What do we do here - Event hook for alerting?
             self.log.warn(f'Unable to write node information to database {self.INFLUX_DB_NAME} at '
                           f'{MayaDT(epoch=block_time)} | Period {current_period}')
 
+    def _prune_fleet_states(self, threaded: bool = True):
+        if threaded:
+            return reactor.callInThread(self._prune_fleet_states, threaded=False)
+        removed = self.node_storage.prune_states()
+        if removed:
+            self.log.info(f'Pruned {removed} fleet states beyond retention')
+
+    def _probe_nodes(self, threaded: bool = True):
+        if threaded:
+            return reactor.callInThread(self._probe_nodes, threaded=False)
+        rest_urls = {staker_address: node_metadata['rest_url']
+                     for staker_address, node_metadata in self.node_storage.get_known_nodes_metadata().items()}
+        reachable = self._node_prober.probe_nodes(rest_urls)
+        if reachable is None:
+            self.log.debug("Skipping Round - Node probing is already running")
+        else:
+            self.log.info(f'Probed {len(rest_urls)} nodes, {reachable} reachable')
+
     def make_flask_server(self):
         """JSON Endpoint"""
         flask = Flask('nucypher-monitor')
@@ -663,17 +1322,15 @@ class Crawler(Learner):
         """Start the crawler if not already running"""
         if not self.is_running:
             self.log.info('Starting Crawler...')
-            if self._influx_client is None:
-                self._influx_client = InfluxDBClient(host=self._db_host, port=self._db_port, database=self.INFLUX_DB_NAME)
-                self._initialize_influx()
+            if self._timeseries_storage is None:
+                timeseries_storage = self._create_timeseries_storage()
+                timeseries_storage.initialize()
+                self._timeseries_storage = timeseries_storage
 
-            if self._crawler_client is None:
-                from monitor.db import CrawlerStorageClient
-                self._crawler_client = CrawlerStorageClient()
-
-                # TODO: Maybe?
-                # from monitor.db import CrawlerInfluxClient
-                # self.crawler_influx_client = CrawlerInfluxClient()
+            if self._measurement_writer is None:
+                # writes happen on their own thread, with a separate storage client
+                self._measurement_writer = MeasurementWriter(storage=self._create_timeseries_storage())
+                self._measurement_writer.start()
 
             # start tasks
             node_learner_deferred = self._node_details_task.start(
@@ -686,11 +1343,15 @@ class Crawler(Learner):
             # get known last event block
             self.__events_from_block = self._get_last_known_blocknumber()
             events_deferred = self._events_collection_task.start(interval=self._refresh_rate, now=eager)
+            pruning_deferred = self._fleet_state_pruning_task.start(interval=self.FLEET_STATE_PRUNE_INTERVAL, now=eager)
+            probing_deferred = self._node_probing_task.start(interval=self.NODE_PROBE_INTERVAL, now=eager)
 
             # hookup error callbacks
             node_learner_deferred.addErrback(self._handle_errors)
             collection_deferred.addErrback(self._handle_errors)
             events_deferred.addErrback(self._handle_errors)
+            pruning_deferred.addErrback(self._handle_errors)
+            probing_deferred.addErrback(self._handle_errors)
 
             # Start up
             self.start_learning_loop(now=False)
@@ -707,21 +1368,31 @@ class Crawler(Learner):
             self._node_details_task.stop()
             self._events_collection_task.stop()
             self._stats_collection_task.stop()
+            self._fleet_state_pruning_task.stop()
+            self._node_probing_task.stop()
+
+            if self._measurement_writer is not None:
+                self._measurement_writer.stop()
+                self._measurement_writer.storage.close()
+                self._measurement_writer = None
 
-            if self._influx_client is not None:
-                self._influx_client.close()
-                self._influx_client = None
+            if self._timeseries_storage is not None:
+                self._timeseries_storage.close()
+                self._timeseries_storage = None
 
     @property
     def is_running(self):
         """Returns True if currently running, False otherwise"""
         return self._node_details_task.running
 
-    def _get_last_known_blocknumber(self):
-        last_known_blocknumber = 0
-        blocknumber_result = list(
-            self._influx_client.query(f'SELECT MAX(block_number) from {self.EVENT_MEASUREMENT}').get_points())
-        if len(blocknumber_result) > 0:
-            last_known_blocknumber = blocknumber_result[0]['max']
+    def _create_timeseries_storage(self):
+        from monitor.storage import InfluxDBStorage, SQLiteTimeSeriesStorage  # avoid circular import
+        if self._timeseries_storage_filepath:
+            return SQLiteTimeSeriesStorage(db_filepath=self._timeseries_storage_filepath)
+        return InfluxDBStorage(host=self._db_host,
+                               port=self._db_port,
+                               database=self.INFLUX_DB_NAME,
+                               udp_port=self._db_udp_port)
 
-        return last_known_blocknumber
+    def _get_last_known_blocknumber(self):
+        return self._timeseries_storage.get_last_event_block_number()
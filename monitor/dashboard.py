@@ -3,6 +3,7 @@ from os import path
 
 import IP2Location
 import dash_html_components as html
+import maya
 import requests
 from dash import Dash
 from dash.dependencies import Output, Input, State
@@ -16,8 +17,10 @@ from nucypher.blockchain.eth.agents import (
     PolicyManagerAgent,
     AdjudicatorAgent
 )
-from nucypher.blockchain.eth.registry import InMemoryContractRegistry
 from nucypher.blockchain.eth.token import NU
+from nucypher.blockchain.eth.utils import datetime_to_period
+from twisted.internet import reactor
+from twisted.internet.task import LoopingCall
 from twisted.logger import Logger
 
 from monitor import layout, components, settings
@@ -28,8 +31,11 @@ from monitor.charts import (
 )
 from monitor.components import make_contract_row
 from monitor.crawler import Crawler
-from monitor.db import CrawlerInfluxClient
-from monitor.supply import calculate_supply_information, calculate_current_total_supply, calculate_circulating_supply
+from monitor.db import CrawlerInfluxClient, HistoricalEventsCache
+from monitor.metadata import NetworkMetadata
+from monitor.registry import ContractRegistryCache
+from monitor.storage import SQLiteTimeSeriesStorage
+from monitor.supply import SupplyInformationCache, calculate_vesting_schedule, LAUNCH_DATE
 
 
 class Dashboard:
@@ -37,6 +43,12 @@ class Dashboard:
     Dash Status application for monitoring a swarm of nucypher Ursula nodes.
     """
 
+    EVENTS_PRIOR_PERIODS = 30  # TODO more thought? (note: retention for the db is 5w - so anything longer is useless)
+
+    SUPPLY_REFRESH_RATE = 60 * 5  # seconds
+    SUPPLY_HISTORY_DEFAULT_STEP = 1  # days
+    SUPPLY_HISTORY_MAX_POINTS = 5000
+
     def __init__(self,
                  registry,
                  flask_server: Flask,
@@ -45,27 +57,42 @@ class Dashboard:
                  crawler_host: str,
                  crawler_port: int,
                  influx_host: str,
-                 influx_port: int):
+                 influx_port: int,
+                 registry_cache: ContractRegistryCache = None,
+                 timeseries_storage_filepath: str = None,
+                 historical_cache_filepath: str = None):
 
         self.log = Logger(self.__class__.__name__)
 
         # Crawler
         self.crawler_host = crawler_host
         self.crawler_port = crawler_port
-        self.influx_client = CrawlerInfluxClient(host=influx_host, port=influx_port, database=Crawler.INFLUX_DB_NAME)
+        storage = None
+        if timeseries_storage_filepath:
+            storage = SQLiteTimeSeriesStorage(db_filepath=timeseries_storage_filepath)
+        self.influx_client = CrawlerInfluxClient(host=influx_host,
+                                                 port=influx_port,
+                                                 database=Crawler.INFLUX_DB_NAME,
+                                                 cache_db_filepath=historical_cache_filepath,
+                                                 storage=storage)
+        self.events_cache = HistoricalEventsCache(influx_client=self.influx_client, days=self.EVENTS_PRIOR_PERIODS)
 
         # Blockchain & Contracts
         self.network = network
         self.registry = registry
 
         # Agency
-        self.staking_agent = ContractAgency.get_agent(StakingEscrowAgent, registry=self.registry)
-        self.token_agent = ContractAgency.get_agent(NucypherTokenAgent, registry=self.registry)
-        self.policy_agent = ContractAgency.get_agent(PolicyManagerAgent, registry=self.registry)
-        self.adjudicator_agent = ContractAgency.get_agent(AdjudicatorAgent, registry=self.registry)
+        self._load_agents(registry=self.registry)
+        self.metadata = NetworkMetadata(registry=self.registry)
+        if registry_cache:
+            registry_cache.subscribe(self._registry_updated)
 
         # Add informational endpoints
         # Supply
+        self.supply_cache = SupplyInformationCache()
+        self.__refreshing_supply = False
+        self._supply_refresh_task = LoopingCall(f=self.refresh_supply_information)
+        self._supply_refresh_task.start(interval=self.SUPPLY_REFRESH_RATE, now=True)
         self.add_supply_endpoint(flask_server=flask_server)
 
         # TODO: Staker
@@ -76,6 +103,19 @@ class Dashboard:
         # GeoLocation
         self.ip2loc = IP2Location.IP2Location()
         self.ip2loc.open(path.join(settings.ASSETS_PATH, 'geolocation', 'IP2LOCATION-LITE-DB5.BIN'))
+        self._geolocations = dict()  # host -> (longitude, latitude, country), looked up once per host
+
+    def _load_agents(self, registry) -> None:
+        self.staking_agent = ContractAgency.get_agent(StakingEscrowAgent, registry=registry)
+        self.token_agent = ContractAgency.get_agent(NucypherTokenAgent, registry=registry)
+        self.policy_agent = ContractAgency.get_agent(PolicyManagerAgent, registry=registry)
+        self.adjudicator_agent = ContractAgency.get_agent(AdjudicatorAgent, registry=registry)
+
+    def _registry_updated(self, registry) -> None:
+        self.log.info(f"Reloading agents for updated registry {registry.id[:16]}")
+        self._load_agents(registry=registry)
+        self.metadata.refresh(registry=registry)
+        self.registry = registry
 
     def make_request(self):
         url = f'http://{self.crawler_host}:{self.crawler_port}/{Crawler.METRICS_ENDPOINT}'
@@ -92,44 +132,110 @@ class Dashboard:
             data = json.loads(cached_stats)
         return data
 
+    def refresh_supply_information(self, threaded: bool = True) -> None:
+        """
+        Recalculates the cached supply information. Economics values are only retrieved from the blockchain
+        once per period, since they are only expected to change when rewards are minted for a period.
+        """
+        if threaded:
+            if self.__refreshing_supply:
+                self.log.debug("Skipping Round - Supply information refresh thread is already running")
+                return
+            return reactor.callInThread(self.refresh_supply_information, threaded=False)
+        self.__refreshing_supply = True
+        try:
+            economics = self.supply_cache.economics
+            if economics is None:
+                economics = EconomicsFactory.retrieve_from_blockchain(registry=self.registry)
+
+            current_period = datetime_to_period(datetime=maya.now(), seconds_per_period=economics.seconds_per_period)
+            if self.supply_cache.period is not None and current_period != self.supply_cache.period:
+                # new period - rewards may have been minted
+                economics = EconomicsFactory.retrieve_from_blockchain(registry=self.registry)
+
+            self.supply_cache.update(economics=economics, period=current_period)
+        except Exception as e:
+            self.log.warn(f'Unable to refresh supply information: {e}')
+        finally:
+            self.__refreshing_supply = False
+
     def add_supply_endpoint(self, flask_server: Flask):
+        def supply_information_unavailable():
+            if not self.supply_cache.is_populated:
+                # not expected to happen more than a few times during startup
+                self.refresh_supply_information(threaded=False)
+            if not self.supply_cache.is_populated:
+                # eg. blockchain unreachable
+                return flask_server.response_class(response="Supply information is not yet available",
+                                                   status=503,
+                                                   mimetype='text/plain')
+            return None
+
         @flask_server.route('/supply_information', methods=["GET"])
         def supply_information():
-            economics = EconomicsFactory.retrieve_from_blockchain(registry=self.registry)
+            unavailable = supply_information_unavailable()
+            if unavailable is not None:
+                return unavailable
 
             parameter = request.args.get('q')
             if parameter is None:
                 # no query - return all supply information
-                supply_info = calculate_supply_information(economics=economics)
                 response = flask_server.response_class(
-                    response=json.dumps(supply_info),
+                    response=self.supply_cache.get(),
                     status=200,
                     mimetype='application/json'
                 )
-            else:
+            elif parameter in SupplyInformationCache.QUERY_PARAMETERS:
                 # specific request query provided
-                if parameter == 'current_total_supply':
-                    current_total_supply = calculate_current_total_supply(economics)
-                    response = flask_server.response_class(
-                        response=str(current_total_supply),
-                        status=200,
-                        mimetype='text/plain'
-                    )
-                elif parameter == 'est_circulating_supply':
-                    est_circulating_supply = calculate_circulating_supply(economics)
-                    response = flask_server.response_class(
-                        response=str(est_circulating_supply),
-                        status=200,
-                        mimetype='text/plain'
-                    )
-                else:
-                    response = flask_server.response_class(
-                        response=f"Unsupported supply parameter: {parameter}",
-                        status=400,
-                        mimetype='text/plain'
-                    )
+                response = flask_server.response_class(
+                    response=self.supply_cache.get(parameter),
+                    status=200,
+                    mimetype='text/plain'
+                )
+            else:
+                response = flask_server.response_class(
+                    response=f"Unsupported supply parameter: {parameter}",
+                    status=400,
+                    mimetype='text/plain'
+                )
             return response
 
+        @flask_server.route('/supply_information/history', methods=["GET"])
+        def supply_information_history():
+            try:
+                from_date = request.args.get('from')
+                from_date = MayaDT.from_iso8601(from_date) if from_date else LAUNCH_DATE
+                to_date = request.args.get('to')
+                to_date = MayaDT.from_iso8601(to_date) if to_date else maya.now()
+                step = int(request.args.get('step', self.SUPPLY_HISTORY_DEFAULT_STEP))
+            except ValueError as e:
+                return flask_server.response_class(response=f"Invalid supply history parameters: {e}",
+                                                   status=400,
+                                                   mimetype='text/plain')
+
+            if step <= 0 or to_date.epoch < from_date.epoch:
+                return flask_server.response_class(response="Supply history requires from <= to and step > 0 days",
+                                                   status=400,
+                                                   mimetype='text/plain')
+
+            num_points = int((to_date.epoch - from_date.epoch) // (step * 24 * 60 * 60)) + 1
+            if num_points > self.SUPPLY_HISTORY_MAX_POINTS:
+                return flask_server.response_class(response=f"Supply history limited to "
+                                                            f"{self.SUPPLY_HISTORY_MAX_POINTS} points; "
+                                                            f"increase step or reduce the time range",
+                                                   status=400,
+                                                   mimetype='text/plain')
+
+            unavailable = supply_information_unavailable()
+            if unavailable is not None:
+                return unavailable
+
+            timestamps = [from_date.add(days=step * i) for i in range(num_points)]
+            schedule = calculate_vesting_schedule(economics=self.supply_cache.economics, timestamps=timestamps)
+            return flask_server.response_class(response=json.dumps(schedule),
+                                               status=200,
+                                               mimetype='application/json')
+
     def make_dash_app(self, flask_server: Flask, route_url: str, debug: bool = False):
         dash_app = Dash(name=__name__,
                         server=flask_server,
@@ -173,9 +279,10 @@ class Dashboard:
                 return events()
 
         def events():
-            prior_periods = 30  # TODO more thought? (note: retention for the db is 5w - so anything longer is useless)
-            events_data = self.influx_client.get_historical_events(days=prior_periods)
-            events_table = components.events_table(network=self.network, events=events_data, days=prior_periods)
+            events_data = self.events_cache.get_events()
+            events_table = components.events_table(network=self.network,
+                                                   events=events_data,
+                                                   days=self.events_cache.days)
             return events_table
 
         def known_nodes(latest_crawler_stats):
@@ -234,20 +341,17 @@ class Dashboard:
 
         @dash_app.callback(Output('domain', 'children'), [Input('url', 'pathname')])  # on page-load
         def domain(pathname):
-            chain = self.staking_agent.blockchain.client.chain_name
+            chain = self.metadata.chain_name
             network_and_chain = f'{self.network.capitalize()} | {chain}'
             return html.Div([html.H4('Network'), html.H5(network_and_chain, id="domain-value")])
 
         @dash_app.callback(Output('registry', 'children'), [Input('url', 'pathname')])  # on page-load
         def registry(pathname):
-            latest = InMemoryContractRegistry.from_latest_publication(network=self.network)
-            return html.Div([html.H4('Registry'), html.H5(latest.id[:16], id="registry-value")])
-
-        @dash_app.callback(Output('contracts', 'children'),
-                           [Input('domain', 'children')])  # after domain obtained to prevent concurrent blockchain requests
-        def contracts(domain):
-            agents = (self.token_agent, self.staking_agent, self.policy_agent, self.adjudicator_agent)
-            rows = [make_contract_row(self.network, agent) for agent in agents]
+            return html.Div([html.H4('Registry'), html.H5(self.metadata.registry_id[:16], id="registry-value")])
+
+        @dash_app.callback(Output('contracts', 'children'), [Input('url', 'pathname')])  # on page-load
+        def contracts(pathname):
+            rows = [make_contract_row(self.network, contract) for contract in self.metadata.contracts]
             _components = html.Div([html.H4('Contracts'), *rows], id='contract-names')
             return _components
 
@@ -278,7 +382,9 @@ class Dashboard:
                            [State('cached-crawler-stats', 'children')])
         def nodes_geographical_locations(n, latest_crawler_stats):
             data = self.verify_cached_stats(latest_crawler_stats)
-            nodes_map = nodes_geolocation_map(nodes_dict=data['node_details'], ip2loc=self.ip2loc)
+            nodes_map = nodes_geolocation_map(nodes_dict=data['node_details'],
+                                              ip2loc=self.ip2loc,
+                                              geolocations=self._geolocations)
             return nodes_map
 
         # @dash_app.callback(Output('prev-work-orders-graph', 'children'), [Input('daily-interval', 'n_intervals')])
@@ -1,14 +1,18 @@
 import os
 import sqlite3
+import threading
 from collections import OrderedDict
-from datetime import datetime, timedelta
-from typing import Dict, List
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Union
 
-from influxdb import InfluxDBClient
+import maya
+from influxdb.exceptions import InfluxDBServerError
 from maya import MayaDT
+from twisted.logger import Logger
 
-from monitor.crawler import CrawlerNodeStorage, Crawler
-from monitor.utils import collector
+from monitor.crawler import Crawler, CrawlerNodeStorage, NodeMetadataChanges
+from monitor.storage import SECONDS_PER_DAY, TimeSeriesStorage, InfluxDBStorage
+from monitor.utils import collector, CircuitBreaker, CircuitBreakerOpen, SQLiteConnectionPool
 from nucypher.config.constants import DEFAULT_CONFIG_ROOT
 
 
@@ -19,151 +23,381 @@ class CrawlerStorageClient:
     
     def __init__(self, db_filepath: str = DEFAULT_DB_FILEPATH):
         self._db_filepath = db_filepath
+        # dash threading means that connections need to be established in same thread as use
+        self._db_connections = SQLiteConnectionPool(db_filepath=db_filepath, read_only=True)
 
     def get_known_nodes_metadata(self) -> Dict:
-        # dash threading means that connection needs to be established in same thread as use
-        db_conn = sqlite3.connect(self._db_filepath)
-        try:
-            result = db_conn.execute(f"SELECT * FROM {CrawlerNodeStorage.NODE_DB_NAME} ORDER BY staker_address")
+        db_conn = self._db_connections.get()
+        result = db_conn.execute(f"SELECT * FROM {CrawlerNodeStorage.NODE_DB_NAME} ORDER BY staker_address")
+
+        # TODO use `pandas` package instead to automatically get dict?
+        known_nodes = OrderedDict()
+        column_names = [description[0] for description in result.description]
+        for row in result:
+            node_info = dict()
+            staker_address = row[0]
+            for idx, value in enumerate(row):
+                node_info[column_names[idx]] = row[idx]
+            known_nodes[staker_address] = node_info
 
-            # TODO use `pandas` package instead to automatically get dict?
-            known_nodes = OrderedDict()
+        return known_nodes
+
+    def get_known_nodes_metadata_changes(self, since_version: int = 0) -> NodeMetadataChanges:
+        """
+        Returns the metadata of nodes changed since the provided change version, and the addresses of nodes
+        removed since then, along with the latest change version to provide next time.
+        """
+        db_conn = self._db_connections.get()
+        version_column = CrawlerNodeStorage.NODE_DB_CHANGE_VERSION[0]
+        db_conn.execute('BEGIN')  # consistent snapshot across tables
+        try:
+            result = db_conn.execute(f"SELECT * FROM {CrawlerNodeStorage.NODE_DB_NAME} "
+                                     f"WHERE {version_column} > ? ORDER BY staker_address", (since_version, ))
+            changed = OrderedDict()
             column_names = [description[0] for description in result.description]
             for row in result:
-                node_info = dict()
-                staker_address = row[0]
-                for idx, value in enumerate(row):
-                    node_info[column_names[idx]] = row[idx]
-                known_nodes[staker_address] = node_info
+                changed[row[0]] = dict(zip(column_names, row))
+
+            removed = [row[0] for row in db_conn.execute(f"SELECT staker_address "
+                                                         f"FROM {CrawlerNodeStorage.NODE_TOMBSTONE_DB_NAME} "
+                                                         f"WHERE {version_column} > ?", (since_version, ))]
 
-            return known_nodes
+            version = since_version
+            for table in [CrawlerNodeStorage.NODE_DB_NAME, CrawlerNodeStorage.NODE_TOMBSTONE_DB_NAME]:
+                latest, = db_conn.execute(f"SELECT MAX({version_column}) FROM {table}").fetchone()
+                version = max(version, latest or 0)
         finally:
-            db_conn.close()
+            db_conn.commit()
+
+        return NodeMetadataChanges(version=version, changed=changed, removed=removed)
 
     @collector(label="Previous Fleet States")
     def get_previous_states_metadata(self, limit: int = 20) -> List[Dict]:
-        # dash threading means that connection needs to be established in same thread as use
-        db_conn = sqlite3.connect(self._db_filepath)
+        db_conn = self._db_connections.get()
         states_dict_list = []
-        try:
-            result = db_conn.execute(f"SELECT * FROM {CrawlerNodeStorage.STATE_DB_NAME} "
-                                     f"ORDER BY datetime(updated) DESC LIMIT {limit}")
+        # served from the index on updated
+        result = db_conn.execute(f"SELECT * FROM {CrawlerNodeStorage.STATE_DB_NAME} "
+                                 f"ORDER BY updated DESC LIMIT ?", (limit, ))
 
-            # TODO use `pandas` package instead to automatically get dict?
-            column_names = [description[0] for description in result.description]
-            for row in result:
-                state_info = dict()
-                for idx, value in enumerate(row):
-                    column_name = column_names[idx]
-                    if column_name == 'updated':
-                        # convert column from rfc3339 (for sorting) back to rfc2822
-                        # TODO does this matter for displaying? - it doesn't, but rfc2822 is easier on the eyes
-                        state_info[column_name] = MayaDT.from_rfc3339(row[idx]).rfc2822()
-                    else:
-                        state_info[column_name] = row[idx]
-                states_dict_list.append(state_info)
-
-            return states_dict_list
-        finally:
-            db_conn.close()
+        # TODO use `pandas` package instead to automatically get dict?
+        column_names = [description[0] for description in result.description]
+        for row in result:
+            state_info = dict()
+            for idx, value in enumerate(row):
+                column_name = column_names[idx]
+                if column_name == 'updated':
+                    # convert column from epoch (for sorting) back to rfc2822
+                    # TODO does this matter for displaying? - it doesn't, but rfc2822 is easier on the eyes
+                    state_info[column_name] = MayaDT(row[idx]).rfc2822()
+                else:
+                    state_info[column_name] = row[idx]
+            states_dict_list.append(state_info)
+
+        return states_dict_list
 
     @collector(label="Latest Teacher")
     def get_current_teacher_checksum(self):
+        db_conn = self._db_connections.get()
+        row = db_conn.execute(f"SELECT checksum_address from {CrawlerNodeStorage.TEACHER_DB_NAME} LIMIT 1").fetchone()
+        return row[0] if row else None
+
+    def close(self):
+        self._db_connections.close()
+
+
+class DailyAggregateCache:
+    """
+    Cache of per-day aggregate values for days that have completed, and are therefore no longer expected to
+    change. Values are kept in memory, and optionally in an SQLite database so that they survive restarts.
+
+    Days without a value may still be filled by points written late (eg. replayed after a storage outage),
+    so they are only cached in memory for a limited time.
+    """
+    DB_TABLE_NAME = 'daily_aggregates'
+
+    MISSING_VALUE_TTL = 60 * 60  # seconds
+
+    def __init__(self, db_filepath: str = None):
+        self._db_filepath = db_filepath
+        self._lock = threading.Lock()
+        self._values = dict()  # (metric, day epoch) -> value
+        self._missing_values = dict()  # (metric, day epoch) -> expiry epoch
+        if db_filepath:
+            self._load()
+
+    def get(self, metric: str, day_epochs: List[int]) -> Dict[int, Union[int, float, None]]:
+        now = maya.now().epoch
+        with self._lock:
+            values = {day_epoch: self._values[(metric, day_epoch)] for day_epoch in day_epochs
+                      if (metric, day_epoch) in self._values}
+            values.update({day_epoch: None for day_epoch in day_epochs
+                           if self._missing_values.get((metric, day_epoch), 0) > now})
+            return values
+
+    def put(self, metric: str, values: Dict[int, Union[int, float, None]]) -> None:
+        expiry = maya.now().epoch + self.MISSING_VALUE_TTL
+        with self._lock:
+            for day_epoch, value in values.items():
+                if value is None:
+                    self._missing_values[(metric, day_epoch)] = expiry
+                else:
+                    self._missing_values.pop((metric, day_epoch), None)
+            values = {day_epoch: value for day_epoch, value in values.items() if value is not None}
+            if not values:
+                return
+            for day_epoch, value in values.items():
+                self._values[(metric, day_epoch)] = value
+            if self._db_filepath:
+                db_conn = sqlite3.connect(self._db_filepath)
+                try:
+                    with db_conn:
+                        db_conn.executemany(f"INSERT OR REPLACE INTO {self.DB_TABLE_NAME} VALUES(?,?,?)",
+                                            [(metric, day_epoch, value) for day_epoch, value in values.items()])
+                finally:
+                    db_conn.close()
+
+    def _load(self) -> None:
         db_conn = sqlite3.connect(self._db_filepath)
         try:
-            result = db_conn.execute(f"SELECT checksum_address from {CrawlerNodeStorage.TEACHER_DB_NAME} LIMIT 1")
-            for row in result:
-                return row[0]
-
-            return None
+            with db_conn:
+                # value column has no type affinity so that ints remain ints
+                db_conn.execute(f"CREATE TABLE IF NOT EXISTS {self.DB_TABLE_NAME} "
+                                f"(metric text, day integer, value, PRIMARY KEY (metric, day))")
+            for metric, day_epoch, value in db_conn.execute(f"SELECT metric, day, value FROM {self.DB_TABLE_NAME} "
+                                                            f"WHERE value IS NOT NULL"):
+                self._values[(metric, day_epoch)] = value
         finally:
             db_conn.close()
 
 
 class CrawlerInfluxClient:
     """
-    Performs operations on data in the Crawler DB.
+    Performs operations on data in the Crawler DB - InfluxDB unless other time series storage is provided.
 
     Helpful for data intensive long-running graphing calculations on historical data.
     """
-    def __init__(self, host, port, database):
-        self._client = InfluxDBClient(host=host, port=port, database=database)
+
+    # the daily tier continuous query may still update the previous day shortly after midnight
+    COMPLETED_DAY_SETTLE_TIME = 2 * 60 * 60  # seconds
+
+    # network metric -> network information field, the latest value of which is used for each day
+    NETWORK_METRICS = OrderedDict((
+        ('locked_stake', 'locked_stake'),
+        ('num_stakers', 'num_stakers'),
+    ))
+
+    # network metric -> (aggregate function, node information field) computed for each day; used for days
+    # before the crawler wrote network information, and for metrics that are not part of network information
+    NODE_INFO_NETWORK_METRICS = OrderedDict((
+        ('locked_stake', ('SUM', 'locked_stake')),
+        ('num_stakers', ('COUNT', 'locked_stake')),
+        ('work_orders', ('SUM', 'work_orders')),
+    ))
+
+    # queries are made from dashboard callback threads - bound how long they can be held by an unhealthy InfluxDB
+    QUERY_TIMEOUT = 5  # seconds
+    QUERY_ATTEMPTS = 1
+    QUERY_POOL_SIZE = 20  # connections shared by callback threads
+    CIRCUIT_FAILURE_THRESHOLD = 3
+    CIRCUIT_RESET_TIMEOUT = 30  # seconds
+
+    # storage unavailable, as opposed to an invalid query
+    STORAGE_FAILURES = (OSError, InfluxDBServerError, sqlite3.OperationalError, CircuitBreakerOpen)
+
+    def __init__(self, host, port, database, cache_db_filepath: str = None, storage: TimeSeriesStorage = None):
+        self.log = Logger(self.__class__.__name__)
+        if storage is None:
+            storage = InfluxDBStorage(host=host,
+                                      port=port,
+                                      database=database,
+                                      timeout=self.QUERY_TIMEOUT,
+                                      retries=self.QUERY_ATTEMPTS,
+                                      pool_size=self.QUERY_POOL_SIZE)
+        self._storage = storage
+        self._daily_cache = DailyAggregateCache(db_filepath=cache_db_filepath)
+        self._circuit_breaker = CircuitBreaker(failure_threshold=self.CIRCUIT_FAILURE_THRESHOLD,
+                                               reset_timeout=self.CIRCUIT_RESET_TIMEOUT,
+                                               failure_exceptions=self.STORAGE_FAILURES)
+        self._last_good_lock = threading.Lock()
+        self._last_good_network_metrics = dict()  # (days, metrics) -> network metrics
+
+    @property
+    def circuit_breaker(self) -> CircuitBreaker:
+        return self._circuit_breaker
 
     def get_historical_locked_tokens_over_range(self, days: int):
-        range_begin, range_end = self._get_range_bookends(days)
-        results = list(self._client.query(f"SELECT SUM(locked_stake) "
-                                          f"FROM ("
-                                          f"SELECT staker_address, current_period, "
-                                          f"LAST(locked_stake) "
-                                          f"AS locked_stake "
-                                          f"FROM {Crawler.NODE_MEASUREMENT} "
-                                          f"WHERE time >= '{MayaDT.from_datetime(range_begin).rfc3339()}' "
-                                          f"AND "
-                                          f"time < '{MayaDT.from_datetime(range_end).rfc3339()}' "
-                                          f"GROUP BY staker_address, time(1d)"
-                                          f") "
-                                          f"GROUP BY time(1d)").get_points())
+        # Note: all days may not have values eg. days before DB started getting populated
+        # As time progresses this should be less of an issue
+        return self._get_historical_network_metric(days=days, metric='locked_stake')
 
+    def get_historical_num_stakers_over_range(self, days: int):
         # Note: all days may not have values eg. days before DB started getting populated
         # As time progresses this should be less of an issue
-        locked_tokens_dict = OrderedDict()
-        for r in results:
-            locked_stake = r['sum']
-            # Dash accepts datetime objects for graphs
-            locked_tokens_dict[MayaDT.from_rfc3339(r['time']).datetime()] = locked_stake if locked_stake else 0
+        return self._get_historical_network_metric(days=days, metric='num_stakers')
 
-        return locked_tokens_dict
+    def get_historical_work_orders_over_range(self, days: int):
+        return self._get_historical_network_metric(days=days, metric='work_orders')
+
+    def get_historical_network_metrics(self, days: int, metrics: List[str] = None) -> Dict[str, List]:
+        """
+        Returns the daily network metrics over the range as aligned columns: 'time' (day epochs) and a column
+        per metric. Metrics are obtained by a single query of the network information written by the crawler
+        each round, and values for completed days are cached so that only today and any days not previously
+        obtained are queried. Days without network information, and metrics that are not part of network
+        information (work orders), are computed from per-staker node information.
+
+        If the storage is unavailable, the last metrics successfully obtained for the same range are returned.
+        """
+        metrics = list(metrics or self.NODE_INFO_NETWORK_METRICS)
+        unknown_metrics = [metric for metric in metrics if metric not in self.NODE_INFO_NETWORK_METRICS]
+        if unknown_metrics:
+            raise ValueError(f"Unknown network metrics {unknown_metrics}; "
+                             f"supported metrics are {list(self.NODE_INFO_NETWORK_METRICS)}")
+
+        key = (days, tuple(metrics))
+        try:
+            network_metrics = self._get_historical_network_metrics(days=days, metrics=metrics)
+        except self.STORAGE_FAILURES as e:
+            with self._last_good_lock:
+                last_good = self._last_good_network_metrics.get(key)
+            if last_good is None:
+                raise
+            self.log.warn(f"Using last obtained network metrics; storage unavailable: {e}")
+            return last_good
+
+        with self._last_good_lock:
+            self._last_good_network_metrics[key] = network_metrics
+        return network_metrics
+
+    def _get_historical_network_metrics(self, days: int, metrics: List[str]) -> Dict[str, List]:
 
-    def get_historical_num_stakers_over_range(self, days: int):
         range_begin, range_end = self._get_range_bookends(days)
-        results = list(self._client.query(f"SELECT COUNT(staker_address) FROM "
-                                          f"("
-                                            f"SELECT staker_address, LAST(locked_stake)"
-                                            f"FROM {Crawler.NODE_MEASUREMENT} WHERE "
-                                            f"time >= '{MayaDT.from_datetime(range_begin).rfc3339()}' AND "
-                                            f"time < '{MayaDT.from_datetime(range_end).rfc3339()}' "
-                                            f"GROUP BY staker_address, time(1d)"
-                                          f") "
-                                          "GROUP BY time(1d)").get_points())   # 1 day measurements
+        range_begin_epoch = MayaDT.from_datetime(range_begin).epoch
+        day_epochs = [range_begin_epoch + (day * SECONDS_PER_DAY) for day in range(days)]
 
-        # Note: all days may not have values eg. days before DB started getting populated
-        # As time progresses this should be less of an issue
-        num_stakers_dict = OrderedDict()
-        for r in results:
-            locked_stake = r['count']
+        completed_before = maya.now().epoch - self.COMPLETED_DAY_SETTLE_TIME
+        completed_day_epochs = [day_epoch for day_epoch in day_epochs
+                                if day_epoch + SECONDS_PER_DAY <= completed_before]
+        values = {metric: self._daily_cache.get(metric=self._cache_key(metric), day_epochs=completed_day_epochs)
+                  for metric in metrics}
+
+        missing_day_epochs = [day_epoch for day_epoch in day_epochs
+                              if any(day_epoch not in values[metric] for metric in metrics)]
+        if missing_day_epochs:
+            # single query from the earliest missing day - typically only today after warm-up
+            query_begin = MayaDT(missing_day_epochs[0]).datetime(naive=True)
+            columns = self._circuit_breaker.call(self._query_network_metrics,
+                                                 range_begin=query_begin,
+                                                 range_end=range_end,
+                                                 metrics=metrics)
+            result_epochs = columns.get('time', [])
+            for metric in metrics:
+                result_values = columns.get(metric, [None] * len(result_epochs))
+                values[metric].update(zip(result_epochs, result_values))
+                self._daily_cache.put(metric=self._cache_key(metric),
+                                      values={epoch: value for epoch, value in zip(result_epochs, result_values)
+                                              if epoch + SECONDS_PER_DAY <= completed_before})
+
+        epochs = sorted(set().union(*(metric_values.keys() for metric_values in values.values())))
+        network_metrics = OrderedDict(time=epochs)
+        for metric in metrics:
+            network_metrics[metric] = [values[metric].get(epoch) for epoch in epochs]
+
+        return network_metrics
+
+    def _query_network_metrics(self, range_begin: datetime, range_end: datetime, metrics: List[str]) -> Dict:
+        network_info_metrics = [metric for metric in metrics if metric in self.NETWORK_METRICS]
+        node_info_metrics = [metric for metric in metrics if metric not in self.NETWORK_METRICS]
+        if not node_info_metrics:
+            return self._query_network_info_metrics(range_begin=range_begin,
+                                                    range_end=range_end,
+                                                    metrics=network_info_metrics)
+
+        aggregates = OrderedDict((metric, self.NODE_INFO_NETWORK_METRICS[metric]) for metric in node_info_metrics)
+        columns = self._storage.query_node_info_aggregates(range_begin=range_begin,
+                                                           range_end=range_end,
+                                                           aggregates=aggregates)
+        if not network_info_metrics:
+            return columns
+
+        # days are aligned across both queries
+        values = {metric: dict(zip(columns.get('time', []), columns.get(metric, []))) for metric in node_info_metrics}
+        network_info_columns = self._query_network_info_metrics(range_begin=range_begin,
+                                                                range_end=range_end,
+                                                                metrics=network_info_metrics)
+        for metric in network_info_metrics:
+            values[metric] = dict(zip(network_info_columns.get('time', []), network_info_columns.get(metric, [])))
+
+        epochs = sorted(set().union(*(metric_values.keys() for metric_values in values.values())))
+        aligned_columns = OrderedDict(time=epochs)
+        for metric in metrics:
+            aligned_columns[metric] = [values[metric].get(epoch) for epoch in epochs]
+        return aligned_columns
+
+    def _query_network_info_metrics(self, range_begin: datetime, range_end: datetime, metrics: List[str]) -> Dict:
+        aggregates = OrderedDict((metric, self.NODE_INFO_NETWORK_METRICS[metric]) for metric in metrics)
+
+        # all fields are obtained so that days with network information are recognized
+        fields = list(OrderedDict.fromkeys(self.NETWORK_METRICS.values()))
+        network_columns = self._storage.query_network_info(range_begin=range_begin,
+                                                           range_end=range_end,
+                                                           fields=fields)
+        epochs = network_columns.get('time', [])
+        if not epochs:
+            # no network information over the range
+            return self._storage.query_node_info_aggregates(range_begin=range_begin,
+                                                            range_end=range_end,
+                                                            aggregates=aggregates)
+
+        columns = OrderedDict(time=epochs)
+        for metric in metrics:
+            columns[metric] = list(network_columns.get(self.NETWORK_METRICS[metric], [None] * len(epochs)))
+
+        rows = zip(*(network_columns.get(field, [None] * len(epochs)) for field in fields))
+        missing_epochs = [epoch for epoch, row in zip(epochs, rows) if all(value is None for value in row)]
+        if missing_epochs:
+            # days before network information was written
+            node_info_columns = self._storage.query_node_info_aggregates(
+                range_begin=MayaDT(missing_epochs[0]).datetime(naive=True),
+                range_end=MayaDT(missing_epochs[-1] + SECONDS_PER_DAY).datetime(naive=True),
+                aggregates=aggregates)
+            for metric in metrics:
+                fallback_values = dict(zip(node_info_columns.get('time', []), node_info_columns.get(metric, [])))
+                for index, epoch in enumerate(epochs):
+                    if epoch in missing_epochs:
+                        columns[metric][index] = fallback_values.get(epoch)
+
+        return columns
+
+    def _get_historical_network_metric(self, days: int, metric: str) -> Dict:
+        columns = self.get_historical_network_metrics(days=days, metrics=[metric])
+
+        daily_values = OrderedDict()
+        for epoch, value in zip(columns['time'], columns[metric]):
             # Dash accepts datetime objects for graphs
-            num_stakers_dict[MayaDT.from_rfc3339(r['time']).datetime()] = locked_stake if locked_stake else 0
+            daily_values[datetime.fromtimestamp(epoch, tz=timezone.utc)] = value if value else 0
 
-        return num_stakers_dict
+        return daily_values
 
-    def get_historical_work_orders_over_range(self, days: int):
-        range_begin, range_end = self._get_range_bookends(days)
-        results = list(self._client.query(f"SELECT SUM(work_orders) FROM "
-                                          f"("
-                                            f"SELECT staker_address, LAST(work_orders)"
-                                            f"FROM {Crawler.NODE_MEASUREMENT} WHERE "
-                                            f"time >= '{MayaDT.from_datetime(range_begin).rfc3339()}' AND "
-                                            f"time < '{MayaDT.from_datetime(range_end).rfc3339()}' "
-                                            f"GROUP BY staker_address, time(1d)"
-                                          f") "
-                                          "GROUP BY time(1d)").get_points())   # 1 day measurements
-        work_orders_dict = OrderedDict()
-        for r in results:
-            num_work_orders = r['sum']
-            work_orders_dict[MayaDT.from_rfc3339(r['time']).datetime()] = num_work_orders if num_work_orders else 0
-
-        return work_orders_dict
-
-    def get_historical_events(self, days: int) -> List:
+    @classmethod
+    def _cache_key(cls, metric: str) -> str:
+        if metric in cls.NETWORK_METRICS:
+            return f'{Crawler.NETWORK_MEASUREMENT}.{cls.NETWORK_METRICS[metric]}'
+        aggregate, field = cls.NODE_INFO_NETWORK_METRICS[metric]
+        return f'{Crawler.NODE_MEASUREMENT}.{aggregate}({field})'
+
+    def get_historical_events(self, days: int, since: MayaDT = None) -> List:
         range_begin, range_end = self._get_range_bookends(days)
-        results = list(self._client.query(f"SELECT * FROM {Crawler.EVENT_MEASUREMENT} WHERE "
-                                          f"time >= '{MayaDT.from_datetime(range_begin).rfc3339()}' AND "
-                                          f"time < '{MayaDT.from_datetime(range_end).rfc3339()}' "
-                                          f"ORDER BY time DESC").get_points())  # decreasing order
-        return results
+        range_begin = MayaDT.from_datetime(range_begin)
+        if since is not None and since.epoch > range_begin.epoch:
+            # only events at/after the provided time are of interest
+            range_begin = since
+        return self._circuit_breaker.call(self._storage.query_events,
+                                          range_begin=range_begin.datetime(naive=True),
+                                          range_end=range_end)
 
     def close(self):
-        self._client.close()
+        self._storage.close()
 
     @staticmethod
     def _get_range_bookends(days: int):
@@ -173,3 +407,76 @@ class CrawlerInfluxClient:
         range_begin = range_end - timedelta(days=days)
 
         return range_begin, range_end
+
+
+class HistoricalEventsCache:
+    """
+    Process-level cache of the network events for a sliding window of days.
+
+    The window is loaded from InfluxDB once, and subsequent refreshes only fetch events newer than the
+    latest cached event (high-water mark); events that fall out of the window are dropped. The cache is
+    shared by all dashboard sessions and refreshed at most once per TTL.
+    """
+    DEFAULT_TTL = 60  # seconds
+
+    def __init__(self, influx_client: CrawlerInfluxClient, days: int, ttl: int = DEFAULT_TTL):
+        self._influx_client = influx_client
+        self._days = days
+        self._ttl = ttl
+
+        self.log = Logger(self.__class__.__name__)
+        self._lock = threading.Lock()
+        self._events = list()  # list of (event epoch, event info) in decreasing order of time
+        self._high_water_mark = None
+        self._last_refresh = None
+
+    @property
+    def days(self) -> int:
+        return self._days
+
+    def get_events(self) -> List[Dict]:
+        with self._lock:
+            now = maya.now()
+            if self._last_refresh is None or (now - self._last_refresh).total_seconds() >= self._ttl:
+                try:
+                    self._refresh()
+                except CrawlerInfluxClient.STORAGE_FAILURES as e:
+                    # serve the events obtained so far; retried after the TTL
+                    self.log.warn(f"Unable to refresh events, storage unavailable: {e}")
+                self._last_refresh = now
+            return [event_info for _, event_info in self._events]
+
+    def _refresh(self):
+        if self._high_water_mark is None:
+            # initial load of the entire window
+            new_events = self._influx_client.get_historical_events(days=self._days)
+            known_at_high_water_mark = set()
+        else:
+            new_events = self._influx_client.get_historical_events(days=self._days,
+                                                                   since=MayaDT(self._high_water_mark))
+            # events with the same timestamp as the high-water mark may already be cached
+            known_at_high_water_mark = {self._event_key(event_info) for epoch, event_info in self._events
+                                        if epoch == self._high_water_mark}
+
+        # events are returned in decreasing order of time - only newly obtained events need to be parsed
+        fresh_events = list()
+        for event_info in new_events:
+            if self._event_key(event_info) in known_at_high_water_mark:
+                continue
+            fresh_events.append((MayaDT.from_rfc3339(event_info['time']).epoch, event_info))
+
+        events = fresh_events + self._events
+
+        # drop events that are no longer within the window
+        range_begin, _ = self._influx_client._get_range_bookends(self._days)
+        range_begin_epoch = MayaDT.from_datetime(range_begin).epoch
+        while events and events[-1][0] < range_begin_epoch:
+            events.pop()
+
+        self._events = events
+        if events:
+            self._high_water_mark = events[0][0]
+
+    @staticmethod
+    def _event_key(event_info: Dict):
+        return event_info['time'], event_info['txhash'], event_info['event_name'], event_info.get('log_index')
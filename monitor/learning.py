@@ -0,0 +1,90 @@
+import threading
+import time
+from typing import Dict, List
+
+
+class TeacherStatistics:
+    """
+    Response latency and error rate of teachers, as exponentially weighted moving averages, used to prefer
+    fast and healthy teachers. Teachers that fail a number of consecutive times are quarantined for a while.
+    """
+
+    DEFAULT_SMOOTHING = 0.3  # weight of the latest observation
+    DEFAULT_FAILURE_PENALTY = 10  # seconds; a failure costs up to the learning timeout
+    DEFAULT_UNMEASURED_LATENCY = 2  # seconds; teachers without observations rank behind faster teachers
+    DEFAULT_QUARANTINE_FAILURES = 3  # consecutive failures
+    DEFAULT_QUARANTINE_PERIOD = 60 * 10  # seconds
+
+    def __init__(self,
+                 smoothing: float = DEFAULT_SMOOTHING,
+                 failure_penalty: float = DEFAULT_FAILURE_PENALTY,
+                 unmeasured_latency: float = DEFAULT_UNMEASURED_LATENCY,
+                 quarantine_failures: int = DEFAULT_QUARANTINE_FAILURES,
+                 quarantine_period: float = DEFAULT_QUARANTINE_PERIOD):
+        self._smoothing = smoothing
+        self._failure_penalty = failure_penalty
+        self._unmeasured_latency = unmeasured_latency
+        self._quarantine_failures = quarantine_failures
+        self._quarantine_period = quarantine_period
+
+        self._lock = threading.Lock()
+        self._teachers = dict()  # checksum address -> teacher statistics
+
+    def record_success(self, checksum_address: str, latency: float) -> None:
+        self._record(checksum_address, latency=latency, failed=False)
+
+    def record_failure(self, checksum_address: str, latency: float) -> None:
+        self._record(checksum_address, latency=latency, failed=True)
+
+    def is_quarantined(self, checksum_address: str) -> bool:
+        with self._lock:
+            teacher = self._teachers.get(checksum_address)
+            return teacher is not None and teacher['quarantined_until'] > time.monotonic()
+
+    def score(self, checksum_address: str) -> float:
+        """Expected cost (seconds) of learning from the teacher; lower is better."""
+        with self._lock:
+            teacher = self._teachers.get(checksum_address)
+            if teacher is None:
+                return self._unmeasured_latency
+            return teacher['latency'] + teacher['error_rate'] * self._failure_penalty
+
+    def rank(self, nodes: List) -> List:
+        """
+        Returns the nodes that are not quarantined, best teacher first. If every node is quarantined, all nodes
+        are returned instead so that learning can continue. Ties keep the order of the provided nodes.
+        """
+        healthy = [node for node in nodes if not self.is_quarantined(node.checksum_address)]
+        return sorted(healthy or nodes, key=lambda node: self.score(node.checksum_address))
+
+    @property
+    def stats(self) -> Dict:
+        now = time.monotonic()
+        with self._lock:
+            return {checksum_address: {'latency': round(teacher['latency'], 3),
+                                       'error_rate': round(teacher['error_rate'], 3),
+                                       'rounds': teacher['rounds'],
+                                       'failures': teacher['failures'],
+                                       'quarantined': teacher['quarantined_until'] > now}
+                    for checksum_address, teacher in self._teachers.items()}
+
+    def _record(self, checksum_address: str, latency: float, failed: bool) -> None:
+        with self._lock:
+            teacher = self._teachers.get(checksum_address)
+            if teacher is None:
+                # first observation seeds the averages
+                teacher = {'latency': latency, 'error_rate': float(failed), 'rounds': 0, 'failures': 0,
+                           'quarantined_until': 0}
+                self._teachers[checksum_address] = teacher
+            else:
+                teacher['latency'] += self._smoothing * (latency - teacher['latency'])
+                teacher['error_rate'] += self._smoothing * (float(failed) - teacher['error_rate'])
+            teacher['rounds'] += 1
+
+            if not failed:
+                teacher['failures'] = 0
+                return
+            teacher['failures'] += 1
+            if teacher['failures'] >= self._quarantine_failures:
+                teacher['quarantined_until'] = time.monotonic() + self._quarantine_period
+                teacher['failures'] = 0  # quarantined again after as many failures once released
@@ -0,0 +1,79 @@
+from collections import OrderedDict, namedtuple
+from typing import Dict, Tuple
+
+from nucypher.blockchain.economics import EconomicsFactory
+from nucypher.blockchain.eth.agents import (
+    ContractAgency,
+    NucypherTokenAgent,
+    StakingEscrowAgent,
+    PolicyManagerAgent,
+    AdjudicatorAgent
+)
+from nucypher.blockchain.eth.registry import BaseContractRegistry
+from twisted.logger import Logger
+
+ContractMetadata = namedtuple('ContractMetadata', ['name', 'address', 'version'])
+
+
+class NetworkMetadata:
+    """
+    Chain, contract, and economics metadata that only changes when the contract registry changes. It is
+    retrieved from the blockchain once and refreshed on registry updates, so that readers make no RPC calls.
+    """
+
+    AGENT_CLASSES = (NucypherTokenAgent, StakingEscrowAgent, PolicyManagerAgent, AdjudicatorAgent)
+
+    ECONOMICS_CONSTANTS = ('hours_per_period',
+                           'seconds_per_period',
+                           'minimum_locked_periods',
+                           'minimum_allowed_locked',
+                           'maximum_allowed_locked',
+                           'minimum_worker_periods',
+                           'maximum_rewarded_periods',
+                           'total_supply',
+                           'worklock_supply')
+
+    def __init__(self, registry: BaseContractRegistry):
+        self.log = Logger(self.__class__.__name__)
+        self._metadata = None
+        self.refresh(registry=registry)
+
+    def refresh(self, registry: BaseContractRegistry) -> None:
+        agents = [ContractAgency.get_agent(agent_class, registry=registry) for agent_class in self.AGENT_CLASSES]
+        client = agents[0].blockchain.client
+        contracts = tuple(ContractMetadata(name=agent.contract_name,
+                                           address=agent.contract_address,
+                                           version=agent.contract.version) for agent in agents)
+
+        economics = EconomicsFactory.get_economics(registry=registry)
+        economics_constants = OrderedDict((name, getattr(economics, name)) for name in self.ECONOMICS_CONSTANTS)
+
+        # replace all values at once so that readers never observe a partially refreshed state
+        self._metadata = {
+            'registry_id': registry.id,
+            'chain_name': client.chain_name,
+            'chain_id': client.chain_id,
+            'contracts': contracts,
+            'economics': economics_constants,
+        }
+        self.log.info(f"Loaded network metadata for registry {registry.id[:16]}")
+
+    @property
+    def registry_id(self) -> str:
+        return self._metadata['registry_id']
+
+    @property
+    def chain_name(self) -> str:
+        return self._metadata['chain_name']
+
+    @property
+    def chain_id(self) -> int:
+        return self._metadata['chain_id']
+
+    @property
+    def contracts(self) -> Tuple[ContractMetadata, ...]:
+        return self._metadata['contracts']
+
+    @property
+    def economics(self) -> Dict:
+        return self._metadata['economics']
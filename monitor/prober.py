@@ -0,0 +1,141 @@
+import socket
+import ssl
+import threading
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+import maya
+from twisted.logger import Logger
+
+ProbeResult = namedtuple('ProbeResult', ['reachable', 'handshake_latency', 'status_latency', 'error'])
+
+
+class NodeProber:
+    """
+    Probes the reachability of nodes independently of learning: a TLS connection is opened to each node's REST
+    address and its status page is requested, with a bounded number of connections in flight. Reachability and
+    histograms of handshake and status latencies are kept over a rolling window of probes per node.
+    """
+
+    STATUS_PATH = '/status'
+
+    DEFAULT_TIMEOUT = 5  # seconds
+    DEFAULT_MAX_IN_FLIGHT = 20  # connections
+    DEFAULT_WINDOW = 20  # probes per node
+
+    # upper bounds (seconds) of histogram buckets; slower latencies fall in a final unbounded bucket
+    LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+    def __init__(self,
+                 timeout: float = DEFAULT_TIMEOUT,
+                 max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+                 window: int = DEFAULT_WINDOW):
+        self.log = Logger(self.__class__.__name__)
+        self._timeout = timeout
+        self._max_in_flight = max_in_flight
+        self._window = window
+
+        # node certificates are self-signed; node identity is verified when learning, not when probing
+        self._ssl_context = ssl.create_default_context()
+        self._ssl_context.check_hostname = False
+        self._ssl_context.verify_mode = ssl.CERT_NONE
+
+        self._lock = threading.Lock()
+        self._probing = threading.Lock()
+        self._nodes = dict()  # staker address -> {'probes': recent probe results, 'last_reachable': datetime}
+
+    def probe(self, rest_url: str) -> ProbeResult:
+        """Probes the node at the REST address (host:port)."""
+        try:
+            host, port = rest_url.rsplit(':', 1)
+            start = time.monotonic()
+            with socket.create_connection((host, int(port)), timeout=self._timeout) as sock:
+                with self._ssl_context.wrap_socket(sock, server_hostname=host) as tls_sock:
+                    handshake_latency = time.monotonic() - start
+                    start = time.monotonic()
+                    request = f'GET {self.STATUS_PATH} HTTP/1.1\r\nHost: {rest_url}\r\nConnection: close\r\n\r\n'
+                    tls_sock.sendall(request.encode())
+                    with tls_sock.makefile('rb') as response:
+                        status_line = response.readline()
+                    status_latency = time.monotonic() - start
+        except (OSError, ValueError) as e:
+            return ProbeResult(reachable=False, handshake_latency=None, status_latency=None, error=str(e) or repr(e))
+
+        status = status_line.split()
+        if len(status) < 2 or not status[0].startswith(b'HTTP/'):
+            return ProbeResult(reachable=False, handshake_latency=handshake_latency, status_latency=None,
+                               error='Invalid status response')
+        error = None if status[1] == b'200' else f'Status {status[1].decode(errors="replace")}'
+        return ProbeResult(reachable=True, handshake_latency=handshake_latency, status_latency=status_latency,
+                           error=error)
+
+    def probe_nodes(self, rest_urls: Dict[str, str]) -> Optional[int]:
+        """
+        Probes nodes (staker address -> REST address) concurrently, and forgets nodes that are no longer provided.
+        Returns the number of reachable nodes, or None if a previous round is still in progress.
+        """
+        if not self._probing.acquire(blocking=False):
+            return None
+        try:
+            with self._lock:
+                for staker_address in set(self._nodes) - set(rest_urls):
+                    del self._nodes[staker_address]
+            if not rest_urls:
+                return 0
+
+            reachable = 0
+            with ThreadPoolExecutor(max_workers=min(self._max_in_flight, len(rest_urls))) as executor:
+                results = executor.map(self.probe, rest_urls.values())
+                for staker_address, result in zip(rest_urls, results):
+                    self.record(staker_address, result)
+                    reachable += result.reachable
+            return reachable
+        finally:
+            self._probing.release()
+
+    def record(self, staker_address: str, result: ProbeResult) -> None:
+        with self._lock:
+            node = self._nodes.get(staker_address)
+            if node is None:
+                node = {'probes': deque(maxlen=self._window), 'last_reachable': None}
+                self._nodes[staker_address] = node
+            node['probes'].append(result)
+            if result.reachable:
+                node['last_reachable'] = maya.now()
+
+    def node_stats(self, staker_address: str) -> Optional[Dict]:
+        """Returns the reachability of the node over recent probes, or None if the node was not yet probed."""
+        with self._lock:
+            node = self._nodes.get(staker_address)
+            if node is None:
+                return None
+            probes, last_reachable = list(node['probes']), node['last_reachable']
+
+        reachable_probes = [probe for probe in probes if probe.reachable]
+        last_probe = probes[-1]
+        return {'reachable': last_probe.reachable,
+                'reachability': len(reachable_probes) / len(probes),
+                'probes': len(probes),
+                'last_reachable': last_reachable.iso8601() if last_reachable else None,
+                'error': last_probe.error,
+                'handshake_latency': self._histogram(probe.handshake_latency for probe in reachable_probes),
+                'status_latency': self._histogram(probe.status_latency for probe in reachable_probes)}
+
+    @property
+    def stats(self) -> Dict:
+        with self._lock:
+            probed = len(self._nodes)
+            reachable = sum(1 for node in self._nodes.values() if node['probes'][-1].reachable)
+        return {'probed': probed, 'reachable': reachable}
+
+    @classmethod
+    def _histogram(cls, latencies) -> Dict[str, int]:
+        """Count of latencies per bucket, labelled by upper bound."""
+        histogram = {str(bound): 0 for bound in cls.LATENCY_BUCKETS}
+        histogram['inf'] = 0
+        for latency in latencies:
+            label = next((str(bound) for bound in cls.LATENCY_BUCKETS if latency <= bound), 'inf')
+            histogram[label] += 1
+        return histogram
@@ -0,0 +1,145 @@
+import json
+import os
+import tempfile
+import threading
+from typing import Callable, List, Optional
+
+from nucypher.blockchain.eth.registry import (
+    BaseContractRegistry,
+    InMemoryContractRegistry,
+    RegistrySourceManager
+)
+from nucypher.config.constants import DEFAULT_CONFIG_ROOT
+from twisted.internet import reactor
+from twisted.internet.task import LoopingCall
+from twisted.logger import Logger
+
+
+class ContractRegistryCache:
+    """
+    Local disk cache of the latest published contract registry for a network. The cached registry is used at
+    startup, and the latest publication is periodically fetched in the background; subscribers are notified
+    whenever the registry ID changes so that agents can be reloaded.
+    """
+
+    DEFAULT_REFRESH_RATE = 60 * 60  # seconds
+    REGISTRY_FILE_NAME = 'monitor_{network}_' + BaseContractRegistry.REGISTRY_NAME
+
+    def __init__(self,
+                 network: str,
+                 cache_filepath: str = None,
+                 refresh_rate: int = DEFAULT_REFRESH_RATE,
+                 source_manager: RegistrySourceManager = None):
+        self.log = Logger(self.__class__.__name__)
+        self.network = network
+        self.cache_filepath = cache_filepath or os.path.join(DEFAULT_CONFIG_ROOT,
+                                                             self.REGISTRY_FILE_NAME.format(network=network))
+        self._refresh_rate = refresh_rate
+        self._source_manager = source_manager
+
+        self._lock = threading.Lock()
+        self._registry = None
+        self._subscribers = list()  # type: List[Callable[[BaseContractRegistry], None]]
+
+        self.__refreshing = False
+        self._refresh_task = LoopingCall(f=self.refresh)
+
+    @property
+    def registry(self) -> BaseContractRegistry:
+        """
+        The current registry. If no registry has been loaded yet, the disk cache is used; the latest
+        publication is only fetched (blocking) if there is no usable disk cache.
+        """
+        if self._registry is None:
+            with self._lock:
+                if self._registry is None:
+                    registry = self._read_cache()
+                    if registry is None:
+                        registry = self._fetch_latest()
+                        self._write_cache(registry)
+                    self._registry = registry
+        return self._registry
+
+    def subscribe(self, callback: Callable[[BaseContractRegistry], None]) -> None:
+        """Registers a callback that is called with the new registry whenever the registry ID changes."""
+        self._subscribers.append(callback)
+
+    def start(self, now: bool = True) -> None:
+        if not self._refresh_task.running:
+            self._refresh_task.start(interval=self._refresh_rate, now=now)
+
+    def stop(self) -> None:
+        if self._refresh_task.running:
+            self._refresh_task.stop()
+
+    def refresh(self, threaded: bool = True) -> Optional[BaseContractRegistry]:
+        """
+        Fetches the latest registry publication and replaces the cached registry if its ID differs.
+        Returns the new registry if it changed, otherwise None.
+        """
+        if threaded:
+            if self.__refreshing:
+                self.log.debug("Skipping Round - Registry refresh thread is already running")
+                return
+            return reactor.callInThread(self.refresh, threaded=False)
+
+        self.__refreshing = True
+        try:
+            latest = self._fetch_latest()
+        except Exception as e:
+            self.log.warn(f'Unable to fetch latest registry for {self.network}; continuing to use cached registry: {e}')
+            return None
+        finally:
+            self.__refreshing = False
+
+        with self._lock:
+            current = self._registry
+            if current is not None and current.id == latest.id:
+                return None
+            self._write_cache(latest)
+            self._registry = latest
+
+        if current is not None:
+            self.log.info(f"Registry for {self.network} changed from {current.id[:16]} to {latest.id[:16]}")
+            for callback in self._subscribers:
+                try:
+                    callback(latest)
+                except Exception as e:
+                    self.log.warn(f'Registry update subscriber failed: {e}')
+        return latest
+
+    def _fetch_latest(self) -> BaseContractRegistry:
+        source_manager = self._source_manager or RegistrySourceManager()
+        registry_data, source = source_manager.fetch_latest_publication(registry_class=InMemoryContractRegistry,
+                                                                        network=self.network)
+        registry = InMemoryContractRegistry(source=source)
+        registry.write(registry_data=json.loads(registry_data))
+        return registry
+
+    def _read_cache(self) -> Optional[BaseContractRegistry]:
+        try:
+            with open(self.cache_filepath, 'r') as cache_file:
+                registry_data = json.load(cache_file)
+        except FileNotFoundError:
+            return None
+        except ValueError:
+            self.log.warn(f'Ignoring invalid cached registry at {self.cache_filepath}')
+            return None
+
+        registry = InMemoryContractRegistry()
+        registry.write(registry_data=registry_data)
+        return registry
+
+    def _write_cache(self, registry: BaseContractRegistry) -> None:
+        # write to a temporary file and rename so that a partially written cache is never read
+        cache_dir = os.path.dirname(os.path.abspath(self.cache_filepath))
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, temp_filepath = tempfile.mkstemp(dir=cache_dir)
+        try:
+            with os.fdopen(fd, 'w') as temp_file:
+                json.dump(registry.read(), temp_file)
+            os.replace(temp_filepath, self.cache_filepath)
+        except OSError as e:
+            self.log.warn(f'Unable to write registry cache to {self.cache_filepath}: {e}')
+            if os.path.exists(temp_filepath):
+                os.remove(temp_filepath)
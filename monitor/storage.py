@@ -0,0 +1,808 @@
+import gzip
+import math
+import os
+import re
+import socket
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, defaultdict
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Tuple, Union, Optional
+
+import requests
+from influxdb import InfluxDBClient
+from influxdb.resultset import ResultSet
+from maya import MayaDT
+from nucypher.config.constants import DEFAULT_CONFIG_ROOT
+from twisted.logger import Logger
+
+from monitor.crawler import Crawler, InfluxTier
+from monitor.utils import escape_field_string, escape_tag_value
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+INFLUX_DURATION_UNITS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': SECONDS_PER_DAY, 'w': 7 * SECONDS_PER_DAY}
+
+
+def _duration_to_seconds(duration: str) -> int:
+    """Converts a simple InfluxDB duration literal eg. '1h', '5w' to seconds."""
+    return int(duration[:-1]) * INFLUX_DURATION_UNITS[duration[-1]]
+
+
+FieldValue = Union[str, int, float, bool]
+
+
+def _split_line_protocol(text: str, separator: str, maxsplit: int = -1) -> List[str]:
+    """Splits on the separator, ignoring escaped separators and separators within quoted field values."""
+    parts = list()
+    current = list()
+    in_quotes = False
+    index = 0
+    while index < len(text):
+        char = text[index]
+        if char == '\\' and index + 1 < len(text):
+            current.append(text[index:index + 2])  # escapes are kept, and removed once split
+            index += 2
+            continue
+        if char == '"':
+            in_quotes = not in_quotes
+        elif char == separator and not in_quotes and (maxsplit < 0 or len(parts) < maxsplit):
+            parts.append(''.join(current))
+            current = list()
+            index += 1
+            continue
+        current.append(char)
+        index += 1
+    parts.append(''.join(current))
+    return parts
+
+
+def _unescape(token: str) -> str:
+    return re.sub(r'\\([, =])', r'\1', token)
+
+
+def _parse_field_value(value: str) -> FieldValue:
+    if value.startswith('"'):
+        return re.sub(r'\\(["\\])', r'\1', value[1:-1])
+    if value[-1] in ('i', 'u'):
+        return int(value[:-1])
+    if value in ('t', 'T', 'true', 'True', 'TRUE'):
+        return True
+    if value in ('f', 'F', 'false', 'False', 'FALSE'):
+        return False
+    return float(value)
+
+
+def parse_line_protocol(line: str) -> Tuple[str, Dict[str, str], Dict[str, FieldValue], Optional[int]]:
+    """Parses an InfluxDB line protocol point into its measurement, tags, fields and timestamp."""
+    sections = [section for section in _split_line_protocol(line.strip(), ' ') if section]
+    if len(sections) not in (2, 3):
+        raise ValueError(f"Invalid line protocol point: {line}")
+
+    key = _split_line_protocol(sections[0], ',')
+    measurement = _unescape(key[0])
+    tags = dict()
+    for tag in key[1:]:
+        tag_key, tag_value = _split_line_protocol(tag, '=', maxsplit=1)
+        tags[_unescape(tag_key)] = _unescape(tag_value)
+
+    fields = dict()
+    for field in _split_line_protocol(sections[1], ','):
+        field_key, field_value = _split_line_protocol(field, '=', maxsplit=1)
+        fields[_unescape(field_key)] = _parse_field_value(field_value)
+
+    timestamp = int(sections[2]) if len(sections) == 3 else None
+    return measurement, tags, fields, timestamp
+
+
+class TimeSeriesStorage(ABC):
+    """
+    Storage of crawler measurements written as InfluxDB line protocol points (second precision), and
+    the historical queries performed on them.
+    """
+
+    @abstractmethod
+    def initialize(self) -> None:
+        """Creates the database and any supporting structures, if not already present."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def write(self, lines: List[str]) -> None:
+        """Writes the line protocol points; raises an exception if they could not be written."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def query_node_info_aggregates(self,
+                                   range_begin: datetime,
+                                   range_end: datetime,
+                                   aggregates: Dict[str, Tuple[str, str]],
+                                   interval: str = '1d') -> Dict[str, List]:
+        """
+        Computes each aggregate, keyed by result column name, of the latest per-staker field values for each
+        interval over the range. Returns a list of values per column: 'time' (interval start epochs) and a column
+        per aggregate. Intervals without values are reported as None (0 for COUNT), or omitted if there are
+        no values in the range at all.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def query_network_info(self,
+                           range_begin: datetime,
+                           range_end: datetime,
+                           fields: List[str],
+                           interval: str = '1d') -> Dict[str, List]:
+        """
+        Returns the latest value of each network information field for each interval over the range, as a list of
+        values per column: 'time' (interval start epochs) and a column per field. Intervals without values are
+        reported as None, or omitted if there are no values in the range at all.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def query_events(self, range_begin: datetime, range_end: datetime) -> List[Dict]:
+        """Returns the network events over the range in decreasing order of time; times are rfc3339 strings."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_last_event_block_number(self) -> int:
+        raise NotImplementedError
+
+    @abstractmethod
+    def close(self) -> None:
+        raise NotImplementedError
+
+    @property
+    def stats(self) -> Dict:
+        return dict()
+
+
+class UDPLineProtocolSender:
+    """
+    Fire-and-forget sender of line protocol points to an InfluxDB UDP listener. Points are packed into
+    datagrams no larger than the MTU; points that cannot be sent are dropped and counted.
+    """
+
+    MAX_DATAGRAM_SIZE = 1472  # bytes; 1500 byte ethernet MTU less IPv4 (20) and UDP (8) headers
+
+    def __init__(self, host: str, port: int, max_datagram_size: int = MAX_DATAGRAM_SIZE):
+        self._address = (socket.gethostbyname(host), port)  # resolved once, not per datagram
+        self._max_datagram_size = max_datagram_size
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.setblocking(False)
+        self._stats = {'datagrams_sent': 0, 'points_sent': 0, 'datagrams_dropped': 0, 'points_dropped': 0}
+
+    @property
+    def stats(self) -> Dict:
+        return dict(self._stats)
+
+    def send(self, lines: List[str]) -> None:
+        datagram = bytearray()
+        num_points = 0
+        for line in lines:
+            point = self._to_nanosecond_precision(line).encode('utf-8') + b'\n'
+            if len(point) > self._max_datagram_size:
+                self._stats['points_dropped'] += 1  # never fits in a datagram
+                continue
+            if len(datagram) + len(point) > self._max_datagram_size:
+                self._send_datagram(datagram, num_points)
+                datagram = bytearray()
+                num_points = 0
+            datagram += point
+            num_points += 1
+        if datagram:
+            self._send_datagram(datagram, num_points)
+
+    def _send_datagram(self, datagram: bytearray, num_points: int) -> None:
+        try:
+            self._socket.sendto(datagram, self._address)
+        except OSError:
+            # eg. socket buffer full - not retried
+            self._stats['datagrams_dropped'] += 1
+            self._stats['points_dropped'] += num_points
+            return
+        self._stats['datagrams_sent'] += 1
+        self._stats['points_sent'] += num_points
+
+    @staticmethod
+    def _to_nanosecond_precision(line: str) -> str:
+        # the UDP listener uses its configured precision (nanoseconds by default) instead of a request parameter
+        point, _, timestamp = line.rstrip().rpartition(' ')
+        if point and timestamp.isdigit():
+            return f'{point} {timestamp}000000000'
+        return line.rstrip()
+
+    def close(self) -> None:
+        self._socket.close()
+
+
+class InfluxDBStorage(TimeSeriesStorage):
+    """
+    InfluxDB storage; node and network information are downsampled into coarser tiers by continuous queries,
+    and queries use the cheapest tier that covers the requested range.
+
+    Points are written over HTTP, or sent to the UDP listener when a UDP port is provided - the listener
+    must be configured to write to the database with its default (nanosecond) precision.
+    """
+
+    WRITE_HEADERS = {
+        'Content-Type': 'application/octet-stream',
+        'Content-Encoding': 'gzip',
+        'Accept': 'text/plain'
+    }
+
+    DEFAULT_MIGRATION_CHUNK_SIZE = 10000  # points
+
+    # downsampled measurements: (tiers - raw tier first, fields kept by downsampled tiers, series tags)
+    DOWNSAMPLED_MEASUREMENTS = ((Crawler.NODE_INFO_TIERS, Crawler.NODE_INFO_ROLLUP_FIELDS, ('staker_address', )),
+                                (Crawler.NETWORK_INFO_TIERS, Crawler.NETWORK_INFO_ROLLUP_FIELDS, ()))
+
+    def __init__(self,
+                 host,
+                 port,
+                 database: str = Crawler.INFLUX_DB_NAME,
+                 udp_port: int = None,
+                 timeout: float = None,
+                 retries: int = 3,
+                 pool_size: int = 10):
+        """
+        The timeout (seconds) applies to each request attempt, and `retries` is the total number of attempts
+        (0 to retry indefinitely). The client can be shared across threads; up to `pool_size` connections are kept.
+        """
+        self.log = Logger(self.__class__.__name__)
+        self._host = host
+        self._port = port
+        self._database = database
+        self._client = InfluxDBClient(host=host,
+                                      port=port,
+                                      database=database,
+                                      timeout=timeout,
+                                      retries=retries,
+                                      pool_size=pool_size)
+        self._udp_sender = UDPLineProtocolSender(host=host, port=udp_port) if udp_port else None
+
+    @property
+    def stats(self) -> Dict:
+        return self._udp_sender.stats if self._udp_sender else dict()
+
+    def initialize(self) -> None:
+        try:
+            db_list = self._client.get_list_database()
+        except requests.exceptions.ConnectionError:
+            raise ConnectionError(f"No connection to InfluxDB at {self._host}:{self._port}")
+        found_db = (list(filter(lambda db: db['name'] == self._database, db_list)))
+        if len(found_db) == 0:
+            # db not previously created
+            self.log.info(f'Database {self._database} not found, creating it')
+            self._client.create_database(self._database)
+            self._client.create_retention_policy(name=Crawler.INFLUX_RETENTION_POLICY_NAME,
+                                                 duration=Crawler.RETENTION,
+                                                 replication=Crawler.REPLICATION,
+                                                 database=self._database,
+                                                 default=True)
+        else:
+            self.log.info(f'Database {self._database} already exists, no need to create it')
+
+        self._initialize_downsampling()
+
+    def _initialize_downsampling(self) -> None:
+        retention_policies = self._client.get_list_retention_policies(database=self._database)
+        existing_retention_policies = {rp['name'] for rp in retention_policies}
+
+        continuous_queries = self._client.get_list_continuous_queries()
+        existing_continuous_queries = {cq['name'] for db_cqs in continuous_queries
+                                       for cq in db_cqs.get(self._database, [])}
+
+        for tiers, _, _ in self.DOWNSAMPLED_MEASUREMENTS:
+            for tier in tiers:
+                if tier.interval is None:
+                    continue  # raw data written directly by crawler
+
+                if tier.retention_policy not in existing_retention_policies:
+                    self.log.info(f'Creating retention policy {tier.retention_policy} ({tier.duration})')
+                    self._client.create_retention_policy(name=tier.retention_policy,
+                                                         duration=tier.duration,
+                                                         replication=Crawler.REPLICATION,
+                                                         database=self._database,
+                                                         default=False)
+                    existing_retention_policies.add(tier.retention_policy)
+
+                cq_name = f'cq_{tier.measurement}'
+                if cq_name not in existing_continuous_queries:
+                    self.log.info(f'Creating continuous query {cq_name} and backfilling from raw data')
+                    self._client.create_continuous_query(name=cq_name,
+                                                         select=self._rollup_query(tier),
+                                                         database=self._database,
+                                                         resample_opts=tier.resample_opts)
+                    # continuous queries only process new data - backfill the tier with existing raw data
+                    self._backfill_tier(tier)
+
+    def _backfill_tier(self, tier: InfluxTier) -> None:
+        self._client.query(self._rollup_query(tier, backfill=True), method='POST')
+
+    def _rollup_query(self, tier: InfluxTier, backfill: bool = False) -> str:
+        tiers, rollup_fields, series_tags = next(downsampled for downsampled in self.DOWNSAMPLED_MEASUREMENTS
+                                                 if tier in downsampled[0])
+        fields = ', '.join(f'LAST({field}) AS {field}' for field in rollup_fields)
+        raw_tier = tiers[0]
+        where_clause = f'WHERE time >= now() - {raw_tier.duration} ' if backfill else ''
+        group_by = ', '.join([f'time({tier.interval})', *series_tags])
+        return (f'SELECT {fields} '
+                f'INTO "{self._database}"."{tier.retention_policy}"."{tier.measurement}" '
+                f'FROM "{self._database}"."{raw_tier.retention_policy}"."{raw_tier.measurement}" '
+                f'{where_clause}'
+                f'GROUP BY {group_by}')
+
+    def write(self, lines: List[str]) -> None:
+        if self._udp_sender:
+            self._udp_sender.send(lines)
+            return
+
+        data = gzip.compress(('\n'.join(lines) + '\n').encode('utf-8'))
+        self._client.request(url='write',
+                             method='POST',
+                             params={'db': self._database, 'precision': 's'},
+                             data=data,
+                             expected_response_code=204,
+                             headers=self.WRITE_HEADERS)
+
+    def query_node_info_aggregates(self,
+                                   range_begin: datetime,
+                                   range_end: datetime,
+                                   aggregates: Dict[str, Tuple[str, str]],
+                                   interval: str = '1d') -> Dict[str, List]:
+        days = math.ceil((datetime.utcnow() - range_begin).total_seconds() / SECONDS_PER_DAY)
+        tier = self._select_tier(tiers=Crawler.NODE_INFO_TIERS, days=days, interval=interval)
+        return self._query_completed_and_current_intervals(query_tier=self._query_node_info_tier,
+                                                           tier=tier,
+                                                           raw_tier=Crawler.NODE_INFO_RAW_TIER,
+                                                           range_begin=range_begin,
+                                                           range_end=range_end,
+                                                           interval=interval,
+                                                           aggregates=aggregates)
+
+    def _query_node_info_tier(self,
+                              tier: InfluxTier,
+                              range_begin: datetime,
+                              range_end: datetime,
+                              aggregates: Dict[str, Tuple[str, str]],
+                              interval: str) -> Dict[str, List]:
+        time_filter = (f"time >= '{MayaDT.from_datetime(range_begin).rfc3339()}' AND "
+                       f"time < '{MayaDT.from_datetime(range_end).rfc3339()}'")
+        source = f'"{tier.retention_policy}"."{tier.measurement}"'
+        if tier.interval != interval:
+            # tier has more than one value per staker for each interval - use the latest
+            fields = list(OrderedDict.fromkeys(field for _, field in aggregates.values()))
+            latest_values = ', '.join(f'LAST({field}) AS {field}' for field in fields)
+            source = (f"("
+                      f"SELECT {latest_values} "
+                      f"FROM {source} WHERE {time_filter} "
+                      f"GROUP BY staker_address, time({interval})"
+                      f")")
+
+        selections = ', '.join(f'{aggregate}({field}) AS {name}' for name, (aggregate, field) in aggregates.items())
+        result_set = self._client.query(f"SELECT {selections} "
+                                        f"FROM {source} WHERE {time_filter} "
+                                        f"GROUP BY time({interval})",
+                                        epoch='s')
+        return self._decode_columns(result_set)
+
+    def query_network_info(self,
+                           range_begin: datetime,
+                           range_end: datetime,
+                           fields: List[str],
+                           interval: str = '1d') -> Dict[str, List]:
+        days = math.ceil((datetime.utcnow() - range_begin).total_seconds() / SECONDS_PER_DAY)
+        tier = self._select_tier(tiers=Crawler.NETWORK_INFO_TIERS, days=days, interval=interval)
+        return self._query_completed_and_current_intervals(query_tier=self._query_network_info_tier,
+                                                           tier=tier,
+                                                           raw_tier=Crawler.NETWORK_INFO_RAW_TIER,
+                                                           range_begin=range_begin,
+                                                           range_end=range_end,
+                                                           interval=interval,
+                                                           fields=fields)
+
+    def _query_network_info_tier(self,
+                                 tier: InfluxTier,
+                                 range_begin: datetime,
+                                 range_end: datetime,
+                                 fields: List[str],
+                                 interval: str) -> Dict[str, List]:
+        latest_values = ', '.join(f'LAST({field}) AS {field}' for field in fields)
+        result_set = self._client.query(f"SELECT {latest_values} "
+                                        f'FROM "{tier.retention_policy}"."{tier.measurement}" '
+                                        f"WHERE time >= '{MayaDT.from_datetime(range_begin).rfc3339()}' AND "
+                                        f"time < '{MayaDT.from_datetime(range_end).rfc3339()}' "
+                                        f"GROUP BY time({interval})",
+                                        epoch='s')
+        return self._decode_columns(result_set)
+
+    @staticmethod
+    def _query_completed_and_current_intervals(query_tier: Callable[..., Dict[str, List]],
+                                               tier: InfluxTier,
+                                               raw_tier: InfluxTier,
+                                               range_begin: datetime,
+                                               range_end: datetime,
+                                               interval: str,
+                                               **query_kwargs) -> Dict[str, List]:
+        """
+        Downsampled tiers are only updated periodically by continuous queries, so they are used for completed
+        intervals only; the current (incomplete) interval is obtained from the raw tier.
+        """
+        interval_seconds = _duration_to_seconds(interval)
+        now = int(time.time())
+        current_interval_begin = datetime.utcfromtimestamp(now - (now % interval_seconds))
+        if tier.interval is None or range_end <= current_interval_begin:
+            return query_tier(tier=tier, range_begin=range_begin, range_end=range_end, interval=interval,
+                              **query_kwargs)
+        if range_begin >= current_interval_begin:
+            return query_tier(tier=raw_tier, range_begin=range_begin, range_end=range_end, interval=interval,
+                              **query_kwargs)
+
+        completed_columns = query_tier(tier=tier, range_begin=range_begin, range_end=current_interval_begin,
+                                       interval=interval, **query_kwargs)
+        current_columns = query_tier(tier=raw_tier, range_begin=current_interval_begin, range_end=range_end,
+                                     interval=interval, **query_kwargs)
+        completed_rows = len(completed_columns.get('time', []))
+        current_rows = len(current_columns.get('time', []))
+        columns = OrderedDict.fromkeys([*completed_columns, *current_columns])
+        return {column: (list(completed_columns.get(column, [None] * completed_rows)) +
+                         list(current_columns.get(column, [None] * current_rows)))
+                for column in columns}
+
+    @staticmethod
+    def _decode_columns(result_set: ResultSet) -> Dict[str, List]:
+        """
+        Decodes the first series of a result set into a list of values per column, without creating a
+        dictionary per point. Times are epoch values when the query is performed with epoch precision.
+        """
+        series = result_set.raw.get('series')
+        if not series:
+            return dict()
+
+        columns = series[0]['columns']
+        rows = series[0].get('values') or []
+        if not rows:
+            return {column: list() for column in columns}
+        return {column: list(column_values) for column, column_values in zip(columns, zip(*rows))}
+
+    @staticmethod
+    def _select_tier(tiers: Tuple[InfluxTier, ...], days: int, interval: str = '1d') -> InfluxTier:
+        """
+        Returns the coarsest tier that is at least as granular as the interval and whose retention
+        covers the range; the raw tier (first) is used if no downsampled tier qualifies.
+        """
+        interval_seconds = _duration_to_seconds(interval)
+        range_seconds = days * SECONDS_PER_DAY
+        for tier in reversed(tiers):
+            if tier.interval is None:
+                continue
+            tier_interval_seconds = _duration_to_seconds(tier.interval)
+            if tier_interval_seconds > interval_seconds or interval_seconds % tier_interval_seconds:
+                continue  # tier not granular enough
+            if tier.duration != 'INF' and _duration_to_seconds(tier.duration) < range_seconds:
+                continue  # data for the range no longer retained by tier
+            return tier
+
+        return tiers[0]
+
+    def query_events(self, range_begin: datetime, range_end: datetime) -> List[Dict]:
+        results = list(self._client.query(f"SELECT * FROM {Crawler.EVENT_MEASUREMENT} WHERE "
+                                          f"time >= '{MayaDT.from_datetime(range_begin).rfc3339()}' AND "
+                                          f"time < '{MayaDT.from_datetime(range_end).rfc3339()}' "
+                                          f"ORDER BY time DESC").get_points())  # decreasing order
+        return results
+
+    def get_last_event_block_number(self) -> int:
+        # events not yet migrated from schema v1 are already known, so they are not collected again
+        for measurement in (Crawler.EVENT_MEASUREMENT, Crawler.LEGACY_EVENT_MEASUREMENT):
+            blocknumber_result = list(
+                self._client.query(f'SELECT MAX(block_number) from "{measurement}"').get_points())
+            if len(blocknumber_result) > 0:
+                return blocknumber_result[0]['max']
+
+        return 0
+
+    def migrate_legacy_events(self, chunk_size: int = DEFAULT_MIGRATION_CHUNK_SIZE) -> Iterator[int]:
+        """
+        Streams schema v1 events (tagged by transaction hash) into the current event measurement in time order,
+        a chunk at a time; yields the number of events migrated for each chunk. Legacy events have no log index,
+        so events with the same time and tags are numbered in order instead. Events of transactions already in the
+        current event measurement (eg. collected again by the crawler) are skipped, so that they are not
+        duplicated with different log indices. Migration can safely be repeated.
+        """
+        from_time = 0
+        migrated_at_from_time = 0  # events at from_time already migrated
+        log_indices = defaultdict(int)  # (time, contract name, event name) -> next log index
+        while True:
+            result_set = self._client.query(f'SELECT * FROM "{Crawler.LEGACY_EVENT_MEASUREMENT}" '
+                                            f'WHERE time >= {from_time}s '
+                                            f'ORDER BY time ASC '
+                                            f'LIMIT {chunk_size} OFFSET {migrated_at_from_time}',
+                                            epoch='s')
+            events = list(result_set.get_points())
+            if not events:
+                return
+
+            existing_events = self._client.query(f'SELECT txhash, block_number FROM "{Crawler.EVENT_MEASUREMENT}" '
+                                                 f"WHERE time >= {events[0]['time']}s "
+                                                 f"AND time <= {events[-1]['time']}s",
+                                                 epoch='s')
+            existing_transactions = {(event['txhash'], event['block_number'])
+                                     for event in existing_events.get_points()}
+
+            lines = list()
+            for event in events:
+                if (event['txhash'], event['block_number']) in existing_transactions:
+                    continue
+                key = (event['time'], event['contract_name'], event['event_name'])
+                lines.append(Crawler.EVENT_LINE_PROTOCOL.format(
+                    measurement=Crawler.EVENT_MEASUREMENT,
+                    contract_name=escape_tag_value(event['contract_name']),
+                    event_name=escape_tag_value(event['event_name']),
+                    log_index=log_indices[key],
+                    txhash=escape_field_string(event['txhash']),
+                    contract_address=escape_field_string(event['contract_address']),
+                    block_number=event['block_number'],
+                    args=escape_field_string(event['args']),
+                    timestamp=event['time']))
+                log_indices[key] += 1
+            if lines:
+                self.write(lines)
+
+            last_time = events[-1]['time']
+            at_last_time = sum(1 for event in events if event['time'] == last_time)
+            if last_time == from_time:
+                migrated_at_from_time += at_last_time
+            else:
+                from_time, migrated_at_from_time = last_time, at_last_time
+                log_indices = defaultdict(int, {key: index for key, index in log_indices.items()
+                                                if key[0] == last_time})
+            yield len(lines)
+
+    def drop_legacy_events(self) -> None:
+        self._client.query(f'DROP MEASUREMENT "{Crawler.LEGACY_EVENT_MEASUREMENT}"', method='POST')
+
+    def close(self) -> None:
+        self._client.close()
+        if self._udp_sender:
+            self._udp_sender.close()
+
+
+class SQLiteTimeSeriesStorage(TimeSeriesStorage):
+    """
+    Embedded storage of crawler measurements in an SQLite database, for deployments without an InfluxDB server.
+
+    Each measurement is a table with a column per tag and field, indexed by series (tags) and time. Tags are fixed
+    when the table is created, whereas fields are added as they are first written. Node and network information
+    are also rolled up into daily tables keeping the latest values (per staker) for each day, which serve daily
+    queries and outlive the raw data retention period.
+    """
+
+    DB_FILE_NAME = 'crawler-timeseries.sqlite'
+    DEFAULT_DB_FILEPATH = os.path.join(DEFAULT_CONFIG_ROOT, DB_FILE_NAME)
+
+    DAILY_ROLLUP_SUFFIX = '_1d'
+    DAILY_ROLLUP_MEASUREMENTS = (Crawler.NODE_MEASUREMENT, Crawler.NETWORK_MEASUREMENT)
+
+    RETENTION = _duration_to_seconds(Crawler.RETENTION)  # seconds; raw data only
+    PRUNE_INTERVAL = 60 * 60  # seconds
+
+    # InfluxQL aggregate -> SQLite aggregate
+    AGGREGATES = {'SUM': 'SUM', 'COUNT': 'COUNT', 'MEAN': 'AVG', 'MIN': 'MIN', 'MAX': 'MAX'}
+
+    IDENTIFIER_PATTERN = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+    def __init__(self, db_filepath: str):
+        self.log = Logger(self.__class__.__name__)
+        self._db_filepath = db_filepath
+        self._lock = threading.Lock()
+        self._last_prune = 0
+
+    def initialize(self) -> None:
+        # tables are created as measurements are first written
+        db_conn = sqlite3.connect(self._db_filepath)
+        db_conn.close()
+        self.log.info(f'Storing time series data in {self._db_filepath}')
+
+    def write(self, lines: List[str]) -> None:
+        now = int(time.time())
+        points = defaultdict(list)  # measurement -> [(tags, fields, timestamp)]
+        for line in lines:
+            if not line.strip():
+                continue
+            measurement, tags, fields, timestamp = parse_line_protocol(line)
+            points[measurement].append((tags, fields, now if timestamp is None else timestamp))
+
+        with self._lock:
+            db_conn = sqlite3.connect(self._db_filepath)
+            try:
+                with db_conn:
+                    for measurement, measurement_points in points.items():
+                        self._write_points(db_conn, measurement, measurement_points)
+                        if measurement in self.DAILY_ROLLUP_MEASUREMENTS:
+                            daily_points = [(tags, fields, timestamp - (timestamp % SECONDS_PER_DAY))
+                                            for tags, fields, timestamp in measurement_points]
+                            self._write_points(db_conn, measurement + self.DAILY_ROLLUP_SUFFIX, daily_points)
+
+                    if now - self._last_prune >= self.PRUNE_INTERVAL:
+                        self._prune(db_conn, before=now - self.RETENTION)
+                        self._last_prune = now
+            finally:
+                db_conn.close()
+
+    def _write_points(self, db_conn: sqlite3.Connection, table: str, points: List[Tuple]) -> None:
+        tag_keys = list(OrderedDict.fromkeys(key for tags, _, _ in points for key in tags))
+        field_keys = list(OrderedDict.fromkeys(key for _, fields, _ in points for key in fields))
+        self._ensure_table(db_conn, table, tag_keys=tag_keys, field_keys=field_keys)
+
+        # points with the same series and time replace each other
+        rows_by_columns = defaultdict(list)
+        for tags, fields, timestamp in points:
+            columns = ('time', *tags.keys(), *fields.keys())
+            rows_by_columns[columns].append((timestamp, *tags.values(), *fields.values()))
+        for columns, rows in rows_by_columns.items():
+            column_names = ', '.join(f'"{column}"' for column in columns)
+            placeholders = ', '.join('?' * len(columns))
+            db_conn.executemany(f'INSERT OR REPLACE INTO "{table}" ({column_names}) VALUES ({placeholders})', rows)
+
+    def _ensure_table(self, db_conn: sqlite3.Connection, table: str, tag_keys: List[str], field_keys: List[str]):
+        for identifier in (table, *tag_keys, *field_keys):
+            if not self.IDENTIFIER_PATTERN.match(identifier):
+                raise ValueError(f"Unsupported measurement, tag or field name '{identifier}'")
+
+        existing_columns = self._get_columns(db_conn, table)
+        if not existing_columns:
+            # field columns have no type affinity so that ints remain ints
+            columns = ', '.join(['time INTEGER NOT NULL',
+                                 *(f'"{tag}" TEXT' for tag in tag_keys),
+                                 *(f'"{field}"' for field in field_keys)])
+            series = ', '.join([*(f'"{tag}"' for tag in tag_keys), 'time'])
+            db_conn.execute(f'CREATE TABLE "{table}" ({columns})')
+            db_conn.execute(f'CREATE UNIQUE INDEX "{table}_series_time" ON "{table}" ({series})')
+            db_conn.execute(f'CREATE INDEX "{table}_time" ON "{table}" (time)')
+            return
+
+        # the series index and TEXT affinity only cover the tags of the table when created
+        series_tag_keys = [row[2] for row in db_conn.execute(f'PRAGMA index_info("{table}_series_time")')]
+        new_tag_keys = [tag for tag in tag_keys if tag not in series_tag_keys]
+        if new_tag_keys:
+            raise ValueError(f"Unsupported tags {new_tag_keys} for measurement '{table}'; "
+                             f"tags are {series_tag_keys[:-1]}")
+
+        for column in field_keys:
+            if column not in existing_columns:
+                db_conn.execute(f'ALTER TABLE "{table}" ADD COLUMN "{column}"')
+
+    @staticmethod
+    def _get_columns(db_conn: sqlite3.Connection, table: str) -> List[str]:
+        return [row[1] for row in db_conn.execute(f'PRAGMA table_info("{table}")')]
+
+    def _prune(self, db_conn: sqlite3.Connection, before: int) -> None:
+        tables = [row[0] for row in db_conn.execute("SELECT name FROM sqlite_master WHERE type='table'")]
+        for table in tables:
+            if table.endswith(self.DAILY_ROLLUP_SUFFIX):
+                continue  # rollups are retained indefinitely
+            db_conn.execute(f'DELETE FROM "{table}" WHERE time < ?', (before, ))
+
+    def query_node_info_aggregates(self,
+                                   range_begin: datetime,
+                                   range_end: datetime,
+                                   aggregates: Dict[str, Tuple[str, str]],
+                                   interval: str = '1d') -> Dict[str, List]:
+        interval_seconds = _duration_to_seconds(interval)
+        begin = MayaDT.from_datetime(range_begin).epoch
+        end = MayaDT.from_datetime(range_end).epoch
+
+        table = Crawler.NODE_MEASUREMENT
+        if interval_seconds % SECONDS_PER_DAY == 0:
+            table += self.DAILY_ROLLUP_SUFFIX  # already the latest value per staker for each day
+
+        for aggregate, _ in aggregates.values():
+            if aggregate not in self.AGGREGATES:
+                raise ValueError(f"Unsupported aggregate {aggregate}; supported aggregates are {list(self.AGGREGATES)}")
+
+        values = dict()  # interval start -> row of aggregate values
+        db_conn = sqlite3.connect(self._db_filepath)
+        try:
+            columns = self._get_columns(db_conn, table)
+            if columns:
+                fields = list(OrderedDict.fromkeys(field for _, field in aggregates.values()))
+                # fields never written are null
+                latest_values = ', '.join(f'n."{field}" AS "{field}"' if field in columns else f'NULL AS "{field}"'
+                                          for field in fields)
+                selections = ', '.join(f'{self.AGGREGATES[aggregate]}("{field}")'
+                                       for aggregate, field in aggregates.values())
+                rows = db_conn.execute(f'SELECT bucket, {selections} FROM ('
+                                       f'SELECT n.time - (n.time % :interval) AS bucket, {latest_values} '
+                                       f'FROM "{table}" n JOIN ('
+                                       f'SELECT staker_address, MAX(time) AS time FROM "{table}" '
+                                       f'WHERE time >= :begin AND time < :end '
+                                       f'GROUP BY staker_address, time - (time % :interval)'
+                                       f') latest ON n.staker_address = latest.staker_address AND n.time = latest.time'
+                                       f') GROUP BY bucket',
+                                       {'interval': interval_seconds, 'begin': begin, 'end': end})
+                values = {row[0]: row[1:] for row in rows}
+        finally:
+            db_conn.close()
+
+        empty_row = tuple(0 if aggregate == 'COUNT' else None for aggregate, _ in aggregates.values())
+        return self._fill_intervals(begin, end, interval_seconds, names=list(aggregates), values=values,
+                                    empty_row=empty_row)
+
+    def query_network_info(self,
+                           range_begin: datetime,
+                           range_end: datetime,
+                           fields: List[str],
+                           interval: str = '1d') -> Dict[str, List]:
+        interval_seconds = _duration_to_seconds(interval)
+        begin = MayaDT.from_datetime(range_begin).epoch
+        end = MayaDT.from_datetime(range_end).epoch
+
+        table = Crawler.NETWORK_MEASUREMENT
+        if interval_seconds % SECONDS_PER_DAY == 0:
+            table += self.DAILY_ROLLUP_SUFFIX  # already the latest values for each day
+
+        values = dict()  # interval start -> row of latest values
+        db_conn = sqlite3.connect(self._db_filepath)
+        try:
+            columns = self._get_columns(db_conn, table)
+            if columns:
+                # fields never written are null
+                latest_values = ', '.join(f'n."{field}"' if field in columns else 'NULL' for field in fields)
+                rows = db_conn.execute(f'SELECT n.time - (n.time % :interval) AS bucket, {latest_values} '
+                                       f'FROM "{table}" n JOIN ('
+                                       f'SELECT MAX(time) AS time FROM "{table}" '
+                                       f'WHERE time >= :begin AND time < :end '
+                                       f'GROUP BY time - (time % :interval)'
+                                       f') latest ON n.time = latest.time',
+                                       {'interval': interval_seconds, 'begin': begin, 'end': end})
+                values = {row[0]: row[1:] for row in rows}
+        finally:
+            db_conn.close()
+
+        return self._fill_intervals(begin, end, interval_seconds, names=fields, values=values,
+                                    empty_row=(None, ) * len(fields))
+
+    @staticmethod
+    def _fill_intervals(begin: int, end: int, interval_seconds: int, names: List[str], values: Dict[int, Tuple],
+                        empty_row: Tuple) -> Dict[str, List]:
+        # every interval in the range is reported, like InfluxDB's GROUP BY time()
+        buckets = list(range(begin - (begin % interval_seconds), end, interval_seconds))
+        result = OrderedDict(time=buckets)
+        for index, name in enumerate(names):
+            result[name] = [values.get(bucket, empty_row)[index] for bucket in buckets]
+        return result
+
+    def query_events(self, range_begin: datetime, range_end: datetime) -> List[Dict]:
+        db_conn = sqlite3.connect(self._db_filepath)
+        try:
+            if not self._get_columns(db_conn, Crawler.EVENT_MEASUREMENT):
+                return list()
+            result = db_conn.execute(f'SELECT * FROM "{Crawler.EVENT_MEASUREMENT}" '
+                                     f'WHERE time >= ? AND time < ? ORDER BY time DESC',
+                                     (MayaDT.from_datetime(range_begin).epoch, MayaDT.from_datetime(range_end).epoch))
+            column_names = [description[0] for description in result.description]
+            events = list()
+            for row in result:
+                event_info = dict(zip(column_names, row))
+                event_info['time'] = datetime.utcfromtimestamp(event_info['time']).strftime('%Y-%m-%dT%H:%M:%SZ')
+                events.append(event_info)
+            return events
+        finally:
+            db_conn.close()
+
+    def get_last_event_block_number(self) -> int:
+        db_conn = sqlite3.connect(self._db_filepath)
+        try:
+            columns = self._get_columns(db_conn, Crawler.EVENT_MEASUREMENT)
+            if 'block_number' not in columns:
+                return 0
+            row = db_conn.execute(f'SELECT MAX(block_number) FROM "{Crawler.EVENT_MEASUREMENT}"').fetchone()
+            return row[0] or 0
+        finally:
+            db_conn.close()
+
+    def close(self) -> None:
+        pass  # connections are only held for the duration of each operation
@@ -1,6 +1,9 @@
+import bisect
+import json
 import math
+import threading
 from collections import OrderedDict
-from typing import Union, Optional, Dict
+from typing import Union, Optional, Dict, List, Sequence
 
 import maya
 from maya import MayaDT
@@ -29,6 +32,7 @@ SAFT2_TEAM_VESTING_MONTHS = 24
 
 LAUNCH_DATE = MayaDT.from_rfc3339('2020-10-15T00:00:00.0Z')
 DAYS_PER_MONTH = 30.416  # value used in csv allocations
+SECONDS_PER_DAY = 24 * 60 * 60
 
 
 def months_transpired_since_launch(now: MayaDT) -> int:
@@ -71,6 +75,78 @@ def vesting_remaining_factor(vesting_months: int,
             return (vesting_months - months_transpired) / vesting_months
 
 
+def months_transpired_since_launch_series(timestamps: Sequence[MayaDT]) -> List[int]:
+    """
+    `months_transpired_since_launch` for many timestamps at once. The number of months transpired is the number of
+    (rounded) month durations surpassed, so the month boundaries are calculated once and each timestamp is located
+    among them using the epoch value, instead of date arithmetic per timestamp.
+    """
+    if not timestamps:
+        return []
+    launch_epoch = LAUNCH_DATE.epoch
+    # same as timedelta days (floor)
+    days = [(timestamp.epoch - launch_epoch) // SECONDS_PER_DAY for timestamp in timestamps]
+    first_month = math.floor(min(days) / DAYS_PER_MONTH)
+    last_month = math.ceil(max(days) / DAYS_PER_MONTH)
+    # calculation of vesting days (based on months) done during allocation
+    month_days = [round(month * DAYS_PER_MONTH) for month in range(first_month, last_month + 1)]
+    return [first_month + bisect.bisect_right(month_days, days_transpired) - 1 for days_transpired in days]
+
+
+def locked_nunits_series(nunits: int,
+                         vesting_months: int,
+                         months_transpired: Sequence[int],
+                         cliff: bool = False) -> List[int]:
+    """
+    Locked nunits of a vesting allocation for a sequence of months transpired since launch, as obtained from
+    `months_transpired_since_launch_series`. Integer arithmetic is used since allocations are too large to be
+    represented exactly as floats.
+    """
+    locked = dict()  # only a handful of distinct months in any series
+    for months in set(months_transpired):
+        if months >= vesting_months:
+            locked[months] = 0
+        elif cliff:
+            locked[months] = nunits
+        else:
+            locked[months] = nunits * (vesting_months - months) // vesting_months
+    return [locked[months] for months in months_transpired]
+
+
+def calculate_vesting_schedule(economics: BaseEconomics, timestamps: Sequence[MayaDT]) -> Dict:
+    """
+    Calculates the locked allocations, vested tokens, and estimated circulating supply at each of the provided
+    timestamps. Unlike `calculate_supply_information`, staking rewards are not included since they are not
+    part of the vesting schedule.
+    """
+    months_transpired = months_transpired_since_launch_series(timestamps)
+
+    allocations = OrderedDict()  # name -> (nunits, vesting months, cliff)
+    allocations['saft2'] = (SAFT2_INITIAL_SUPPLY.to_nunits(), SAFT2_TEAM_VESTING_MONTHS, False)
+    allocations['team'] = (TEAM_INITIAL_SUPPLY.to_nunits(), SAFT2_TEAM_VESTING_MONTHS, False)
+    allocations['company'] = (NUCO_INITIAL_SUPPLY.to_nunits(), NUCO_VESTING_MONTHS, True)
+    allocations['worklock'] = (economics.worklock_supply, WORKLOCK_VESTING_MONTHS, True)
+    allocations['university'] = (UNIVERSITY_INITIAL_SUPPLY.to_nunits(), UNIVERSITY_VESTING_MONTHS, True)
+
+    nunits_per_token = NU(1, 'NU').to_nunits()
+    total_allocated_nunits = sum(nunits for nunits, _, _ in allocations.values())
+    total_locked_nunits = [0] * len(timestamps)
+    locked_allocations = OrderedDict()
+    for name, (nunits, vesting_months, cliff) in allocations.items():
+        locked_nunits = locked_nunits_series(nunits, vesting_months, months_transpired, cliff=cliff)
+        locked_allocations[name] = [locked / nunits_per_token for locked in locked_nunits]
+        total_locked_nunits = [total + locked for total, locked in zip(total_locked_nunits, locked_nunits)]
+
+    initial_supply_nunits = INITIAL_SUPPLY.to_nunits()
+    schedule = OrderedDict()
+    schedule['timestamps'] = [timestamp.iso8601() for timestamp in timestamps]
+    schedule['locked_allocations'] = locked_allocations
+    schedule['vested'] = [(total_allocated_nunits - locked) / nunits_per_token for locked in total_locked_nunits]
+    schedule['est_circulating_supply'] = [(initial_supply_nunits - locked) / nunits_per_token
+                                          for locked in total_locked_nunits]
+    return schedule
+
+
 def calculate_supply_information(economics: BaseEconomics) -> Dict:
     """Calculates the NU token supply information."""
     supply_info = OrderedDict()
@@ -158,3 +234,47 @@ def calculate_circulating_supply(economics: BaseEconomics) -> float:
     supply_info = calculate_supply_information(economics)
     circulating_supply = supply_info['est_circulating_supply']
     return circulating_supply
+
+
+class SupplyInformationCache:
+    """
+    In-memory cache of the NU token supply information, preformatted as response bytes for each
+    supported supply query parameter.
+    """
+    QUERY_PARAMETERS = ('current_total_supply', 'est_circulating_supply')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._economics = None
+        self._period = None
+        self._responses = dict()
+
+    @property
+    def economics(self) -> Optional[BaseEconomics]:
+        return self._economics
+
+    @property
+    def period(self) -> Optional[int]:
+        return self._period
+
+    @property
+    def is_populated(self) -> bool:
+        return bool(self._responses)
+
+    def update(self, economics: BaseEconomics, period: int) -> None:
+        supply_info = calculate_supply_information(economics=economics)
+
+        # circulating and total supply are derived from the same calculation instead of recalculating
+        responses = {None: json.dumps(supply_info).encode()}
+        for parameter in self.QUERY_PARAMETERS:
+            responses[parameter] = str(supply_info[parameter]).encode()
+
+        with self._lock:
+            self._economics = economics
+            self._period = period
+            self._responses = responses
+
+    def get(self, parameter: Optional[str] = None) -> bytes:
+        """Returns the preformatted response for the query parameter (all information if None)."""
+        with self._lock:
+            return self._responses[parameter]
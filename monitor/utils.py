@@ -1,3 +1,9 @@
+import os
+import sqlite3
+import threading
+import time
+import urllib.parse
+
 import click
 import maya
 from enum import Enum
@@ -20,6 +26,152 @@ def collector(label: str):
     return decorator
 
 
+def escape_tag_value(value) -> str:
+    """Escapes an InfluxDB line protocol tag value or tag key; backslashes are not escaped by InfluxDB."""
+    return str(value).replace(',', '\\,').replace('=', '\\=').replace(' ', '\\ ')
+
+
+def escape_field_string(value) -> str:
+    """Escapes an InfluxDB line protocol string field value, for use within double quotes."""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"')
+
+
+class CircuitBreakerOpen(Exception):
+    """Raised instead of performing an operation while its circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Fails fast while an operation is unhealthy. After `failure_threshold` consecutive failures the breaker opens,
+    and calls fail immediately with CircuitBreakerOpen. Once `reset_timeout` seconds have elapsed a single trial call
+    is let through (half-open): the breaker closes if it succeeds, and opens again if it fails.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30, failure_exceptions=(Exception, )):
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._failure_exceptions = failure_exceptions
+
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_progress = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return self.CLOSED
+            if self._trial_in_progress or time.monotonic() - self._opened_at < self._reset_timeout:
+                return self.OPEN
+            return self.HALF_OPEN
+
+    def call(self, func, *args, **kwargs):
+        with self._lock:
+            trial = self._opened_at is not None
+            if trial:
+                if self._trial_in_progress or time.monotonic() - self._opened_at < self._reset_timeout:
+                    raise CircuitBreakerOpen(f"{getattr(func, '__name__', func)} is failing fast until it recovers")
+                self._trial_in_progress = True
+
+        try:
+            result = func(*args, **kwargs)
+        except self._failure_exceptions:
+            with self._lock:
+                self._failures += 1
+                if trial or self._failures >= self._failure_threshold:
+                    self._opened_at = time.monotonic()
+            raise
+        finally:
+            if trial:
+                with self._lock:
+                    self._trial_in_progress = False
+
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+        return result
+
+
+class SQLiteConnectionPool:
+    """
+    Long-lived SQLite connections to a database file, one per thread (sqlite3 connections must not be shared
+    between threads). Writable connections use WAL journal mode so that readers are not blocked by writers;
+    read-only connections are opened via a `mode=ro` URI. Connections are re-opened if the database file is
+    replaced, and connections of threads that have since exited are closed.
+    """
+
+    JOURNAL_MODE = 'WAL'
+    SYNCHRONOUS = 'NORMAL'  # durable under WAL except for the last transactions on power loss
+    CACHE_SIZE = -8192  # KiB
+    BUSY_TIMEOUT = 5  # seconds
+
+    def __init__(self, db_filepath: str, read_only: bool = False):
+        self._db_filepath = db_filepath
+        self._read_only = read_only
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._connections = dict()  # thread -> connection
+
+    @property
+    def db_filepath(self) -> str:
+        return self._db_filepath
+
+    def get(self) -> sqlite3.Connection:
+        """Returns the calling thread's connection; use as a context manager to commit (or rollback)."""
+        file_id = self._get_file_id()
+        db_conn = getattr(self._local, 'db_conn', None)
+        if db_conn is not None and self._local.file_id == file_id:
+            return db_conn
+
+        if db_conn is not None:
+            # database file replaced
+            self._discard(threading.current_thread())
+        db_conn = self._connect()
+        self._local.db_conn, self._local.file_id = db_conn, self._get_file_id()  # file may have been created
+        with self._lock:
+            for thread in [thread for thread in self._connections if not thread.is_alive()]:
+                self._connections.pop(thread).close()
+            self._connections[threading.current_thread()] = db_conn
+        return db_conn
+
+    def close(self) -> None:
+        """Closes the connections of all threads; subsequent calls to `get` open new connections."""
+        with self._lock:
+            connections, self._connections = list(self._connections.values()), dict()
+            self._local = threading.local()
+        for db_conn in connections:
+            db_conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._read_only:
+            uri = f'file:{urllib.parse.quote(os.path.abspath(self._db_filepath))}?mode=ro'
+            db_conn = sqlite3.connect(uri, uri=True, timeout=self.BUSY_TIMEOUT, check_same_thread=False)
+        else:
+            db_conn = sqlite3.connect(self._db_filepath, timeout=self.BUSY_TIMEOUT, check_same_thread=False)
+            db_conn.execute(f'PRAGMA journal_mode={self.JOURNAL_MODE}')
+            db_conn.execute(f'PRAGMA synchronous={self.SYNCHRONOUS}')
+        db_conn.execute(f'PRAGMA cache_size={self.CACHE_SIZE}')
+        return db_conn
+
+    def _discard(self, thread: threading.Thread) -> None:
+        with self._lock:
+            db_conn = self._connections.pop(thread, None)
+        if db_conn is not None:
+            db_conn.close()
+
+    def _get_file_id(self):
+        try:
+            stat = os.stat(self._db_filepath)
+        except OSError:
+            return None  # in-memory, or not yet created
+        return stat.st_dev, stat.st_ino
+
+
 class EtherscanURLType(Enum):
     ADDRESS = 1
     TRANSACTION = 2
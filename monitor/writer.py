@@ -0,0 +1,269 @@
+import os
+import queue
+import tempfile
+import threading
+import time
+from typing import Dict, List
+
+from nucypher.config.constants import DEFAULT_CONFIG_ROOT
+from twisted.logger import Logger
+
+
+class MeasurementWriter:
+    """
+    Background writer of line protocol points to time series storage (see monitor.storage).
+
+    Points are taken from a bounded queue (producers block while it is full) and written in batches.
+    Failed writes are retried with exponential backoff; in the meantime points are appended to a local spool
+    file, which is replayed in order once the storage is available again. Points that cannot be spooled either
+    (e.g. disk full) are retained in memory, up to a limit, and retried with the next flush.
+    """
+
+    SPOOL_FILE_NAME = 'crawler-measurements-spool.lp'
+    DEFAULT_SPOOL_FILEPATH = os.path.join(DEFAULT_CONFIG_ROOT, SPOOL_FILE_NAME)
+
+    DEFAULT_QUEUE_SIZE = 100  # number of queued writes
+    DEFAULT_BATCH_SIZE = 5000  # points per request
+    DEFAULT_FLUSH_INTERVAL = 1  # seconds
+    DEFAULT_ENQUEUE_TIMEOUT = 30  # seconds
+
+    MIN_BACKOFF = 1  # seconds
+    MAX_BACKOFF = 60  # seconds
+
+    MAX_RETAINED_POINTS = 50000  # points kept in memory while they can neither be written nor spooled
+
+    def __init__(self,
+                 storage,
+                 spool_filepath: str = DEFAULT_SPOOL_FILEPATH,
+                 queue_size: int = DEFAULT_QUEUE_SIZE,
+                 batch_size: int = DEFAULT_BATCH_SIZE,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+                 enqueue_timeout: float = DEFAULT_ENQUEUE_TIMEOUT):
+        self.log = Logger(self.__class__.__name__)
+        self._storage = storage
+        self._spool_filepath = spool_filepath
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._enqueue_timeout = enqueue_timeout
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._spool_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread = None
+
+        self._backoff = 0
+        self._retry_at = 0
+        self._retained = list()
+
+        self._stats = {'queued': 0, 'written': 0, 'spooled': 0, 'replayed': 0, 'failed_writes': 0, 'dropped': 0}
+
+    @property
+    def stats(self) -> Dict:
+        stats = dict(self._stats)
+        stats['queue_size'] = self._queue.qsize()
+        stats['spool_pending'] = os.path.exists(self._spool_filepath)
+        stats['retained'] = len(self._retained)
+        stats['storage'] = self._storage.stats
+        return stats
+
+    @property
+    def storage(self):
+        return self._storage
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.is_running:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name=self.__class__.__name__, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = None) -> None:
+        """Stops the writer once the queued points have been written (or spooled)."""
+        if not self.is_running:
+            return
+        self._stopping.set()
+        self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def write(self, lines: List[str]) -> bool:
+        """
+        Queues line protocol points to be written, blocking while the queue is full. Points that cannot be
+        queued within the enqueue timeout are spooled to disk instead. Returns False only if the points
+        could neither be queued nor spooled.
+        """
+        if not lines:
+            return True
+        try:
+            self._queue.put(list(lines), timeout=self._enqueue_timeout)
+        except queue.Full:
+            self.log.warn(f'Write queue full, spooling {len(lines)} points to {self._spool_filepath}')
+            return self._spool(lines)
+
+        self._stats['queued'] += len(lines)
+        return True
+
+    def flush(self) -> None:
+        """Writes all currently queued points on the calling thread."""
+        lines = self._next_batch(wait=False)
+        while lines:
+            self._flush(lines)
+            lines = self._next_batch(wait=False)
+
+    def _run(self) -> None:
+        while not (self._stopping.is_set() and self._queue.empty()):
+            lines = self._next_batch(wait=not self._stopping.is_set())
+            if lines or self._retained or os.path.exists(self._spool_filepath):
+                self._flush(lines)
+
+        if self._retained:
+            self._drop(self._retained)
+            self._retained = list()
+
+    def _next_batch(self, wait: bool = True) -> List[str]:
+        lines = list()
+        deadline = time.monotonic() + (self._flush_interval if wait else 0)
+        while len(lines) < self._batch_size:
+            try:
+                timeout = deadline - time.monotonic()
+                if timeout > 0:
+                    lines.extend(self._queue.get(timeout=timeout))
+                else:
+                    lines.extend(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return lines
+
+    def _flush(self, lines: List[str]) -> None:
+        # points that previously could not be spooled are retried first
+        lines = self._retained + lines
+        self._retained = list()
+
+        if time.monotonic() < self._retry_at:
+            # backing off - keep points on disk until the next attempt
+            self._spool_or_retain(lines)
+            if not self._stopping.is_set():
+                time.sleep(min(self._flush_interval, self._retry_at - time.monotonic()))
+            return
+
+        # previously spooled points are written first to preserve ordering
+        if self._replay_spool():
+            written = self._send(lines)
+            if written == len(lines):
+                self._backoff = 0
+                return
+            lines = lines[written:]
+
+        self._spool_or_retain(lines)
+        self._backoff = min(max(self._backoff * 2, self.MIN_BACKOFF), self.MAX_BACKOFF)
+        self._retry_at = time.monotonic() + self._backoff
+        self.log.warn(f'Unable to write to storage; retrying in {self._backoff}s')
+
+    def _send(self, lines: List[str]) -> int:
+        """Writes the points in batches and returns the number of points successfully written."""
+        written = 0
+        for index in range(0, len(lines), self._batch_size):
+            batch = lines[index:index + self._batch_size]
+            try:
+                self._storage.write(batch)
+            except Exception as e:
+                self._stats['failed_writes'] += 1
+                self.log.warn(f'Failed to write {len(batch)} points to storage: {e}')
+                break
+            written += len(batch)
+
+        self._stats['written'] += written
+        return written
+
+    def _spool(self, lines: List[str]) -> bool:
+        if not lines:
+            return True
+        with self._spool_lock:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self._spool_filepath)), exist_ok=True)
+                with open(self._spool_filepath, 'a') as spool_file:
+                    spool_file.write('\n'.join(lines) + '\n')
+            except OSError as e:
+                self.log.error(f'Unable to spool {len(lines)} points to {self._spool_filepath}: {e}')
+                return False
+
+        self._stats['spooled'] += len(lines)
+        return True
+
+    def _spool_or_retain(self, lines: List[str]) -> None:
+        """Spools points, or retains them in memory (dropping the oldest beyond the limit) if spooling fails."""
+        if self._spool(lines):
+            return
+        overflow = len(lines) - self.MAX_RETAINED_POINTS
+        if overflow > 0:
+            self._drop(lines[:overflow])
+            lines = lines[overflow:]
+        self._retained = lines
+
+    def _drop(self, lines: List[str]) -> None:
+        self._stats['dropped'] += len(lines)
+        self.log.error(f'Dropped {len(lines)} points that could neither be written to storage nor spooled')
+
+    def _replay_spool(self) -> bool:
+        """Writes spooled points to storage; returns True if no spooled points remain."""
+        with self._spool_lock:
+            if not os.path.exists(self._spool_filepath):
+                return True
+
+            with open(self._spool_filepath, 'r') as spool_file:
+                lines = [line.rstrip('\n') for line in spool_file if line.strip()]
+
+            written = self._send(lines)
+            self._stats['replayed'] += written
+            if written == len(lines):
+                os.remove(self._spool_filepath)
+                self.log.info(f'Replayed {written} spooled points to storage')
+                return True
+
+            # keep the remaining points - replace the spool atomically
+            spool_dir = os.path.dirname(os.path.abspath(self._spool_filepath))
+            fd, temp_filepath = tempfile.mkstemp(dir=spool_dir)
+            with os.fdopen(fd, 'w') as temp_file:
+                temp_file.write('\n'.join(lines[written:]) + '\n')
+            os.replace(temp_filepath, self._spool_filepath)
+            return False
+
+
+class ChangeTracker:
+    """
+    Tracks the field values last written for each series (e.g. per staker), so that a point is only written
+    when its values change. A keyframe point is still written for each series once per keyframe interval
+    (aligned to multiples of the interval since the epoch), so every interval has a latest value per series.
+    """
+
+    def __init__(self, keyframe_interval: int):
+        self._keyframe_interval = keyframe_interval
+        self._last_written = dict()  # series key -> (values, timestamp)
+        self._stats = {'changed': 0, 'keyframes': 0, 'unchanged': 0}
+
+    @property
+    def stats(self) -> Dict:
+        stats = dict(self._stats)
+        stats['series'] = len(self._last_written)
+        return stats
+
+    def should_write(self, key, values: tuple, timestamp: int) -> bool:
+        last_written = self._last_written.get(key)
+        if last_written is None or last_written[0] != values:
+            self._stats['changed'] += 1
+            return True
+
+        _, last_timestamp = last_written
+        if (timestamp // self._keyframe_interval) != (last_timestamp // self._keyframe_interval):
+            self._stats['keyframes'] += 1
+            return True
+
+        self._stats['unchanged'] += 1
+        return False
+
+    def written(self, key, values: tuple, timestamp: int) -> None:
+        """Records values as written; only call once the point has been queued for writing."""
+        self._last_written[key] = (values, timestamp)
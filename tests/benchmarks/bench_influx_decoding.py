@@ -0,0 +1,69 @@
+"""
+Microbenchmark comparing the decoding of historical InfluxDB query results as rfc3339 points (previous approach)
+against epoch precision columns.
+
+    python -m tests.benchmarks.bench_influx_decoding
+"""
+import timeit
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from influxdb.resultset import ResultSet
+from maya import MayaDT
+
+from monitor.storage import InfluxDBStorage, SECONDS_PER_DAY
+
+NUM_POINTS = 365
+REPEAT = 5
+NUMBER = 20
+
+START_EPOCH = MayaDT.from_rfc3339('2020-10-15T00:00:00.0Z').epoch
+
+
+def create_result_set(epoch_precision: bool) -> ResultSet:
+    values = list()
+    for day in range(NUM_POINTS):
+        epoch = START_EPOCH + (day * SECONDS_PER_DAY)
+        values.append([epoch if epoch_precision else MayaDT(epoch).rfc3339(), day * 1000.0])
+    return ResultSet({'statement_id': 0, 'series': [{'name': 'bench', 'columns': ['time', 'sum'], 'values': values}]})
+
+
+def decode_rfc3339_points(result_set: ResultSet):
+    results = list(result_set.get_points())
+    decoded = OrderedDict()
+    for r in results:
+        decoded[MayaDT.from_rfc3339(r['time']).datetime()] = r['sum'] if r['sum'] else 0
+    return decoded
+
+
+def decode_epoch_columns(result_set: ResultSet):
+    columns = InfluxDBStorage._decode_columns(result_set)
+    return columns['time'], columns['sum']
+
+
+def decode_epoch_columns_to_dict(result_set: ResultSet):
+    epochs, values = decode_epoch_columns(result_set)
+    decoded = OrderedDict()
+    for epoch, value in zip(epochs, values):
+        decoded[datetime.fromtimestamp(epoch, tz=timezone.utc)] = value if value else 0
+    return decoded
+
+
+def run():
+    rfc3339_result_set = create_result_set(epoch_precision=False)
+    epoch_result_set = create_result_set(epoch_precision=True)
+    assert decode_rfc3339_points(rfc3339_result_set) == decode_epoch_columns_to_dict(epoch_result_set)
+
+    benchmarks = (
+        ('rfc3339 points -> dict', decode_rfc3339_points, rfc3339_result_set),
+        ('epoch columns -> dict', decode_epoch_columns_to_dict, epoch_result_set),
+        ('epoch columns', decode_epoch_columns, epoch_result_set),
+    )
+    print(f"Decoding {NUM_POINTS} points (best of {REPEAT}, {NUMBER} iterations each)")
+    for label, func, result_set in benchmarks:
+        best = min(timeit.repeat(lambda: func(result_set), repeat=REPEAT, number=NUMBER)) / NUMBER
+        print(f"{label:<25} {best * 1000:8.3f} ms")
+
+
+if __name__ == '__main__':
+    run()
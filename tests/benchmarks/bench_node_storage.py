@@ -0,0 +1,105 @@
+"""
+Benchmark of the crawler's SQLite node storage under concurrent learning and collection: learning threads
+store node metadata and fleet states while collection threads read them via CrawlerStorageClient (as the
+dashboard does). Long-lived WAL connections are compared to a new connection per operation.
+
+    python -m tests.benchmarks.bench_node_storage
+"""
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from nucypher.acumen.perception import FleetSensor
+
+from monitor.crawler import CrawlerNodeStorage
+from monitor.db import CrawlerStorageClient
+from monitor.utils import SQLiteConnectionPool
+from tests.utilities import create_random_mock_node, create_random_mock_state
+
+NUM_NODES = 500
+NUM_STATES = 100
+LEARNING_THREADS = 2
+COLLECTION_THREADS = 4
+DURATION = 5  # seconds
+
+
+class PerOperationConnections(SQLiteConnectionPool):
+    """A new connection for every operation, with the default rollback journal."""
+
+    JOURNAL_MODE = 'DELETE'
+
+    def get(self) -> sqlite3.Connection:
+        if self._read_only:
+            return sqlite3.connect(f'file:{self._db_filepath}?mode=ro', uri=True, timeout=self.BUSY_TIMEOUT)
+        return sqlite3.connect(self._db_filepath, timeout=self.BUSY_TIMEOUT)
+
+
+def bench_node_storage(label, connections_class, nodes, states):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_filepath = os.path.join(temp_dir, 'bench.sqlite')
+        node_storage = CrawlerNodeStorage(storage_filepath=db_filepath)
+        node_storage._db_connections.close()
+        node_storage._db_connections = connections_class(db_filepath=db_filepath)
+        with node_storage._db_connections.get() as db_conn:
+            db_conn.execute(f'PRAGMA journal_mode={connections_class.JOURNAL_MODE}')  # persistent
+        storage_client = CrawlerStorageClient(db_filepath=db_filepath)
+        storage_client._db_connections = connections_class(db_filepath=db_filepath, read_only=True)
+
+        stop = threading.Event()
+        counts = {'writes': 0, 'reads': 0, 'errors': 0}
+        counts_lock = threading.Lock()
+
+        def learn(offset):
+            index = offset
+            while not stop.is_set():
+                try:
+                    node_storage.store_node_metadata(node=nodes[index % len(nodes)])
+                    node_storage.store_state_metadata(state=states[index % len(states)])
+                    count = 'writes'
+                except sqlite3.OperationalError:
+                    count = 'errors'
+                with counts_lock:
+                    counts[count] += 1
+                index += LEARNING_THREADS
+
+        def collect():
+            while not stop.is_set():
+                try:
+                    storage_client.get_known_nodes_metadata()
+                    storage_client.get_previous_states_metadata()
+                    count = 'reads'
+                except sqlite3.OperationalError:
+                    count = 'errors'
+                with counts_lock:
+                    counts[count] += 1
+
+        threads = [threading.Thread(target=learn, args=(offset, )) for offset in range(LEARNING_THREADS)]
+        threads.extend(threading.Thread(target=collect) for _ in range(COLLECTION_THREADS))
+        for thread in threads:
+            thread.start()
+        time.sleep(DURATION)
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        storage_client.close()
+        node_storage._db_connections.close()
+
+    print(f"{label:<15} learning {counts['writes'] / DURATION:10.0f} writes/s | "
+          f"collection {counts['reads'] / DURATION:8.0f} reads/s | "
+          f"{counts['errors']} errors")
+
+
+def run():
+    nodes = [create_random_mock_node() for _ in range(NUM_NODES)]
+    states = [FleetSensor.abridged_state_details(create_random_mock_state()) for _ in range(NUM_STATES)]
+    print(f"{NUM_NODES} nodes, {LEARNING_THREADS} learning threads, {COLLECTION_THREADS} collection threads")
+
+    bench_node_storage('per operation', PerOperationConnections, nodes, states)
+    bench_node_storage('pooled WAL', SQLiteConnectionPool, nodes, states)
+
+
+if __name__ == '__main__':
+    run()
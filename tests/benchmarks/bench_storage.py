@@ -0,0 +1,105 @@
+"""
+Benchmark of time series storage backends: writing node information for a fleet of stakers, and the daily
+network metrics computed from per-staker node information compared to reading the network information written
+each round. The InfluxDB storage is included when a server is available.
+
+    python -m tests.benchmarks.bench_storage
+    MONITOR_BENCH_INFLUX_HOST=localhost python -m tests.benchmarks.bench_storage
+"""
+import os
+import secrets
+import tempfile
+import time
+from collections import OrderedDict
+
+from maya import MayaDT
+
+from monitor.db import CrawlerInfluxClient
+from monitor.storage import InfluxDBStorage, SQLiteTimeSeriesStorage, SECONDS_PER_DAY
+from tests.utilities import create_node_info_line, create_network_info_line
+
+NUM_STAKERS = 500
+DAYS = 30
+POINTS_PER_DAY = 24  # per staker
+WRITE_BATCH_SIZE = 5000
+REPEAT = 5
+
+INFLUX_HOST_ENV_VAR = 'MONITOR_BENCH_INFLUX_HOST'
+
+AGGREGATES = OrderedDict((metric, aggregate)
+                         for metric, aggregate in CrawlerInfluxClient.NODE_INFO_NETWORK_METRICS.items()
+                         if metric != 'work_orders')
+NETWORK_FIELDS = ['locked_stake', 'num_stakers']
+
+
+def create_lines():
+    range_begin, _ = CrawlerInfluxClient._get_range_bookends(DAYS)
+    range_begin_epoch = MayaDT.from_datetime(range_begin).epoch
+    step = SECONDS_PER_DAY // POINTS_PER_DAY
+    lines = list()
+    for point in range(DAYS * POINTS_PER_DAY):
+        timestamp = range_begin_epoch + (point * step)
+        for staker in range(NUM_STAKERS):
+            lines.append(create_node_info_line(staker_address=f'0x{staker:040x}',
+                                               timestamp=timestamp,
+                                               locked_stake=15000.0 + staker + point))
+        lines.append(create_network_info_line(timestamp=timestamp,
+                                              locked_stake=15000.0 * NUM_STAKERS,
+                                              num_stakers=NUM_STAKERS))
+    return lines
+
+
+def bench_storage(label, storage, lines):
+    storage.initialize()
+
+    start = time.perf_counter()
+    for index in range(0, len(lines), WRITE_BATCH_SIZE):
+        storage.write(lines[index:index + WRITE_BATCH_SIZE])
+    write_duration = time.perf_counter() - start
+
+    if isinstance(storage, InfluxDBStorage):
+        # continuous queries only run periodically
+        for tiers, _, _ in InfluxDBStorage.DOWNSAMPLED_MEASUREMENTS:
+            for tier in tiers:
+                if tier.interval is not None:
+                    storage._backfill_tier(tier)
+
+    range_begin, range_end = CrawlerInfluxClient._get_range_bookends(DAYS)
+    query_durations = list()
+    network_query_durations = list()
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        storage.query_node_info_aggregates(range_begin=range_begin, range_end=range_end, aggregates=AGGREGATES)
+        query_durations.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        storage.query_network_info(range_begin=range_begin, range_end=range_end, fields=NETWORK_FIELDS)
+        network_query_durations.append(time.perf_counter() - start)
+
+    print(f"{label:<10} write {len(lines) / write_duration:10.0f} points/s | "
+          f"{DAYS} day aggregation {min(query_durations) * 1000:8.2f} ms | "
+          f"{DAYS} day network info {min(network_query_durations) * 1000:8.2f} ms")
+
+
+def run():
+    lines = create_lines()
+    print(f"{NUM_STAKERS} stakers, {DAYS} days, {POINTS_PER_DAY} points per staker per day ({len(lines)} points)")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        storage = SQLiteTimeSeriesStorage(db_filepath=os.path.join(temp_dir, 'bench.sqlite'))
+        bench_storage('sqlite', storage, lines)
+        storage.close()
+
+    influx_host = os.environ.get(INFLUX_HOST_ENV_VAR)
+    if influx_host:
+        database = f'monitor_bench_{secrets.token_hex(4)}'
+        storage = InfluxDBStorage(host=influx_host, port=8086, database=database)
+        try:
+            bench_storage('influxdb', storage, lines)
+        finally:
+            storage._client.drop_database(database)
+            storage.close()
+
+
+if __name__ == '__main__':
+    run()
@@ -1,5 +1,6 @@
 import os
 import sqlite3
+import threading
 from unittest.mock import MagicMock, patch
 
 import maya
@@ -10,13 +11,18 @@ from nucypher.blockchain.eth.agents import StakingEscrowAgent
 from nucypher.blockchain.eth.registry import InMemoryContractRegistry
 from nucypher.blockchain.eth.token import NU
 from nucypher.blockchain.eth.utils import datetime_to_period
+from nucypher.characters.lawful import Ursula
 from nucypher.network.middleware import RestMiddleware
 
 import monitor
 from monitor.crawler import CrawlerNodeStorage, Crawler, SQLiteForgetfulNodeStorage
 from monitor.db import CrawlerStorageClient
+from monitor.learning import TeacherStatistics
+from monitor.storage import parse_line_protocol
 from tests.utilities import (
     create_random_mock_node,
+    create_random_mock_state,
+    create_serializable_mock_node,
     create_specific_mock_node,
     create_specific_mock_state,
     MockContractAgency)
@@ -86,6 +92,35 @@ def test_storage_store_node_metadata(sqlite_connection):
         verify_mock_node_matches(updated_node, row)
 
 
+def test_storage_store_unchanged_node_metadata(sqlite_connection):
+    node_storage = CrawlerNodeStorage(storage_filepath=IN_MEMORY_FILEPATH)
+
+    node = create_specific_mock_node()
+    node_storage.store_node_metadata(node=node)
+    assert node.node_details.call_count == 1
+
+    # unchanged node is not rendered again, but last seen is updated
+    node.last_seen = node.last_seen.add(minutes=5)
+    node_storage.store_node_metadata(node=node)
+    assert node.node_details.call_count == 1
+    result = sqlite_connection.execute(f"SELECT * FROM {CrawlerNodeStorage.NODE_DB_NAME}").fetchall()
+    assert len(result) == 1
+    verify_mock_node_matches(node, result[0])
+
+    # new timestamp or fleet state is rendered
+    node.timestamp = node.timestamp.add(hours=1)
+    node_storage.store_node_metadata(node=node)
+    assert node.node_details.call_count == 2
+    node.timestamp = node.timestamp.add(microseconds=1)  # equal MayaDT, but rendered differently
+    node_storage.store_node_metadata(node=node)
+    assert node.node_details.call_count == 3
+    node.fleet_state_checksum = 'updated'
+    node_storage.store_node_metadata(node=node)
+    assert node.node_details.call_count == 4
+    result = sqlite_connection.execute(f"SELECT * FROM {CrawlerNodeStorage.NODE_DB_NAME}").fetchall()
+    verify_mock_node_matches(node, result[0])
+
+
 def test_storage_store_state_metadata(sqlite_connection):
     node_storage = CrawlerNodeStorage(storage_filepath=IN_MEMORY_FILEPATH)
 
@@ -135,6 +170,79 @@ def test_storage_deletion(tempfile_path):
     assert not os.path.exists(tempfile_path)  # db file deleted
 
 
+def test_storage_durable(tempfile_path):
+    nodes = {node.checksum_address: node for node in (create_serializable_mock_node() for _ in range(3))}
+
+    node_storage = CrawlerNodeStorage(storage_filepath=tempfile_path, durable=True)
+    for node in nodes.values():
+        node_storage.store_node_metadata(node=node)
+    state = create_specific_mock_state()
+    node_storage.store_state_metadata(state=FleetSensor.abridged_state_details(state))
+    teacher_checksum = list(nodes)[0]
+    node_storage.store_current_teacher(teacher_checksum=teacher_checksum)
+    node_storage._db_connections.close()
+    del node_storage
+
+    assert os.path.exists(tempfile_path)  # db file kept
+
+    # restart
+    registry = MagicMock(spec=InMemoryContractRegistry)
+    node_storage = CrawlerNodeStorage(storage_filepath=tempfile_path, durable=True, registry=registry)
+    loaded_nodes = node_storage.load_nodes()
+    assert {node.checksum_address for node in loaded_nodes} == set(nodes)
+
+    # nodes are matured without obtaining a registry
+    with patch.object(InMemoryContractRegistry, 'from_latest_publication', side_effect=RuntimeError), \
+            patch.object(Ursula, '_cert_store_function', node_storage.store_node_certificate, create=True):
+        for loaded_node in loaded_nodes:
+            loaded_node.mature()
+            node = nodes[loaded_node.checksum_address]
+            assert bytes(loaded_node) == bytes(node)
+            assert loaded_node.certificate == node.certificate
+            assert loaded_node.rest_url() == node.rest_url()
+            assert loaded_node.timestamp == node.timestamp
+
+    # in-memory index loaded from the tables
+    assert set(node_storage.get_known_nodes_metadata()) == set(nodes)
+    assert node_storage.get_previous_states_metadata()[0]['nickname'] == str(state.nickname)
+    assert node_storage.get_current_teacher_checksum() == teacher_checksum
+
+    node_db_client = CrawlerStorageClient(db_filepath=tempfile_path)
+    assert set(node_db_client.get_known_nodes_metadata()) == set(nodes)
+    assert node_db_client.get_previous_states_metadata()[0]['nickname'] == str(state.nickname)
+    assert node_db_client.get_current_teacher_checksum() == teacher_checksum
+    changes = node_storage.get_known_nodes_metadata_changes()
+    db_changes = node_db_client.get_known_nodes_metadata_changes()
+    assert set(changes.changed) == set(db_changes.changed) == set(nodes)
+    assert changes.version == db_changes.version
+
+    # removed nodes are not loaded
+    node_storage.remove(checksum_address=teacher_checksum)
+    assert teacher_checksum not in {node.checksum_address for node in node_storage.load_nodes()}
+    assert node_storage.get_known_nodes_metadata_changes(since_version=changes.version) \
+           == node_db_client.get_known_nodes_metadata_changes(since_version=changes.version)  # tombstone only
+    removed_changes = node_storage.get_known_nodes_metadata_changes(since_version=changes.version)
+    node_storage._db_connections.close()
+    del node_storage
+
+    # change versions continue from those stored, even if the clock has gone backwards
+    with patch('monitor.crawler.time.time', return_value=0):
+        node_storage = CrawlerNodeStorage(storage_filepath=tempfile_path, durable=True)
+        node_storage.store_node_metadata(node=nodes[teacher_checksum])
+    readded_changes = node_storage.get_known_nodes_metadata_changes(since_version=removed_changes.version)
+    assert readded_changes.version > removed_changes.version
+    assert set(readded_changes.changed) == {teacher_checksum}
+    node_db_client.close()
+    node_storage._db_connections.close()
+
+    # non-durable storage starts afresh
+    node_storage = CrawlerNodeStorage(storage_filepath=tempfile_path)
+    assert node_storage.load_nodes() == []
+    node_db_client = CrawlerStorageClient(db_filepath=tempfile_path)
+    assert node_db_client.get_known_nodes_metadata() == {}
+    node_db_client.close()
+
+
 def test_storage_db_clear(sqlite_connection):
     node_storage = CrawlerNodeStorage(storage_filepath=IN_MEMORY_FILEPATH)
     verify_all_db_tables_exist(sqlite_connection)
@@ -202,11 +310,130 @@ def test_storage_db_clear_not_metadata(sqlite_connection):
     verify_all_db_tables(sqlite_connection, expect_empty=False)
 
 
+def test_storage_batched_writes(sqlite_connection):
+    node_storage = CrawlerNodeStorage(storage_filepath=IN_MEMORY_FILEPATH)
+    statements = list()
+    sqlite_connection.set_trace_callback(statements.append)
+
+    nodes = [create_random_mock_node() for _ in range(3)]
+    states = [create_random_mock_state(seed=seed) for seed in range(2)]
+    with node_storage.batch():
+        for node in nodes:
+            node_storage.store_node_metadata(node=node)
+        for state in states:  # churn within debounce window
+            node_storage.store_state_metadata(state=FleetSensor.abridged_state_details(state))
+        node_storage.store_current_teacher(teacher_checksum=nodes[0].checksum_address)
+
+        # nothing written until the end of the batch
+        verify_all_db_tables(sqlite_connection, expect_empty=True)
+
+    # single transaction
+    assert statements.count('COMMIT') == 1
+
+    result = sqlite_connection.execute(f"SELECT COUNT(*) FROM {CrawlerNodeStorage.NODE_DB_NAME}").fetchone()
+    assert result[0] == len(nodes)
+    result = sqlite_connection.execute(f"SELECT * FROM {CrawlerNodeStorage.STATE_DB_NAME}").fetchall()
+    assert len(result) == 1  # superseded state debounced
+    verify_mock_state_matches_row(states[-1], result[0])
+    verify_current_teacher(sqlite_connection, nodes[0].checksum_address)
+
+    # states that are not superseded within the window are all written
+    node_storage.STATE_DEBOUNCE_WINDOW = 0
+    with node_storage.batch():
+        for state in states:
+            node_storage.store_state_metadata(state=FleetSensor.abridged_state_details(state))
+    result = sqlite_connection.execute(f"SELECT COUNT(*) FROM {CrawlerNodeStorage.STATE_DB_NAME}").fetchone()
+    assert result[0] == len(states)
+
+
+def test_storage_prune_states(sqlite_connection):
+    node_storage = CrawlerNodeStorage(storage_filepath=IN_MEMORY_FILEPATH)
+    node_storage.STATE_RETENTION_ROWS = 3
+    node_storage.STATE_RETENTION_PERIOD = 60 * 60 * 24
+
+    now = maya.now()
+    states = list()
+    for seed, hours in enumerate((0, 1, 2, 3, 48)):  # last state is beyond retention period
+        state = create_random_mock_state(seed=seed)
+        state.updated = now.subtract(hours=hours)
+        states.append(state)
+        node_storage.store_state_metadata(state=FleetSensor.abridged_state_details(state))
+
+    removed = node_storage.prune_states(now=now.epoch)
+    assert removed == 2
+
+    result = sqlite_connection.execute(f"SELECT nickname FROM {CrawlerNodeStorage.STATE_DB_NAME} "
+                                       f"ORDER BY updated DESC").fetchall()
+    assert [row[0] for row in result] == [str(state.nickname) for state in states[:3]]
+
+    # nothing further to prune
+    assert node_storage.prune_states(now=now.epoch) == 0
+
+
+def test_storage_in_memory_index(sqlite_connection):
+    node_storage = CrawlerNodeStorage(storage_filepath=IN_MEMORY_FILEPATH)
+    node_storage.STATE_INDEX_SIZE = 3
+    assert node_storage.get_known_nodes_metadata() == {}
+    assert node_storage.get_previous_states_metadata() == []
+    assert node_storage.get_current_teacher_checksum() is None
+
+    nodes = [create_random_mock_node() for _ in range(3)]
+    with node_storage.batch():
+        for node in nodes:
+            node_storage.store_node_metadata(node=node)
+        node_storage.store_current_teacher(teacher_checksum=nodes[0].checksum_address)
+        assert node_storage.get_known_nodes_metadata() == {}  # only indexed once written
+
+    # index matches the node table
+    known_nodes = node_storage.get_known_nodes_metadata()
+    columns = [schema[0] for schema in CrawlerNodeStorage.NODE_DB_SCHEMA]
+    result = sqlite_connection.execute(f"SELECT {', '.join(columns)} FROM {CrawlerNodeStorage.NODE_DB_NAME}")
+    assert known_nodes == {row[0]: dict(zip(columns, row)) for row in result}
+    assert node_storage.get_current_teacher_checksum() == nodes[0].checksum_address
+
+    # changes since a version
+    changes = node_storage.get_known_nodes_metadata_changes()
+    assert changes.changed == known_nodes
+    assert changes.removed == []
+    node_storage.store_node_metadata(node=nodes[0])  # unchanged
+    unchanged = node_storage.get_known_nodes_metadata_changes(since_version=changes.version)
+    assert unchanged.changed == {} and unchanged.version == changes.version
+
+    node_storage.remove(checksum_address=nodes[1].checksum_address)
+    assert set(node_storage.get_known_nodes_metadata()) == {nodes[0].checksum_address, nodes[2].checksum_address}
+    assert len(known_nodes) == 3  # previously returned metadata unaffected
+    latest_changes = node_storage.get_known_nodes_metadata_changes(since_version=changes.version)
+    assert latest_changes.changed == {}
+    assert latest_changes.removed == [nodes[1].checksum_address]
+    assert latest_changes.version > changes.version
+
+    # most recent states, newest first
+    now = maya.now()
+    states = list()
+    for seed in range(5):
+        state = create_random_mock_state(seed=seed)
+        state.updated = now.add(minutes=seed)
+        states.append(state)
+        node_storage.store_state_metadata(state=FleetSensor.abridged_state_details(state))
+        node_storage.flush()
+        node_storage._last_state_buffered = 0  # not debounced
+    previous_states = node_storage.get_previous_states_metadata()
+    assert [state['nickname'] for state in previous_states] == [str(state.nickname) for state in states[:1:-1]]
+    assert previous_states[0]['updated'] == states[-1].updated.rfc2822()
+
+    node_storage.clear()
+    assert node_storage.get_known_nodes_metadata() == {}
+    assert node_storage.get_previous_states_metadata() == []
+    assert node_storage.get_current_teacher_checksum() is None
+    cleared_changes = node_storage.get_known_nodes_metadata_changes(since_version=latest_changes.version)
+    assert sorted(cleared_changes.removed) == sorted([nodes[0].checksum_address, nodes[2].checksum_address])
+
+
 #
 # Crawler tests.
 #
 
-def create_crawler(node_db_filepath: str = IN_MEMORY_FILEPATH):
+def create_crawler(node_db_filepath: str = IN_MEMORY_FILEPATH, learning_fan_out: int = 1):
     registry = InMemoryContractRegistry()
     middleware = RestMiddleware()
     crawler = Crawler(domain='ibex',  # TODO: Needs Cleanup
@@ -216,7 +443,8 @@ def create_crawler(node_db_filepath: str = IN_MEMORY_FILEPATH):
                       learn_on_same_thread=False,
                       influx_host='localhost',  # TODO: Needs Cleanup
                       influx_port=8086,  # TODO: Needs Cleanup
-                      node_storage_filepath=node_db_filepath
+                      node_storage_filepath=node_db_filepath,
+                      learning_fan_out=learning_fan_out
                       )
     return crawler
 
@@ -249,7 +477,176 @@ def test_crawler_init(get_agent, get_economics):
 
 @patch.object(monitor.crawler.EconomicsFactory, 'get_economics', autospec=True)
 @patch.object(monitor.crawler.ContractAgency, 'get_agent', autospec=True)
-@patch('monitor.crawler.InfluxDBClient', autospec=True)
+def test_crawler_teacher_selection(get_agent, get_economics):
+    staking_agent = MagicMock(spec=StakingEscrowAgent)
+    contract_agency = MockContractAgency(staking_agent=staking_agent)
+    get_agent.side_effect = contract_agency.get_agent
+    get_economics.return_value = StandardTokenEconomics()
+
+    crawler = create_crawler()
+    teachers = [create_random_mock_node() for _ in range(3)]
+    crawler._teacher_statistics.record_success(teachers[0].checksum_address, latency=5)
+    crawler._teacher_statistics.record_success(teachers[1].checksum_address, latency=0.1)
+
+    # fastest teacher is learned from first, then the unmeasured teacher
+    crawler.teacher_nodes.clear()
+    with patch.object(crawler.known_nodes, 'shuffled', return_value=teachers):
+        crawler.select_teacher_nodes()
+    assert crawler.teacher_nodes.pop() == teachers[1]
+    assert crawler.teacher_nodes.pop() == teachers[2]
+    assert crawler.teacher_nodes.pop() == teachers[0]
+
+    # learning rounds are recorded for the teacher
+    with patch.object(crawler, 'current_teacher_node', return_value=teachers[2]), \
+            patch.object(monitor.crawler.Learner, 'learn_from_teacher_node', return_value=None):
+        for _ in range(TeacherStatistics.DEFAULT_QUARANTINE_FAILURES):
+            crawler.learn_from_teacher_node()
+    teacher_stats = crawler.teacher_stats[teachers[2].checksum_address]
+    assert teacher_stats['rounds'] == TeacherStatistics.DEFAULT_QUARANTINE_FAILURES
+    assert teacher_stats['error_rate'] == 1
+    assert crawler._teacher_statistics.is_quarantined(teachers[2].checksum_address)
+
+
+@patch.object(monitor.crawler.EconomicsFactory, 'get_economics', autospec=True)
+@patch.object(monitor.crawler.ContractAgency, 'get_agent', autospec=True)
+def test_crawler_concurrent_learning(get_agent, get_economics):
+    staking_agent = MagicMock(spec=StakingEscrowAgent)
+    contract_agency = MockContractAgency(staking_agent=staking_agent)
+    get_agent.side_effect = contract_agency.get_agent
+    get_economics.return_value = StandardTokenEconomics()
+
+    crawler = create_crawler(learning_fan_out=3)
+    teachers = [create_random_mock_node() for _ in range(3)]
+    nodes = [create_random_mock_node() for _ in range(4)]
+    for node in nodes:
+        node.domain = crawler.known_nodes.domain
+    crawler.remember_node(nodes[0], record_fleet_state=False)  # already known
+    learned_nodes = {teachers[0].checksum_address: nodes[:3],
+                     teachers[1].checksum_address: nodes[1:]}  # overlapping
+    all_teachers_learning = threading.Barrier(len(teachers), timeout=5)
+
+    def learn_from_teacher_node(*args, **kwargs):
+        all_teachers_learning.wait()  # teachers are learned from concurrently
+        crawler._learning_round += 1
+        teacher = crawler.current_teacher_node()
+        if teacher == teachers[2]:
+            raise RuntimeError("teacher unavailable")
+        sprouts = learned_nodes[teacher.checksum_address]
+        for sprout in sprouts:
+            crawler.remember_node(sprout, record_fleet_state=False)
+        crawler.known_nodes.record_fleet_state()
+        return sprouts
+
+    crawler.teacher_nodes.clear()
+    learning_round = crawler._learning_round
+    with patch.object(crawler.known_nodes, 'shuffled', return_value=teachers), \
+            patch.object(monitor.crawler.Learner, 'learn_from_teacher_node', side_effect=learn_from_teacher_node), \
+            patch.object(FleetSensor, 'record_fleet_state', return_value=None) as record_fleet_state:
+        new_nodes = crawler.learn_from_teacher_node()
+
+    # deduplicated
+    assert sorted(node.checksum_address for node in new_nodes) == sorted(node.checksum_address for node in nodes)
+    assert crawler._learning_round == learning_round + len(teachers)
+
+    # fleet state recorded once, for the nodes that were new
+    record_fleet_state.assert_called_once()
+    assert crawler._new_nodes_average == 1 + Crawler.LEARNING_DELAY_SMOOTHING * (3 - 1)
+
+    teacher_stats = crawler.teacher_stats
+    assert teacher_stats[teachers[0].checksum_address]['error_rate'] == 0
+    assert teacher_stats[teachers[1].checksum_address]['error_rate'] == 0
+    assert teacher_stats[teachers[2].checksum_address]['error_rate'] == 1
+
+    # teachers and remembered nodes stored
+    assert set(crawler.node_storage.get_known_nodes_metadata()) == {node.checksum_address for node in teachers + nodes}
+    assert crawler.node_storage.get_current_teacher_checksum() == teachers[0].checksum_address
+
+    # learning delay lengthens as fewer new nodes are discovered
+    assert crawler._learning_task.interval == Crawler._SHORT_LEARNING_DELAY
+    crawler._adapt_learning_delay(num_new_nodes=0)
+    assert crawler._learning_task.interval == Crawler._SHORT_LEARNING_DELAY  # average of 1
+    crawler._adapt_learning_delay(num_new_nodes=0)
+    delay = crawler._learning_task.interval
+    assert Crawler._SHORT_LEARNING_DELAY < delay < Crawler._LONG_LEARNING_DELAY
+    for _ in range(20):
+        crawler._adapt_learning_delay(num_new_nodes=0)
+    assert delay < crawler._learning_task.interval <= Crawler._LONG_LEARNING_DELAY
+
+
+@patch.object(monitor.crawler.EconomicsFactory, 'get_economics', autospec=True)
+@patch.object(monitor.crawler.ContractAgency, 'get_agent', autospec=True)
+def test_crawler_measure_known_nodes(get_agent, get_economics):
+    staking_agent = MagicMock(spec=StakingEscrowAgent)
+    contract_agency = MockContractAgency(staking_agent=staking_agent)
+    get_agent.side_effect = contract_agency.get_agent
+    token_economics = StandardTokenEconomics()
+    get_economics.return_value = token_economics
+
+    current_period = datetime_to_period(datetime=maya.now(), seconds_per_period=token_economics.seconds_per_period)
+    staking_agent.get_last_committed_period.return_value = current_period + 1
+    staking_agent.get_worker_from_staker.return_value = '0xdeadbeef'
+
+    crawler = create_crawler()
+    nodes = [create_random_mock_node() for _ in range(3)]
+    for node in nodes:
+        crawler.node_storage.store_node_metadata(node=node)
+
+    payload = crawler.measure_known_nodes()
+    assert {node['staker_address'] for node in payload['confirmed']} == {node.checksum_address for node in nodes}
+    assert staking_agent.get_last_committed_period.call_count == 3
+    assert staking_agent.get_worker_from_staker.call_count == 3
+
+    # staking contract only read again for changed nodes
+    crawler.measure_known_nodes()
+    assert staking_agent.get_last_committed_period.call_count == 3
+    staking_agent.get_last_committed_period.return_value = current_period
+    nodes[0].timestamp = nodes[0].timestamp.add(seconds=1)
+    crawler.node_storage.store_node_metadata(node=nodes[0])
+    payload = crawler.measure_known_nodes()
+    assert staking_agent.get_last_committed_period.call_count == 4
+    assert [node['staker_address'] for node in payload['pending']] == [nodes[0].checksum_address]
+
+    # removed nodes are no longer measured
+    crawler.node_storage.remove(checksum_address=nodes[1].checksum_address)
+    payload = crawler.measure_known_nodes()
+    assert {node['staker_address'] for node in payload['confirmed']} == {nodes[2].checksum_address}
+
+    # all nodes read again once the period advances
+    with patch.object(monitor.crawler, 'datetime_to_period', return_value=current_period + 1):
+        crawler.measure_known_nodes()
+    assert staking_agent.get_last_committed_period.call_count == 6
+    assert staking_agent.get_worker_from_staker.call_count == 6
+
+
+@patch.object(monitor.crawler.EconomicsFactory, 'get_economics', autospec=True)
+@patch.object(monitor.crawler.ContractAgency, 'get_agent', autospec=True)
+def test_crawler_collect_network_info(get_agent, get_economics):
+    staking_agent = MagicMock(spec=StakingEscrowAgent)
+    staking_agent.blockchain = MagicMock()
+    staking_agent.blockchain.client.w3.eth.getBlock.return_value = MagicMock(number=10, timestamp=1602720000)
+    contract_agency = MockContractAgency(staking_agent=staking_agent)
+    get_agent.side_effect = contract_agency.get_agent
+    get_economics.return_value = StandardTokenEconomics()
+
+    staking_agent.partition_stakers_by_activity.return_value = (['0xA', '0xB'], ['0xC'], ['0xD', '0xE', '0xF'])
+    staking_agent.get_global_locked_tokens.return_value = NU(1000, 'NU').to_nunits()
+    staking_agent.get_all_active_stakers.return_value = (0, dict())
+
+    crawler = create_crawler()
+    crawler._measurement_writer = MagicMock()
+    crawler._collect_stats(threaded=False)
+
+    network_info = crawler._measurement_writer.write.call_args[0][0][0]
+    _, _, fields, timestamp = parse_line_protocol(network_info)
+    assert timestamp == 1602720000
+    assert fields['locked_stake'] == 1000.0
+    assert fields['num_stakers'] == 3  # stakers running nodes, as counted from node information
+    assert (fields['active_stakers'], fields['pending_stakers'], fields['inactive_stakers']) == (2, 1, 3)
+
+
+@patch.object(monitor.crawler.EconomicsFactory, 'get_economics', autospec=True)
+@patch.object(monitor.crawler.ContractAgency, 'get_agent', autospec=True)
+@patch('monitor.storage.InfluxDBClient', autospec=True)
 def test_crawler_stop_before_start(new_influx_db, get_agent, get_economics):
     mock_influxdb_client = new_influx_db.return_value
 
@@ -271,7 +668,7 @@ def test_crawler_stop_before_start(new_influx_db, get_agent, get_economics):
 
 @pytest.mark.skip("stopping a started crawler is not stopping the thread; ctrl-c needed")
 @patch.object(monitor.crawler.ContractAgency, 'get_agent', autospec=True)
-@patch('monitor.crawler.InfluxDBClient', autospec=True)
+@patch('monitor.storage.InfluxDBClient', autospec=True)
 def test_crawler_start_then_stop(new_influx_db, get_agent):
     mock_influxdb_client = new_influx_db.return_value
 
@@ -311,7 +708,7 @@ def test_crawler_start_no_influx_db_connection(get_agent, get_economics):
 
 @pytest.mark.skip("stopping a started crawler is not stopping the thread; ctrl-c needed")
 @patch.object(monitor.crawler.ContractAgency, 'get_agent', autospec=True)
-@patch('monitor.crawler.InfluxDBClient', autospec=True)
+@patch('monitor.storage.InfluxDBClient', autospec=True)
 def test_crawler_start_blockchain_db_not_present(new_influx_db, get_agent):
     mock_influxdb_client = new_influx_db.return_value
     mock_influxdb_client.get_list_database.return_value = [{'name': 'db1'},
@@ -330,9 +727,9 @@ def test_crawler_start_blockchain_db_not_present(new_influx_db, get_agent):
 
         # ensure table existence check run
         mock_influxdb_client.get_list_database.assert_called_once()
-        # db created since not present
+        # db created since not present - along with retention policies for all tiers
         mock_influxdb_client.create_database.assert_called_once_with(Crawler.INFLUX_DB_NAME)
-        mock_influxdb_client.create_retention_policy.assert_called_once()
+        assert mock_influxdb_client.create_retention_policy.call_count == len(Crawler.NODE_INFO_TIERS)
     finally:
         crawler.stop()
 
@@ -342,12 +739,18 @@ def test_crawler_start_blockchain_db_not_present(new_influx_db, get_agent):
 
 @pytest.mark.skip("stopping a started crawler is not stopping the thread; ctrl-c needed")
 @patch.object(monitor.crawler.ContractAgency, 'get_agent', autospec=True)
-@patch('monitor.crawler.InfluxDBClient', autospec=True)
+@patch('monitor.storage.InfluxDBClient', autospec=True)
 def test_crawler_start_blockchain_db_already_present(new_influx_db, get_agent):
     mock_influxdb_client = new_influx_db.return_value
     mock_influxdb_client.get_list_database.return_value = [{'name': 'db1'},
                                                            {'name': f'{Crawler.INFLUX_DB_NAME}'},
                                                            {'name': 'db3'}]
+    mock_influxdb_client.get_list_retention_policies.return_value = [{'name': tier.retention_policy}
+                                                                      for tier in Crawler.NODE_INFO_TIERS]
+    mock_influxdb_client.get_list_continuous_queries.return_value = [
+        {Crawler.INFLUX_DB_NAME: [{'name': f'cq_{tier.measurement}'}
+                                  for tier in Crawler.NODE_INFO_TIERS + Crawler.NETWORK_INFO_TIERS]}
+    ]
 
     staking_agent = MagicMock(spec=StakingEscrowAgent)
     contract_agency = MockContractAgency(staking_agent=staking_agent)
@@ -373,7 +776,7 @@ def test_crawler_start_blockchain_db_already_present(new_influx_db, get_agent):
 
 @pytest.mark.skip("stopping a started crawler is not stopping the thread; ctrl-c needed")
 @patch.object(monitor.crawler.ContractAgency, 'get_agent', autospec=True)
-@patch('monitor.crawler.InfluxDBClient', autospec=True)
+@patch('monitor.storage.InfluxDBClient', autospec=True)
 def test_crawler_learn_no_teacher(new_influx_db, get_agent, tempfile_path):
     mock_influxdb_client = new_influx_db.return_value
 
@@ -404,7 +807,7 @@ def test_crawler_learn_no_teacher(new_influx_db, get_agent, tempfile_path):
 
 @pytest.mark.skip()
 @patch.object(monitor.crawler.ContractAgency, 'get_agent', autospec=True)
-@patch('monitor.crawler.InfluxDBClient', autospec=True)
+@patch('monitor.storage.InfluxDBClient', autospec=True)
 def test_crawler_learn_about_teacher(new_influx_db, get_agent, tempfile_path):
     mock_influxdb_client = new_influx_db.return_value
 
@@ -437,10 +840,12 @@ def test_crawler_learn_about_teacher(new_influx_db, get_agent, tempfile_path):
 @pytest.mark.skip()
 @patch.object(monitor.crawler.EconomicsFactory, 'get_economics', autospec=True)
 @patch.object(monitor.crawler.ContractAgency, 'get_agent', autospec=True)
-@patch('monitor.crawler.InfluxDBClient', autospec=True)
-def test_crawler_learn_about_nodes(new_influx_db, get_agent, get_economics, tempfile_path):
+@patch('monitor.crawler.MeasurementWriter', autospec=True)
+@patch('monitor.storage.InfluxDBClient', autospec=True)
+def test_crawler_learn_about_nodes(new_influx_db, new_measurement_writer, get_agent, get_economics, tempfile_path):
     mock_influxdb_client = new_influx_db.return_value
-    mock_influxdb_client.write_points.return_value = True
+    mock_measurement_writer = new_measurement_writer.return_value
+    mock_measurement_writer.write.return_value = True
 
     # TODO: issue with use of `agent.blockchain` causes spec=StakingEscrowAgent not to be specified in MagicMock
     # Get the following - AttributeError: Mock object has no attribute 'blockchain'
@@ -488,11 +893,11 @@ def test_crawler_learn_about_nodes(new_influx_db, get_agent, get_economics, temp
             crawler._learn_about_nodes()
 
             # ensure data written to influx table
-            mock_influxdb_client.write_points.assert_called_once()
+            mock_measurement_writer.write.assert_called_once()
 
             # expected db row added
-            write_points_call_args_list = mock_influxdb_client.write_points.call_args_list
-            influx_db_line_protocol_statement = str(write_points_call_args_list[0][0])
+            write_call_args_list = mock_measurement_writer.write.call_args_list
+            influx_db_line_protocol_statement = str(write_call_args_list[0][0])
 
             expected_arguments = [f'staker_address={random_node.checksum_address}',
                                   f'worker_address="{random_node.worker_address}"',
@@ -505,11 +910,12 @@ def test_crawler_learn_about_nodes(new_influx_db, get_agent, get_economics, temp
                 assert arg in influx_db_line_protocol_statement, \
                     f"{arg} in {influx_db_line_protocol_statement} for iteration {i}"
 
-            mock_influxdb_client.reset_mock()
+            mock_measurement_writer.reset_mock()
     finally:
         crawler.stop()
 
     mock_influxdb_client.close.assert_called_once()
+    mock_measurement_writer.stop.assert_called_once()
     assert not crawler.is_running
 
 
@@ -520,7 +926,7 @@ def verify_all_db_tables_exist(db_conn, expect_present=True):
         assert len(result) == 0
     else:
         for row in result:
-            assert row[0] in DB_TABLES
+            assert row[0] in DB_TABLES + [CrawlerNodeStorage.NODE_TOMBSTONE_DB_NAME]
 
 
 def verify_all_db_tables(db_conn, expect_empty=True):
@@ -540,7 +946,7 @@ def verify_current_teacher(db_conn, expected_teacher_checksum):
 
 
 def verify_mock_node_matches(node, row):
-    assert len(row) == 6
+    assert len(row) == 7
 
     assert node.checksum_address == row[0], 'staker address matches'
     assert node.rest_url() == row[1], 'rest url matches'
@@ -548,6 +954,7 @@ def verify_mock_node_matches(node, row):
     assert node.timestamp.iso8601() == row[3], 'new now timestamp matches'
     assert node.last_seen.iso8601() == row[4], 'last seen matches'
     assert "?" == row[5], 'fleet state icon matches'
+    assert isinstance(row[6], int), 'change version'
 
 
 def verify_mock_state_matches_row(state, row):
@@ -557,4 +964,4 @@ def verify_mock_state_matches_row(state, row):
     assert state.nickname.characters[0].symbol == row[1], 'symbol matches'
     assert state.nickname.characters[0].color_hex == row[2], 'color hex matches'
     assert state.nickname.characters[0].color_name == row[3], 'color matches'
-    assert state.updated.rfc3339() == row[4], 'updated timestamp matches'  # ensure timestamp in rfc3339
+    assert state.updated.epoch == row[4], 'updated timestamp matches'  # ensure timestamp in epoch
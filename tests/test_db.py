@@ -1,16 +1,20 @@
+import re
 from datetime import datetime, timedelta
 from unittest.mock import MagicMock, patch
 
 import maya
+import pytest
 from influxdb.resultset import ResultSet
 from maya import MayaDT
 from nucypher.acumen.perception import FleetSensor
 
 from monitor.crawler import CrawlerNodeStorage, Crawler
-from monitor.db import CrawlerStorageClient, CrawlerInfluxClient
+from monitor.db import CrawlerStorageClient, CrawlerInfluxClient, HistoricalEventsCache, DailyAggregateCache
+from monitor.utils import CircuitBreaker, CircuitBreakerOpen
 from tests.utilities import (
     create_random_mock_node,
     create_random_mock_state,
+    create_specific_mock_node,
 )
 
 
@@ -53,6 +57,44 @@ def test_node_client_get_node_metadata(tempfile_path):
             assert node_info[column[0]] == expected_row[info_idx], f"{column[0]} matches"
 
 
+def test_node_client_get_node_metadata_changes(tempfile_path):
+    node_storage = CrawlerNodeStorage(storage_filepath=tempfile_path)
+    nodes = [create_random_mock_node() for _ in range(3)]
+    for node in nodes:
+        node_storage.store_node_metadata(node=node)
+
+    node_db_client = CrawlerStorageClient(db_filepath=tempfile_path)
+    changes = node_db_client.get_known_nodes_metadata_changes()
+    assert sorted(changes.changed) == sorted(node.checksum_address for node in nodes)
+    assert changes.removed == []
+
+    # no changes
+    unchanged = node_db_client.get_known_nodes_metadata_changes(since_version=changes.version)
+    assert unchanged == (changes.version, {}, [])
+
+    # re-storing unchanged metadata is not a change
+    node_storage.store_node_metadata(node=nodes[0])
+    assert node_db_client.get_known_nodes_metadata_changes(since_version=changes.version).changed == {}
+
+    # only updated and removed nodes
+    updated_node = create_specific_mock_node(checksum_address=nodes[1].checksum_address,
+                                             timestamp=maya.now().subtract(hours=1))
+    node_storage.store_node_metadata(node=updated_node)
+    node_storage.remove(checksum_address=nodes[2].checksum_address)
+
+    latest_changes = node_db_client.get_known_nodes_metadata_changes(since_version=changes.version)
+    assert latest_changes.version > changes.version
+    assert list(latest_changes.changed) == [updated_node.checksum_address]
+    assert latest_changes.changed[updated_node.checksum_address]['timestamp'] == updated_node.timestamp.iso8601()
+    assert latest_changes.removed == [nodes[2].checksum_address]
+
+    # removed node learned about again
+    node_storage.store_node_metadata(node=nodes[2])
+    readded_changes = node_db_client.get_known_nodes_metadata_changes(since_version=latest_changes.version)
+    assert list(readded_changes.changed) == [nodes[2].checksum_address]
+    assert readded_changes.removed == []
+
+
 def test_node_client_get_state_metadata(tempfile_path):
     # Add some node data
     node_storage = CrawlerNodeStorage(storage_filepath=tempfile_path)
@@ -98,7 +140,7 @@ def test_node_client_get_current_teacher_checksum(tempfile_path):
 #
 # CrawlerInfluxClient tests
 #
-@patch('monitor.db.InfluxDBClient', autospec=True)
+@patch('monitor.storage.InfluxDBClient', autospec=True)
 def test_blockchain_client_close(new_influx_db):
     mock_influxdb_client = new_influx_db.return_value
 
@@ -108,60 +150,39 @@ def test_blockchain_client_close(new_influx_db):
     mock_influxdb_client.close.assert_called_once()
 
 
-@patch('monitor.db.InfluxDBClient', autospec=True)
+@patch('monitor.storage.InfluxDBClient', autospec=True)
 def test_blockchain_client_get_historical_locked_tokens(new_influx_db):
     mock_influxdb_client = new_influx_db.return_value
 
-    mock_query_object = MagicMock(spec=ResultSet, autospec=True)
-    mock_influxdb_client.query.return_value = mock_query_object
-
-    # fake results for 5 days
+    # fake results for 5 days, including today
     days = 5
-    start_date = maya.now().subtract(days=days)
+    range_begin, range_end = CrawlerInfluxClient._get_range_bookends(days)
+    start_date = MayaDT.from_datetime(range_begin)
     base_amount = 45000
     amount_increment = 10000
 
     results = []
     for day in range(0, days):
-        results.append(dict(time=start_date.add(days=day).rfc3339(), sum=base_amount + (day * amount_increment)))
-    mock_query_object.get_points.return_value = results
+        results.append([start_date.add(days=day).epoch, base_amount + (day * amount_increment)])
+    mock_influxdb_client.query.side_effect = query_series(create_raw_series(column='locked_stake', values=results))
 
     blockchain_db_client = CrawlerInfluxClient(None, None, None)
 
     locked_tokens_dict = blockchain_db_client.get_historical_locked_tokens_over_range(days)
 
-    # check query
-    today = datetime.utcnow()
-    range_end = datetime(year=today.year, month=today.month, day=today.day,
-                         hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)  # include today in range
-    range_begin = range_end - timedelta(days=days)
-
-    expected_in_query = [
-        "SELECT SUM(locked_stake)",
-        "AS locked_stake",
-
-        f"FROM {Crawler.NODE_MEASUREMENT} WHERE time >= '{MayaDT.from_datetime(range_begin).rfc3339()}' AND "
-        f"time < '{MayaDT.from_datetime(range_end).rfc3339()}'",
-
-        "GROUP BY staker_address, time(1d)) GROUP BY time(1d)",
-    ]
-
-    mock_influxdb_client.query.assert_called_once()
-    mock_query_object.get_points.assert_called_once()
-
-    call_args_list = mock_influxdb_client.query.call_args_list
-    assert len(call_args_list) == 1
-    for idx, execute_call in enumerate(call_args_list):
-        query = execute_call[0][0]
-        for statement in expected_in_query:
-            assert statement in query
+    # check queries
+    verify_completed_and_current_day_queries(mock_influxdb_client.query.call_args_list,
+                                             selection="LAST(locked_stake) AS locked_stake",
+                                             daily_tier=Crawler.NETWORK_INFO_DAILY_TIER,
+                                             raw_tier=Crawler.NETWORK_INFO_RAW_TIER,
+                                             range_begin=range_begin,
+                                             range_end=range_end)
 
     # check results
     assert len(locked_tokens_dict) == days
 
     for idx, key in enumerate(locked_tokens_dict):
-        # use of rfc3339 loses milliseconds precision
-        date = MayaDT.from_rfc3339(start_date.add(days=idx).rfc3339()).datetime()
+        date = start_date.add(days=idx).datetime()
         assert key == date
 
         locked_tokens = locked_tokens_dict[key]
@@ -171,59 +192,39 @@ def test_blockchain_client_get_historical_locked_tokens(new_influx_db):
     mock_influxdb_client.close.assert_not_called()
 
 
-@patch('monitor.db.InfluxDBClient', autospec=True)
+@patch('monitor.storage.InfluxDBClient', autospec=True)
 def test_blockchain_client_get_historical_num_stakers(new_influx_db):
     mock_influxdb_client = new_influx_db.return_value
 
-    mock_query_object = MagicMock(spec=ResultSet, autospec=True)
-    mock_influxdb_client.query.return_value = mock_query_object
-
-    # fake results for 10 days
+    # fake results for 10 days, including today
     days = 10
-    start_date = maya.now().subtract(days=days)
+    range_begin, range_end = CrawlerInfluxClient._get_range_bookends(days)
+    start_date = MayaDT.from_datetime(range_begin)
     base_count = 100
     count_increment = 4
 
     results = []
     for day in range(0, days):
-        results.append(dict(time=start_date.add(days=day).rfc3339(), count=base_count + (day * count_increment)))
-    mock_query_object.get_points.return_value = results
+        results.append([start_date.add(days=day).epoch, base_count + (day * count_increment)])
+    mock_influxdb_client.query.side_effect = query_series(create_raw_series(column='num_stakers', values=results))
 
     blockchain_db_client = CrawlerInfluxClient(None, None, None)
 
     num_stakers_dict = blockchain_db_client.get_historical_num_stakers_over_range(days)
 
-    # check query
-    today = datetime.utcnow()
-    range_end = datetime(year=today.year, month=today.month, day=today.day,
-                         hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)  # include today in range
-    range_begin = range_end - timedelta(days=days)
-
-    expected_in_query = [
-        "SELECT COUNT(staker_address)",
-
-        f"FROM {Crawler.NODE_MEASUREMENT} WHERE time >= '{MayaDT.from_datetime(range_begin).rfc3339()}' AND "
-        f"time < '{MayaDT.from_datetime(range_end).rfc3339()}'",
-
-        "GROUP BY staker_address, time(1d)) GROUP BY time(1d)",
-    ]
-
-    mock_influxdb_client.query.assert_called_once()
-    mock_query_object.get_points.assert_called_once()
-
-    call_args_list = mock_influxdb_client.query.call_args_list
-    assert len(call_args_list) == 1
-    for idx, execute_call in enumerate(call_args_list):
-        query = execute_call[0][0]
-        for statement in expected_in_query:
-            assert statement in query
+    # check queries
+    verify_completed_and_current_day_queries(mock_influxdb_client.query.call_args_list,
+                                             selection="LAST(num_stakers) AS num_stakers",
+                                             daily_tier=Crawler.NETWORK_INFO_DAILY_TIER,
+                                             raw_tier=Crawler.NETWORK_INFO_RAW_TIER,
+                                             range_begin=range_begin,
+                                             range_end=range_end)
 
     # check results
     assert len(num_stakers_dict) == days
 
     for idx, key in enumerate(num_stakers_dict):
-        # use of rfc3339 loses milliseconds precision
-        date = MayaDT.from_rfc3339(start_date.add(days=idx).rfc3339()).datetime()
+        date = start_date.add(days=idx).datetime()
         assert key == date
 
         num_stakers = num_stakers_dict[key]
@@ -233,59 +234,39 @@ def test_blockchain_client_get_historical_num_stakers(new_influx_db):
     mock_influxdb_client.close.assert_not_called()
 
 
-@patch('monitor.db.InfluxDBClient', autospec=True)
+@patch('monitor.storage.InfluxDBClient', autospec=True)
 def test_blockchain_client_get_historical_work_orders(new_influx_db):
     mock_influxdb_client = new_influx_db.return_value
 
-    mock_query_object = MagicMock(spec=ResultSet, autospec=True)
-    mock_influxdb_client.query.return_value = mock_query_object
-
-    # fake results for 10 days
+    # fake results for 10 days, including today
     days = 10
-    start_date = maya.now().subtract(days=days)
+    range_begin, range_end = CrawlerInfluxClient._get_range_bookends(days)
+    start_date = MayaDT.from_datetime(range_begin)
     base_count = 2
     count_increment = 4
 
     results = []
     for day in range(0, days):
-        results.append(dict(time=start_date.add(days=day).rfc3339(), sum=base_count + (day * count_increment)))
-    mock_query_object.get_points.return_value = results
+        results.append([start_date.add(days=day).epoch, base_count + (day * count_increment)])
+    mock_influxdb_client.query.side_effect = query_series(create_raw_series(column='work_orders', values=results))
 
     blockchain_db_client = CrawlerInfluxClient(None, None, None)
 
     work_orders_dict = blockchain_db_client.get_historical_work_orders_over_range(days)
 
-    # check query
-    today = datetime.utcnow()
-    range_end = datetime(year=today.year, month=today.month, day=today.day,
-                         hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)  # include today in range
-    range_begin = range_end - timedelta(days=days)
-
-    expected_in_query = [
-        "SELECT SUM(work_orders)",
-
-        f"FROM {Crawler.NODE_MEASUREMENT} WHERE time >= '{MayaDT.from_datetime(range_begin).rfc3339()}' AND "
-        f"time < '{MayaDT.from_datetime(range_end).rfc3339()}'",
-
-        "GROUP BY staker_address, time(1d)) GROUP BY time(1d)",
-    ]
-
-    mock_influxdb_client.query.assert_called_once()
-    mock_query_object.get_points.assert_called_once()
-
-    call_args_list = mock_influxdb_client.query.call_args_list
-    assert len(call_args_list) == 1
-    for idx, execute_call in enumerate(call_args_list):
-        query = execute_call[0][0]
-        for statement in expected_in_query:
-            assert statement in query
+    # check queries - work orders are not part of network information
+    verify_completed_and_current_day_queries(mock_influxdb_client.query.call_args_list,
+                                             selection="SUM(work_orders) AS work_orders",
+                                             daily_tier=Crawler.NODE_INFO_DAILY_TIER,
+                                             raw_tier=Crawler.NODE_INFO_RAW_TIER,
+                                             range_begin=range_begin,
+                                             range_end=range_end)
 
     # check results
     assert len(work_orders_dict) == days
 
     for idx, key in enumerate(work_orders_dict):
-        # use of rfc3339 loses milliseconds precision
-        date = MayaDT.from_rfc3339(start_date.add(days=idx).rfc3339()).datetime()
+        date = start_date.add(days=idx).datetime()
         assert key == date
 
         num_work_orders = work_orders_dict[key]
@@ -295,6 +276,278 @@ def test_blockchain_client_get_historical_work_orders(new_influx_db):
     mock_influxdb_client.close.assert_not_called()
 
 
+@patch('monitor.storage.InfluxDBClient', autospec=True)
+def test_blockchain_client_historical_completed_days_cached(new_influx_db):
+    mock_influxdb_client = new_influx_db.return_value
+
+    days = 5
+    blockchain_db_client = CrawlerInfluxClient(None, None, None)
+    blockchain_db_client.COMPLETED_DAY_SETTLE_TIME = 0  # all days before today are completed
+    range_begin, range_end = blockchain_db_client._get_range_bookends(days)
+    day_starts = [MayaDT.from_datetime(range_begin).add(days=day) for day in range(days)]
+
+    # first call - all days queried; completed days from the daily tier and today from the raw tier
+    mock_influxdb_client.query.side_effect = query_series(
+        create_raw_series(column='locked_stake', values=[[day_start.epoch, (idx + 1) * 100]
+                                                         for idx, day_start in enumerate(day_starts)]))
+    locked_tokens_dict = blockchain_db_client.get_historical_locked_tokens_over_range(days)
+    assert list(locked_tokens_dict.values()) == [100, 200, 300, 400, 500]
+    assert mock_influxdb_client.query.call_count == 2
+    query = mock_influxdb_client.query.call_args_list[0][0][0]
+    assert f"time >= '{day_starts[0].rfc3339()}'" in query
+
+    # second call - only today queried; completed days obtained from cache
+    mock_influxdb_client.query.side_effect = query_series(
+        create_raw_series(column='locked_stake', values=[[day_starts[-1].epoch, 550]]))
+    locked_tokens_dict = blockchain_db_client.get_historical_locked_tokens_over_range(days)
+    assert list(locked_tokens_dict.keys()) == [day_start.datetime() for day_start in day_starts]
+    assert list(locked_tokens_dict.values()) == [100, 200, 300, 400, 550]
+    assert mock_influxdb_client.query.call_count == 3
+    query = mock_influxdb_client.query.call_args[0][0]
+    assert f"time >= '{day_starts[-1].rfc3339()}'" in query
+
+    # cache is per metric
+    mock_influxdb_client.query.side_effect = query_series(
+        create_raw_series(column='num_stakers', values=[[day_start.epoch, 10] for day_start in day_starts]))
+    num_stakers_dict = blockchain_db_client.get_historical_num_stakers_over_range(days)
+    assert list(num_stakers_dict.values()) == [10] * days
+    query = mock_influxdb_client.query.call_args_list[3][0][0]
+    assert f"time >= '{day_starts[0].rfc3339()}'" in query
+
+
+def test_daily_aggregate_cache_persistence(tempfile_path):
+    daily_cache = DailyAggregateCache(db_filepath=tempfile_path)
+    day_epoch = MayaDT.from_rfc3339('2020-10-15T00:00:00.0Z').epoch
+    daily_cache.put(metric='SUM(locked_stake)', values={day_epoch: 1.5, day_epoch + 86400: None})
+    daily_cache.put(metric='COUNT(locked_stake)', values={day_epoch: 5})
+
+    # days without a value are only cached for a while
+    day_epochs = [day_epoch, day_epoch + 86400, day_epoch + 172800]
+    assert daily_cache.get(metric='SUM(locked_stake)', day_epochs=day_epochs) == {day_epoch: 1.5,
+                                                                                  day_epoch + 86400: None}
+    with patch('maya.now', return_value=maya.now().add(seconds=DailyAggregateCache.MISSING_VALUE_TTL)):
+        assert daily_cache.get(metric='SUM(locked_stake)', day_epochs=day_epochs) == {day_epoch: 1.5}
+
+    # late value replaces missing value
+    daily_cache.put(metric='SUM(locked_stake)', values={day_epoch + 172800: None})
+    daily_cache.put(metric='SUM(locked_stake)', values={day_epoch + 172800: 2.5})
+    assert daily_cache.get(metric='SUM(locked_stake)', day_epochs=[day_epoch + 172800]) == {day_epoch + 172800: 2.5}
+
+    # new instance loads persisted values, but not missing values
+    daily_cache = DailyAggregateCache(db_filepath=tempfile_path)
+    assert daily_cache.get(metric='SUM(locked_stake)', day_epochs=day_epochs) == {day_epoch: 1.5,
+                                                                                  day_epoch + 172800: 2.5}
+    counts = daily_cache.get(metric='COUNT(locked_stake)', day_epochs=[day_epoch])
+    assert counts == {day_epoch: 5}
+    assert isinstance(counts[day_epoch], int)
+
+    # in-memory only
+    daily_cache = DailyAggregateCache()
+    assert daily_cache.get(metric='SUM(locked_stake)', day_epochs=[day_epoch]) == {}
+
+
+@patch('monitor.storage.InfluxDBClient', autospec=True)
+def test_blockchain_client_get_historical_network_metrics(new_influx_db):
+    mock_influxdb_client = new_influx_db.return_value
+
+    days = 3
+    blockchain_db_client = CrawlerInfluxClient(None, None, None)
+    range_begin, range_end = blockchain_db_client._get_range_bookends(days)
+    day_starts = [MayaDT.from_datetime(range_begin).add(days=day) for day in range(days)]
+    query_network_info = query_series(create_raw_series('locked_stake',
+                                                        [[day_starts[0].epoch, 1000.0, 10],
+                                                         [day_starts[1].epoch, 1500.0, 12],
+                                                         [day_starts[2].epoch, 1750.0, 13]],
+                                                        'num_stakers'))
+    query_node_info = query_series(create_raw_series('work_orders',
+                                                     [[day_starts[0].epoch, 2],
+                                                      [day_starts[2].epoch, 4]]))
+    mock_influxdb_client.query.side_effect = lambda statement, *args, **kwargs: \
+        (query_node_info if 'work_orders' in statement else query_network_info)(statement, *args, **kwargs)
+
+    network_metrics = blockchain_db_client.get_historical_network_metrics(days=days)
+
+    # single query (completed days and today) for all network information metrics; work orders are
+    # aggregated from node information
+    queries = [call[0][0] for call in mock_influxdb_client.query.call_args_list]
+    assert len(queries) == 4
+    for node_info_query in queries[:2]:
+        assert node_info_query.startswith("SELECT SUM(work_orders) AS work_orders FROM")
+    for query in queries[2:]:
+        assert query.startswith("SELECT LAST(locked_stake) AS locked_stake, "
+                                "LAST(num_stakers) AS num_stakers FROM")
+
+    # aligned columns
+    assert list(network_metrics.keys()) == ['time', 'locked_stake', 'num_stakers', 'work_orders']
+    assert network_metrics['time'] == [day_start.epoch for day_start in day_starts]
+    assert network_metrics['locked_stake'] == [1000.0, 1500.0, 1750.0]
+    assert network_metrics['num_stakers'] == [10, 12, 13]
+    assert network_metrics['work_orders'] == [2, None, 4]
+
+    # subset of metrics
+    mock_influxdb_client.query.side_effect = query_series(
+        create_raw_series('num_stakers', [[day_start.epoch, 10] for day_start in day_starts]))
+    network_metrics = blockchain_db_client.get_historical_network_metrics(days=days, metrics=['num_stakers'])
+    assert list(network_metrics.keys()) == ['time', 'num_stakers']
+
+    with pytest.raises(ValueError):
+        blockchain_db_client.get_historical_network_metrics(days=days, metrics=['locked_stake', 'unknown'])
+
+
+@patch('monitor.storage.InfluxDBClient', autospec=True)
+def test_blockchain_client_network_metrics_storage_unavailable(new_influx_db):
+    mock_influxdb_client = new_influx_db.return_value
+    mock_query_object = MagicMock(spec=ResultSet, autospec=True)
+    mock_influxdb_client.query.return_value = mock_query_object
+
+    days = 2
+    blockchain_db_client = CrawlerInfluxClient(None, None, None)
+
+    # queries are bounded
+    _, influx_kwargs = new_influx_db.call_args
+    assert influx_kwargs['timeout'] == CrawlerInfluxClient.QUERY_TIMEOUT
+    assert influx_kwargs['retries'] == CrawlerInfluxClient.QUERY_ATTEMPTS
+
+    range_begin, _ = blockchain_db_client._get_range_bookends(days)
+    day_starts = [MayaDT.from_datetime(range_begin).add(days=day) for day in range(days)]
+    mock_query_object.raw = create_raw_series('num_stakers', [[day_start.epoch, 10] for day_start in day_starts])
+    network_metrics = blockchain_db_client.get_historical_network_metrics(days=days, metrics=['num_stakers'])
+    assert network_metrics['num_stakers'] == [10, 10]
+
+    # storage unavailable - last good result returned
+    mock_influxdb_client.query.side_effect = ConnectionError('InfluxDB unavailable')
+    for _ in range(CrawlerInfluxClient.CIRCUIT_FAILURE_THRESHOLD):
+        assert blockchain_db_client.get_historical_network_metrics(days=days, metrics=['num_stakers']) \
+               == network_metrics
+    assert blockchain_db_client.circuit_breaker.state == CircuitBreaker.OPEN
+
+    # circuit open - storage no longer queried
+    mock_influxdb_client.query.reset_mock()
+    assert blockchain_db_client.get_historical_network_metrics(days=days, metrics=['num_stakers']) \
+           == network_metrics
+    mock_influxdb_client.query.assert_not_called()
+
+    # no last good result for other ranges
+    with pytest.raises(CircuitBreakerOpen):
+        blockchain_db_client.get_historical_network_metrics(days=days + 1, metrics=['num_stakers'])
+
+
+def create_raw_series(column: str, values: list, *additional_columns):
+    return {'statement_id': 0,
+            'series': [{'name': Crawler.NETWORK_INFO_DAILY_TIER.measurement,
+                        'columns': ['time', column, *additional_columns],
+                        'values': values}]}
+
+
+def query_series(raw_series: dict):
+    """Mock query returning the values of the series within the time range of each query."""
+    def query(statement: str, *args, **kwargs):
+        begin, end = re.search(r"WHERE time >= '([^']+)' AND time < '([^']+)'", statement).groups()
+        begin, end = MayaDT.from_rfc3339(begin).epoch, MayaDT.from_rfc3339(end).epoch
+        series = raw_series['series'][0]
+        values = [row for row in series['values'] if begin <= row[0] < end]
+        return ResultSet({'statement_id': 0, 'series': [dict(series, values=values)]})
+    return query
+
+
+def verify_completed_and_current_day_queries(call_args_list, selection: str, daily_tier, raw_tier,
+                                             range_begin: datetime, range_end: datetime):
+    """Completed days are obtained from the daily tier, and today from the raw tier."""
+    today = range_end - timedelta(days=1)
+    assert len(call_args_list) == 2
+    for call, tier, begin, end in ((call_args_list[0], daily_tier, range_begin, today),
+                                   (call_args_list[1], raw_tier, today, range_end)):
+        query = call[0][0]
+        assert selection in query
+        assert (f'FROM "{tier.retention_policy}"."{tier.measurement}" '
+                f"WHERE time >= '{MayaDT.from_datetime(begin).rfc3339()}' AND "
+                f"time < '{MayaDT.from_datetime(end).rfc3339()}'") in query
+        assert "GROUP BY time(1d)" in query
+        assert call[1]['epoch'] == 's'
+
+
+#
+# HistoricalEventsCache tests
+#
+
+def test_events_cache_incremental_refresh():
+    influx_client = MagicMock(spec=CrawlerInfluxClient)
+    influx_client._get_range_bookends.side_effect = CrawlerInfluxClient._get_range_bookends
+
+    now = maya.now()
+    old_event = create_event(time=now.subtract(days=2), txhash='0x1')
+    latest_event = create_event(time=now.subtract(hours=1), txhash='0x2')
+    influx_client.get_historical_events.return_value = [latest_event, old_event]  # decreasing order
+
+    events_cache = HistoricalEventsCache(influx_client=influx_client, days=30, ttl=0)
+
+    # initial load of window
+    events = events_cache.get_events()
+    assert events == [latest_event, old_event]
+    influx_client.get_historical_events.assert_called_once_with(days=30)
+
+    # subsequent refresh only requests events since the high-water mark
+    influx_client.reset_mock()
+    new_event = create_event(time=now, txhash='0x3')
+    influx_client.get_historical_events.return_value = [new_event, latest_event]  # includes high-water mark event
+    events = events_cache.get_events()
+    assert events == [new_event, latest_event, old_event]  # no duplicates
+
+    influx_client.get_historical_events.assert_called_once()
+    since = influx_client.get_historical_events.call_args[1]['since']
+    assert since.epoch == MayaDT.from_rfc3339(latest_event['time']).epoch
+
+
+def test_events_cache_ttl_and_window():
+    influx_client = MagicMock(spec=CrawlerInfluxClient)
+    influx_client._get_range_bookends.side_effect = CrawlerInfluxClient._get_range_bookends
+
+    now = maya.now()
+    recent_event = create_event(time=now.subtract(days=1), txhash='0x1')
+    expired_event = create_event(time=now.subtract(days=10), txhash='0x2')
+    influx_client.get_historical_events.return_value = [recent_event, expired_event]
+
+    events_cache = HistoricalEventsCache(influx_client=influx_client, days=5, ttl=600)
+    events = events_cache.get_events()
+    assert events == [recent_event]  # events outside of window are dropped
+
+    # within ttl - served from memory
+    influx_client.reset_mock()
+    events = events_cache.get_events()
+    assert events == [recent_event]
+    influx_client.get_historical_events.assert_not_called()
+
+
+def test_events_cache_storage_unavailable():
+    influx_client = MagicMock(spec=CrawlerInfluxClient)
+    influx_client._get_range_bookends.side_effect = CrawlerInfluxClient._get_range_bookends
+
+    event = create_event(time=maya.now().subtract(hours=1), txhash='0x1')
+    influx_client.get_historical_events.return_value = [event]
+
+    events_cache = HistoricalEventsCache(influx_client=influx_client, days=30, ttl=0)
+    assert events_cache.get_events() == [event]
+
+    # previously obtained events are served
+    influx_client.get_historical_events.side_effect = CircuitBreakerOpen('InfluxDB unavailable')
+    assert events_cache.get_events() == [event]
+
+    # non-storage errors are not suppressed
+    influx_client.get_historical_events.side_effect = ValueError('bad query')
+    with pytest.raises(ValueError):
+        events_cache.get_events()
+
+
+def create_event(time: MayaDT, txhash: str):
+    return dict(time=time.rfc3339(),
+                txhash=txhash,
+                contract_name='StakingEscrow',
+                contract_address='0xdeadbeef',
+                event_name='Slashed',
+                block_number=1,
+                args='')
+
+
 def convert_node_to_db_row(node):
     return (node.checksum_address, node.rest_url(), str(node.nickname),
             node.timestamp.iso8601(), node.last_seen.iso8601(), "?")
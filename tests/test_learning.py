@@ -0,0 +1,67 @@
+import time
+from unittest.mock import MagicMock
+
+from monitor.learning import TeacherStatistics
+
+
+def create_teachers(num_teachers):
+    return [MagicMock(checksum_address=f'0x{i}') for i in range(num_teachers)]
+
+
+def test_teacher_statistics_moving_averages():
+    teacher_statistics = TeacherStatistics(smoothing=0.5, failure_penalty=10)
+    assert teacher_statistics.stats == {}
+    assert teacher_statistics.score('0x0') == TeacherStatistics.DEFAULT_UNMEASURED_LATENCY
+
+    teacher_statistics.record_success('0x0', latency=1)  # first observation seeds the averages
+    assert teacher_statistics.stats['0x0'] == {'latency': 1, 'error_rate': 0, 'rounds': 1, 'failures': 0,
+                                               'quarantined': False}
+    assert teacher_statistics.score('0x0') == 1
+
+    teacher_statistics.record_success('0x0', latency=3)
+    teacher_statistics.record_failure('0x0', latency=2)
+    stats = teacher_statistics.stats['0x0']
+    assert stats['latency'] == 2  # 1 -> 2 -> 2
+    assert stats['error_rate'] == 0.5  # 0 -> 0 -> 0.5
+    assert stats['rounds'] == 3
+    assert stats['failures'] == 1
+    assert teacher_statistics.score('0x0') == 2 + 0.5 * 10
+
+
+def test_teacher_statistics_rank():
+    teacher_statistics = TeacherStatistics(smoothing=0.5, failure_penalty=10, unmeasured_latency=2)
+    teachers = create_teachers(4)
+    teacher_statistics.record_success('0x0', latency=3)  # slow
+    teacher_statistics.record_success('0x1', latency=1)  # fast
+    teacher_statistics.record_success('0x2', latency=0.5)
+    teacher_statistics.record_failure('0x2', latency=0.5)  # fast, but flaky
+    # 0x3 unmeasured
+
+    ranked = teacher_statistics.rank(teachers)
+    assert [teacher.checksum_address for teacher in ranked] == ['0x1', '0x3', '0x0', '0x2']
+
+
+def test_teacher_statistics_quarantine():
+    teacher_statistics = TeacherStatistics(quarantine_failures=2, quarantine_period=0.5)
+    teachers = create_teachers(2)
+
+    teacher_statistics.record_failure('0x0', latency=1)
+    assert not teacher_statistics.is_quarantined('0x0')
+    teacher_statistics.record_success('0x0', latency=1)  # consecutive failures reset
+    teacher_statistics.record_failure('0x0', latency=1)
+    assert not teacher_statistics.is_quarantined('0x0')
+
+    teacher_statistics.record_failure('0x0', latency=1)
+    assert teacher_statistics.is_quarantined('0x0')
+    assert teacher_statistics.stats['0x0']['quarantined']
+    assert teacher_statistics.rank(teachers) == [teachers[1]]
+
+    # all teachers quarantined - learning continues with all of them
+    teacher_statistics.record_failure('0x1', latency=1)
+    teacher_statistics.record_failure('0x1', latency=1)
+    assert set(teacher_statistics.rank(teachers)) == set(teachers)
+
+    # released after the quarantine period
+    time.sleep(0.6)
+    assert not teacher_statistics.is_quarantined('0x0')
+    assert not teacher_statistics.stats['0x0']['quarantined']
@@ -0,0 +1,52 @@
+from unittest.mock import MagicMock, patch
+
+from nucypher.blockchain.economics import EconomicsFactory
+
+import monitor.metadata
+from monitor.metadata import NetworkMetadata, ContractMetadata
+
+
+def create_mock_agent(agent_class, registry, chain_name='Goerli', chain_id=5):
+    agent = MagicMock(spec=agent_class)
+    agent.contract_name = agent_class.__name__.replace('Agent', '')
+    agent.contract_address = f'0x{registry.id}{agent.contract_name}'
+    agent.contract.version = 'v1.2.3'
+    agent.blockchain = MagicMock()  # instance attribute, not part of the agent class spec
+    agent.blockchain.client.chain_name = chain_name
+    agent.blockchain.client.chain_id = chain_id
+    return agent
+
+
+@patch.object(EconomicsFactory, 'get_economics', autospec=True)
+@patch.object(monitor.metadata.ContractAgency, 'get_agent', autospec=True)
+def test_network_metadata(get_agent, get_economics):
+    get_agent.side_effect = lambda agent_class, registry: create_mock_agent(agent_class, registry)
+    economics = MagicMock(**{name: i for i, name in enumerate(NetworkMetadata.ECONOMICS_CONSTANTS)})
+    get_economics.return_value = economics
+
+    registry = MagicMock(id='abcdef0123456789')
+    metadata = NetworkMetadata(registry=registry)
+    assert get_agent.call_count == len(NetworkMetadata.AGENT_CLASSES)
+
+    assert metadata.registry_id == registry.id
+    assert metadata.chain_name == 'Goerli'
+    assert metadata.chain_id == 5
+
+    assert len(metadata.contracts) == len(NetworkMetadata.AGENT_CLASSES)
+    for contract, agent_class in zip(metadata.contracts, NetworkMetadata.AGENT_CLASSES):
+        contract_name = agent_class.__name__.replace('Agent', '')
+        assert contract == ContractMetadata(name=contract_name,
+                                            address=f'0x{registry.id}{contract_name}',
+                                            version='v1.2.3')
+
+    assert list(metadata.economics.keys()) == list(NetworkMetadata.ECONOMICS_CONSTANTS)
+    for i, name in enumerate(NetworkMetadata.ECONOMICS_CONSTANTS):
+        assert metadata.economics[name] == i
+
+    # registry update
+    updated_registry = MagicMock(id='9876543210fedcba')
+    metadata.refresh(registry=updated_registry)
+    assert get_agent.call_count == 2 * len(NetworkMetadata.AGENT_CLASSES)
+    assert metadata.registry_id == updated_registry.id
+    for contract in metadata.contracts:
+        assert contract.address.startswith(f'0x{updated_registry.id}')
@@ -0,0 +1,160 @@
+import datetime
+import os
+import socket
+import ssl
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from cryptography import x509
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+
+from monitor.prober import NodeProber, ProbeResult
+
+
+class StatusRequestHandler(BaseHTTPRequestHandler):
+    delay = 0  # seconds
+    in_flight = 0
+    max_in_flight = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        cls = self.__class__
+        with cls.lock:
+            cls.in_flight += 1
+            cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+        try:
+            time.sleep(cls.delay)
+            self.send_response(200 if self.path == NodeProber.STATUS_PATH else 404)
+            self.end_headers()
+        finally:
+            with cls.lock:
+                cls.in_flight -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+def create_self_signed_certificate(directory, host: str):
+    private_key = ec.generate_private_key(ec.SECP256R1(), default_backend())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, host)])
+    now = datetime.datetime.utcnow()
+    certificate = x509.CertificateBuilder().subject_name(name).issuer_name(name) \
+        .public_key(private_key.public_key()) \
+        .serial_number(x509.random_serial_number()) \
+        .not_valid_before(now) \
+        .not_valid_after(now + datetime.timedelta(days=1)) \
+        .sign(private_key, hashes.SHA256(), default_backend())
+
+    certificate_filepath = os.path.join(directory, 'node.pem')
+    with open(certificate_filepath, 'wb') as f:
+        f.write(certificate.public_bytes(serialization.Encoding.PEM))
+    key_filepath = os.path.join(directory, 'node.key')
+    with open(key_filepath, 'wb') as f:
+        f.write(private_key.private_bytes(encoding=serialization.Encoding.PEM,
+                                          format=serialization.PrivateFormat.TraditionalOpenSSL,
+                                          encryption_algorithm=serialization.NoEncryption()))
+    return certificate_filepath, key_filepath
+
+
+@pytest.fixture(scope='module')
+def node_rest_url(tmp_path_factory):
+    """Stand-in for a node's REST server, with a self-signed certificate."""
+    host = '127.0.0.1'
+    certificate_filepath, key_filepath = create_self_signed_certificate(tmp_path_factory.mktemp('tls'), host=host)
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(certificate_filepath, key_filepath)
+
+    server = ThreadingHTTPServer((host, 0), StatusRequestHandler)
+    server.socket = context.wrap_socket(server.socket, server_side=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'{host}:{server.server_address[1]}'
+    server.shutdown()
+    server.server_close()
+
+
+def get_closed_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def test_probe_reachable(node_rest_url):
+    result = NodeProber().probe(node_rest_url)
+    assert result.reachable
+    assert result.error is None
+    assert result.handshake_latency > 0
+    assert result.status_latency > 0
+
+
+def test_probe_unreachable():
+    prober = NodeProber(timeout=1)
+    result = prober.probe(f'127.0.0.1:{get_closed_port()}')
+    assert not result.reachable
+    assert result.error
+    assert result.handshake_latency is None and result.status_latency is None
+
+    result = prober.probe('not-a-rest-url')
+    assert not result.reachable
+    assert result.error
+
+
+def test_probe_nodes_bounded_in_flight(node_rest_url):
+    StatusRequestHandler.delay = 0.2
+    StatusRequestHandler.max_in_flight = 0
+    try:
+        prober = NodeProber(max_in_flight=2)
+        rest_urls = {f'0x{i}': node_rest_url for i in range(6)}
+        rest_urls['0xunreachable'] = f'127.0.0.1:{get_closed_port()}'
+        assert prober.probe_nodes(rest_urls) == 6
+    finally:
+        StatusRequestHandler.delay = 0
+    assert StatusRequestHandler.max_in_flight == 2
+
+    assert prober.stats == {'probed': 7, 'reachable': 6}
+    node_stats = prober.node_stats('0x0')
+    assert node_stats['reachable']
+    assert node_stats['reachability'] == 1
+    assert node_stats['last_reachable'] is not None
+    assert sum(node_stats['handshake_latency'].values()) == 1
+    assert sum(node_stats['status_latency'].values()) == 1
+    assert node_stats['status_latency']['0.05'] == 0  # delayed
+
+    node_stats = prober.node_stats('0xunreachable')
+    assert not node_stats['reachable']
+    assert node_stats['reachability'] == 0
+    assert node_stats['last_reachable'] is None
+    assert sum(node_stats['status_latency'].values()) == 0
+
+    # nodes no longer provided are forgotten
+    assert prober.probe_nodes({'0x0': node_rest_url}) == 1
+    assert prober.node_stats('0x1') is None
+    assert prober.node_stats('0x0')['probes'] == 2
+
+
+def test_node_stats_rolling_window():
+    prober = NodeProber(window=3)
+    assert prober.node_stats('0x0') is None
+
+    prober.record('0x0', ProbeResult(reachable=True, handshake_latency=0.01, status_latency=3, error=None))
+    for _ in range(2):
+        prober.record('0x0', ProbeResult(reachable=False, handshake_latency=None, status_latency=None, error='down'))
+    node_stats = prober.node_stats('0x0')
+    assert node_stats['probes'] == 3
+    assert node_stats['reachability'] == 1 / 3
+    assert not node_stats['reachable']
+    assert node_stats['error'] == 'down'
+    assert node_stats['last_reachable'] is not None
+    assert node_stats['handshake_latency']['0.05'] == 1
+    assert node_stats['status_latency']['5'] == 1
+
+    # reachable probe rolls out of the window
+    prober.record('0x0', ProbeResult(reachable=False, handshake_latency=None, status_latency=None, error='down'))
+    node_stats = prober.node_stats('0x0')
+    assert node_stats['reachability'] == 0
+    assert node_stats['last_reachable'] is not None  # still known
@@ -0,0 +1,75 @@
+import json
+import os
+from unittest.mock import MagicMock
+
+from nucypher.blockchain.eth.registry import RegistrySourceManager
+
+from monitor.registry import ContractRegistryCache
+
+REGISTRY_DATA = [["StakingEscrow", "v5.4.2", "0xdeadbeef", []]]
+UPDATED_REGISTRY_DATA = [["StakingEscrow", "v5.5.0", "0xbeefdead", []]]
+
+
+def create_source_manager(registry_data):
+    source_manager = MagicMock(spec=RegistrySourceManager)
+    source_manager.fetch_latest_publication.return_value = (json.dumps(registry_data).encode(), 'source')
+    return source_manager
+
+
+def test_registry_cache_initial_fetch(tmpdir):
+    cache_filepath = os.path.join(tmpdir, 'registry.json')
+    source_manager = create_source_manager(REGISTRY_DATA)
+    registry_cache = ContractRegistryCache(network='ibex',
+                                           cache_filepath=cache_filepath,
+                                           source_manager=source_manager)
+
+    # no disk cache - latest publication fetched and written to disk
+    registry = registry_cache.registry
+    assert registry.read() == REGISTRY_DATA
+    assert source_manager.fetch_latest_publication.call_count == 1
+    with open(cache_filepath, 'r') as cache_file:
+        assert json.load(cache_file) == REGISTRY_DATA
+
+    # subsequent accesses use cached value
+    assert registry_cache.registry is registry
+    assert source_manager.fetch_latest_publication.call_count == 1
+
+    # new cache instance uses disk cache
+    registry_cache = ContractRegistryCache(network='ibex',
+                                           cache_filepath=cache_filepath,
+                                           source_manager=source_manager)
+    assert registry_cache.registry.id == registry.id
+    assert source_manager.fetch_latest_publication.call_count == 1
+
+
+def test_registry_cache_refresh(tmpdir):
+    cache_filepath = os.path.join(tmpdir, 'registry.json')
+    source_manager = create_source_manager(REGISTRY_DATA)
+    registry_cache = ContractRegistryCache(network='ibex',
+                                           cache_filepath=cache_filepath,
+                                           source_manager=source_manager)
+    subscriber = MagicMock()
+    registry_cache.subscribe(subscriber)
+    original_registry = registry_cache.registry
+
+    # same registry id - no change
+    assert registry_cache.refresh(threaded=False) is None
+    assert registry_cache.registry is original_registry
+    subscriber.assert_not_called()
+
+    # source unavailable - cached registry still used
+    source_manager.fetch_latest_publication.side_effect = RegistrySourceManager.NoSourcesAvailable
+    assert registry_cache.refresh(threaded=False) is None
+    assert registry_cache.registry is original_registry
+    subscriber.assert_not_called()
+
+    # updated registry
+    source_manager.fetch_latest_publication.side_effect = None
+    source_manager.fetch_latest_publication.return_value = (json.dumps(UPDATED_REGISTRY_DATA).encode(), 'source')
+    updated_registry = registry_cache.refresh(threaded=False)
+    assert updated_registry is not None
+    assert updated_registry.id != original_registry.id
+    assert registry_cache.registry is updated_registry
+    subscriber.assert_called_once_with(updated_registry)
+    with open(cache_filepath, 'r') as cache_file:
+        assert json.load(cache_file) == UPDATED_REGISTRY_DATA
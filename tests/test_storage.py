@@ -0,0 +1,688 @@
+import gzip
+import os
+import secrets
+import socket
+import sqlite3
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import maya
+import pytest
+import requests
+from influxdb.resultset import ResultSet
+from maya import MayaDT
+
+from monitor.crawler import Crawler
+from monitor.db import CrawlerInfluxClient
+from monitor.storage import (
+    InfluxDBStorage,
+    SQLiteTimeSeriesStorage,
+    SECONDS_PER_DAY,
+    UDPLineProtocolSender,
+    parse_line_protocol
+)
+from monitor.utils import escape_tag_value
+from monitor.writer import ChangeTracker
+from tests.utilities import create_node_info_line, create_network_info_line, create_event_line
+
+# Conformance tests run against the InfluxDB storage only when a server is available eg.
+#   MONITOR_TEST_INFLUX_HOST=localhost pytest tests/test_storage.py
+INFLUX_HOST_ENV_VAR = 'MONITOR_TEST_INFLUX_HOST'
+
+
+@pytest.fixture(scope='function', params=['sqlite', 'influxdb'])
+def timeseries_storage(request, tempfile_path):
+    if request.param == 'sqlite':
+        storage = SQLiteTimeSeriesStorage(db_filepath=tempfile_path)
+        storage.initialize()
+        yield storage
+        storage.close()
+    else:
+        influx_host = os.environ.get(INFLUX_HOST_ENV_VAR)
+        if not influx_host:
+            pytest.skip(f"{INFLUX_HOST_ENV_VAR} not set")
+        database = f'monitor_test_{secrets.token_hex(4)}'
+        storage = InfluxDBStorage(host=influx_host, port=8086, database=database)
+        storage.initialize()
+        yield storage
+        storage._client.drop_database(database)
+        storage.close()
+
+
+def settle(storage):
+    """Makes written node information available to downsampled queries."""
+    if isinstance(storage, InfluxDBStorage):
+        # continuous queries only run periodically
+        for tiers, _, _ in InfluxDBStorage.DOWNSAMPLED_MEASUREMENTS:
+            for tier in tiers:
+                if tier.interval is not None:
+                    storage._backfill_tier(tier)
+
+
+def get_day_starts(days: int):
+    range_begin, range_end = CrawlerInfluxClient._get_range_bookends(days)
+    range_begin_epoch = MayaDT.from_datetime(range_begin).epoch
+    return range_begin, range_end, [range_begin_epoch + (day * SECONDS_PER_DAY) for day in range(days)]
+
+
+#
+# Conformance tests
+#
+
+def test_storage_node_info_daily_aggregates(timeseries_storage):
+    range_begin, range_end, day_starts = get_day_starts(days=3)
+    timeseries_storage.write([
+        # latest value per staker for each day is used
+        create_node_info_line(staker_address='0xA', timestamp=day_starts[0] + 3600, locked_stake=10.0),
+        create_node_info_line(staker_address='0xA', timestamp=day_starts[0] + 7200, locked_stake=20.0),
+        create_node_info_line(staker_address='0xB', timestamp=day_starts[0] + 3600, locked_stake=5.0),
+        create_node_info_line(staker_address='0xA', timestamp=day_starts[1] + 3600, locked_stake=30.0),
+        create_node_info_line(staker_address='0xC', timestamp=day_starts[1] + 3600, locked_stake=7.0),
+    ])
+    settle(timeseries_storage)
+
+    columns = timeseries_storage.query_node_info_aggregates(range_begin=range_begin,
+                                                            range_end=range_end,
+                                                            aggregates={'locked_stake': ('SUM', 'locked_stake'),
+                                                                        'num_stakers': ('COUNT', 'locked_stake')})
+    assert columns['time'] == day_starts
+    assert columns['locked_stake'] == [25.0, 37.0, None]
+    assert columns['num_stakers'] == [2, 2, 0]
+
+
+def test_storage_node_info_subrange(timeseries_storage):
+    range_begin, range_end, day_starts = get_day_starts(days=3)
+    timeseries_storage.write([create_node_info_line(staker_address='0xA', timestamp=day_start + 60, locked_stake=i)
+                              for i, day_start in enumerate(day_starts)])
+    settle(timeseries_storage)
+
+    columns = timeseries_storage.query_node_info_aggregates(range_begin=range_begin + timedelta(days=1),
+                                                            range_end=range_end,
+                                                            aggregates={'locked_stake': ('MAX', 'locked_stake')})
+    assert columns['time'] == day_starts[1:]
+    assert columns['locked_stake'] == [1, 2]
+
+
+def test_storage_network_info_daily(timeseries_storage):
+    range_begin, range_end, day_starts = get_day_starts(days=3)
+    timeseries_storage.write([
+        # latest values for each day are used
+        create_network_info_line(timestamp=day_starts[0] + 3600, locked_stake=100.0, num_stakers=10),
+        create_network_info_line(timestamp=day_starts[0] + 7200, locked_stake=110.0, num_stakers=11),
+        create_network_info_line(timestamp=day_starts[2] + 60, locked_stake=120.0, num_stakers=12, known_nodes=5),
+    ])
+    settle(timeseries_storage)
+
+    columns = timeseries_storage.query_network_info(range_begin=range_begin,
+                                                    range_end=range_end,
+                                                    fields=['locked_stake', 'num_stakers', 'known_nodes'])
+    assert columns['time'] == day_starts
+    assert columns['locked_stake'] == [110.0, None, 120.0]
+    assert columns['num_stakers'] == [11, None, 12]
+    assert columns['known_nodes'] == [11, None, 5]
+
+
+def test_storage_node_info_change_only_writes(timeseries_storage):
+    range_begin, range_end, day_starts = get_day_starts(days=3)
+    now = maya.now().epoch
+    tracker = ChangeTracker(keyframe_interval=Crawler.NODE_INFO_KEYFRAME_INTERVAL)
+
+    lines = list()
+    num_points = 0
+    for day_start in day_starts:
+        for timestamp in range(day_start + 60, min(day_start + SECONDS_PER_DAY, now), 4 * 3600):
+            locked_stakes = {'0xA': 12.0 if timestamp > day_starts[1] + 5 * 3600 else 10.0, '0xB': 5.0, '0xC': 7.0}
+            for staker_address, locked_stake in locked_stakes.items():
+                num_points += 1
+                if tracker.should_write(staker_address, (locked_stake,), timestamp):
+                    tracker.written(staker_address, (locked_stake,), timestamp)
+                    lines.append(create_node_info_line(staker_address=staker_address,
+                                                       timestamp=timestamp,
+                                                       locked_stake=locked_stake))
+    assert len(lines) < num_points
+    timeseries_storage.write(lines)
+    settle(timeseries_storage)
+
+    # latest value per staker for each day is unaffected by unchanged values not being written
+    columns = timeseries_storage.query_node_info_aggregates(range_begin=range_begin,
+                                                            range_end=range_end,
+                                                            aggregates={'locked_stake': ('SUM', 'locked_stake'),
+                                                                        'num_stakers': ('COUNT', 'locked_stake')})
+    assert columns['time'] == day_starts
+    assert columns['locked_stake'] == [22.0, 24.0, 24.0]
+    assert columns['num_stakers'] == [3, 3, 3]
+
+
+def test_storage_events(timeseries_storage):
+    now = maya.now().epoch
+    events = [
+        create_event_line(txhash='0x1', timestamp=now - 300, block_number=10, args='staker:0xA, period:1'),
+        create_event_line(txhash='0x2', timestamp=now - 200, block_number=12, event_name='Withdrawn'),
+        create_event_line(txhash='0x3', timestamp=now - 5 * SECONDS_PER_DAY, block_number=3),
+    ]
+    timeseries_storage.write(events)
+
+    range_end = datetime.utcnow() + timedelta(minutes=1)
+    results = timeseries_storage.query_events(range_begin=range_end - timedelta(days=1), range_end=range_end)
+    assert [event['txhash'] for event in results] == ['0x2', '0x1']  # decreasing order of time
+    assert results[0]['contract_name'] == 'StakingEscrow'
+    assert results[0]['event_name'] == 'Withdrawn'
+    assert results[0]['block_number'] == 12
+    assert results[1]['args'] == 'staker:0xA, period:1'
+    assert MayaDT.from_rfc3339(results[1]['time']).epoch == now - 300
+
+    assert timeseries_storage.get_last_event_block_number() == 12
+
+    # events of the same block and type are distinct
+    timeseries_storage.write([create_event_line(txhash=f'0x{4 + i}', timestamp=now - 100, block_number=13, log_index=i)
+                              for i in range(2)])
+    results = timeseries_storage.query_events(range_begin=range_end - timedelta(days=1), range_end=range_end)
+    assert {event['txhash'] for event in results[:2]} == {'0x4', '0x5'}
+
+
+def test_storage_empty(timeseries_storage):
+    assert timeseries_storage.get_last_event_block_number() == 0
+
+    range_end = datetime.utcnow()
+    assert timeseries_storage.query_events(range_begin=range_end - timedelta(days=1), range_end=range_end) == []
+
+    range_begin, range_end, _ = get_day_starts(days=3)
+    columns = timeseries_storage.query_node_info_aggregates(range_begin=range_begin,
+                                                            range_end=range_end,
+                                                            aggregates={'locked_stake': ('SUM', 'locked_stake'),
+                                                                        'num_stakers': ('COUNT', 'locked_stake')})
+    assert all(value is None for value in columns.get('locked_stake', []))
+    assert all(not value for value in columns.get('num_stakers', []))
+
+
+#
+# Line protocol
+#
+
+def test_parse_line_protocol():
+    line = create_node_info_line(staker_address='0xA', timestamp=1602720000, locked_stake=15000.5)
+    measurement, tags, fields, timestamp = parse_line_protocol(line)
+    assert measurement == Crawler.NODE_MEASUREMENT
+    assert tags == {'staker_address': '0xA'}
+    assert fields['locked_stake'] == 15000.5
+    assert fields['current_period'] == 1 and isinstance(fields['current_period'], int)
+    assert timestamp == 1602720000
+
+    # quoted string fields may contain separators, and escaped quotes and backslashes
+    line = create_event_line(txhash='0x1', timestamp=1602720000, block_number=5, args='staker:0xA, value:"1=2\\"')
+    _, tags, fields, _ = parse_line_protocol(line)
+    assert tags == {'contract_name': 'StakingEscrow', 'event_name': 'Slashed', 'log_index': '0'}
+    assert fields['txhash'] == '0x1'
+    assert fields['args'] == 'staker:0xA, value:"1=2\\"'
+    assert fields['block_number'] == 5
+
+    # escaped tag values
+    line = f'{Crawler.NODE_MEASUREMENT},staker_address={escape_tag_value("0x A,b=c")} stake=1.0 1602720000'
+    _, tags, _, _ = parse_line_protocol(line)
+    assert tags == {'staker_address': '0x A,b=c'}
+
+    # escapes, booleans and no timestamp
+    measurement, tags, fields, timestamp = parse_line_protocol(r'my\ measurement,tag\,key=a\ b valid=t,text="say \"hi\""')
+    assert measurement == 'my measurement'
+    assert tags == {'tag,key': 'a b'}
+    assert fields == {'valid': True, 'text': 'say "hi"'}
+    assert timestamp is None
+
+    with pytest.raises(ValueError):
+        parse_line_protocol('measurement_only')
+
+
+#
+# InfluxDBStorage
+#
+
+@patch('monitor.storage.InfluxDBClient', autospec=True)
+def test_influxdb_storage_gzip_write(new_influx_db):
+    mock_influxdb_client = new_influx_db.return_value
+    storage = InfluxDBStorage(host='localhost', port=8086)
+
+    lines = [create_node_info_line(staker_address=f'0x{i}', timestamp=1602720000, locked_stake=i) for i in range(3)]
+    storage.write(lines)
+
+    mock_influxdb_client.request.assert_called_once()
+    kwargs = mock_influxdb_client.request.call_args[1]
+    assert kwargs['url'] == 'write'
+    assert kwargs['method'] == 'POST'
+    assert kwargs['params'] == {'db': Crawler.INFLUX_DB_NAME, 'precision': 's'}
+    assert kwargs['headers']['Content-Encoding'] == 'gzip'
+    assert kwargs['expected_response_code'] == 204
+    assert gzip.decompress(kwargs['data']).decode('utf-8').splitlines() == lines
+
+
+@patch('monitor.storage.InfluxDBClient', autospec=True)
+def test_influxdb_storage_initialize_downsampling_tiers(new_influx_db):
+    mock_influxdb_client = new_influx_db.return_value
+    mock_influxdb_client.get_list_database.return_value = [{'name': Crawler.INFLUX_DB_NAME}]
+    # hourly tier already present, daily tier not present
+    hourly_tier = Crawler.NODE_INFO_HOURLY_TIER
+    daily_tier = Crawler.NODE_INFO_DAILY_TIER
+    mock_influxdb_client.get_list_retention_policies.return_value = [
+        {'name': Crawler.INFLUX_RETENTION_POLICY_NAME},
+        {'name': hourly_tier.retention_policy}
+    ]
+    mock_influxdb_client.get_list_continuous_queries.return_value = [
+        {'_internal': []},
+        {Crawler.INFLUX_DB_NAME: [{'name': f'cq_{hourly_tier.measurement}'},
+                                  {'name': f'cq_{Crawler.NETWORK_INFO_DAILY_TIER.measurement}'}]}
+    ]
+
+    storage = InfluxDBStorage(host='localhost', port=8086)
+    storage.initialize()
+
+    mock_influxdb_client.create_database.assert_not_called()
+    mock_influxdb_client.create_retention_policy.assert_called_once_with(name=daily_tier.retention_policy,
+                                                                         duration=daily_tier.duration,
+                                                                         replication=Crawler.REPLICATION,
+                                                                         database=Crawler.INFLUX_DB_NAME,
+                                                                         default=False)
+    mock_influxdb_client.create_continuous_query.assert_called_once()
+    cq_kwargs = mock_influxdb_client.create_continuous_query.call_args[1]
+    assert cq_kwargs['name'] == f'cq_{daily_tier.measurement}'
+    assert cq_kwargs['resample_opts'] == daily_tier.resample_opts
+    select = cq_kwargs['select']
+    assert "LAST(locked_stake) AS locked_stake" in select
+    assert f'INTO "{Crawler.INFLUX_DB_NAME}"."{daily_tier.retention_policy}"."{daily_tier.measurement}"' in select
+    assert select.endswith("GROUP BY time(1d), staker_address")
+
+    # daily tier backfilled from raw data
+    mock_influxdb_client.query.assert_called_once()
+    backfill_query = mock_influxdb_client.query.call_args[0][0]
+    assert f"WHERE time >= now() - {Crawler.RETENTION}" in backfill_query
+    assert select.replace("GROUP BY", f"WHERE time >= now() - {Crawler.RETENTION} GROUP BY") == backfill_query
+
+
+@patch('monitor.storage.InfluxDBClient', autospec=True)
+def test_influxdb_storage_network_info_tier(new_influx_db):
+    mock_influxdb_client = new_influx_db.return_value
+    mock_influxdb_client.get_list_database.return_value = [{'name': Crawler.INFLUX_DB_NAME}]
+    mock_influxdb_client.get_list_retention_policies.return_value = [{'name': tier.retention_policy}
+                                                                      for tier in Crawler.NODE_INFO_TIERS]
+    mock_influxdb_client.get_list_continuous_queries.return_value = [
+        {Crawler.INFLUX_DB_NAME: [{'name': f'cq_{tier.measurement}'} for tier in Crawler.NODE_INFO_TIERS]}
+    ]
+
+    storage = InfluxDBStorage(host='localhost', port=8086)
+    storage.initialize()
+
+    # network information daily tier shares the retention policy of the node information daily tier
+    network_tier = Crawler.NETWORK_INFO_DAILY_TIER
+    mock_influxdb_client.create_retention_policy.assert_not_called()
+    mock_influxdb_client.create_continuous_query.assert_called_once()
+    cq_kwargs = mock_influxdb_client.create_continuous_query.call_args[1]
+    assert cq_kwargs['name'] == f'cq_{network_tier.measurement}'
+    select = cq_kwargs['select']
+    assert "LAST(num_stakers) AS num_stakers" in select
+    assert f'INTO "{Crawler.INFLUX_DB_NAME}"."{network_tier.retention_policy}"."{network_tier.measurement}"' in select
+    assert f'FROM "{Crawler.INFLUX_DB_NAME}"."{Crawler.INFLUX_RETENTION_POLICY_NAME}"."{Crawler.NETWORK_MEASUREMENT}"' \
+           in select
+    assert select.endswith("GROUP BY time(1d)")
+
+    # daily network information for completed days read from the daily tier
+    mock_influxdb_client.query.reset_mock()
+    mock_influxdb_client.query.return_value = ResultSet({'statement_id': 0})
+    range_begin, range_end, _ = get_day_starts(days=3)
+    assert storage.query_network_info(range_begin=range_begin, range_end=range_end, fields=['locked_stake']) == {}
+    query = mock_influxdb_client.query.call_args_list[0][0][0]
+    assert query.startswith(f'SELECT LAST(locked_stake) AS locked_stake '
+                            f'FROM "{network_tier.retention_policy}"."{network_tier.measurement}" WHERE')
+    assert query.endswith("GROUP BY time(1d)")
+
+
+@patch('monitor.storage.InfluxDBClient', autospec=True)
+def test_influxdb_storage_no_connection(new_influx_db):
+    mock_influxdb_client = new_influx_db.return_value
+    mock_influxdb_client.get_list_database.side_effect = requests.exceptions.ConnectionError
+
+    storage = InfluxDBStorage(host='localhost', port=8086)
+    with pytest.raises(ConnectionError):
+        storage.initialize()
+
+
+@patch('monitor.storage.InfluxDBClient', autospec=True)
+def test_influxdb_storage_udp_write(new_influx_db):
+    mock_influxdb_client = new_influx_db.return_value
+    listener = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    listener.bind(('127.0.0.1', 0))
+    listener.settimeout(5)
+    try:
+        storage = InfluxDBStorage(host='127.0.0.1', port=8086, udp_port=listener.getsockname()[1])
+        lines = [create_node_info_line(staker_address=f'0x{i:040x}', timestamp=1602720000 + i, locked_stake=i)
+                 for i in range(50)]
+        storage.write(lines)
+        mock_influxdb_client.request.assert_not_called()  # not written over http
+
+        # points packed into as few datagrams as possible, no larger than the MTU
+        stats = storage.stats
+        assert stats['points_sent'] == len(lines)
+        assert stats['datagrams_sent'] > 1
+        received_lines = list()
+        for _ in range(stats['datagrams_sent']):
+            datagram = listener.recv(65535)
+            assert len(datagram) <= UDPLineProtocolSender.MAX_DATAGRAM_SIZE
+            datagram_lines = datagram.decode('utf-8').splitlines()
+            if len(received_lines) + len(datagram_lines) < len(lines):
+                next_line = lines[len(received_lines) + len(datagram_lines)]
+                assert len(datagram) + len(next_line) + len('000000000\n') > UDPLineProtocolSender.MAX_DATAGRAM_SIZE
+            received_lines.extend(datagram_lines)
+
+        # timestamps sent with nanosecond precision
+        assert received_lines == [f'{line}000000000' for line in lines]
+
+        # points larger than a datagram are dropped
+        storage.write([f'{Crawler.EVENT_MEASUREMENT},txhash=0x1 args="{"x" * 2000}" 1602720000'])
+        assert storage.stats['points_dropped'] == 1
+        assert storage.stats['points_sent'] == len(lines)
+        storage.close()
+    finally:
+        listener.close()
+
+
+@patch('monitor.storage.InfluxDBClient', autospec=True)
+def test_influxdb_storage_migrate_legacy_events(new_influx_db):
+    mock_influxdb_client = new_influx_db.return_value
+    columns = ['time', 'args', 'block_number', 'contract_address', 'contract_name', 'event_name', 'txhash']
+
+    def legacy_events(*values):
+        return ResultSet({'statement_id': 0,
+                          'series': [{'name': Crawler.LEGACY_EVENT_MEASUREMENT, 'columns': columns,
+                                      'values': list(values)}]} if values else {'statement_id': 0})
+
+    # two events in the same block, split across chunks
+    mock_influxdb_client.query.side_effect = [
+        legacy_events([1602720000, 'staker:0xA', 10, '0xC', 'StakingEscrow', 'Slashed', '0x1'],
+                      [1602720060, 'staker:0xB', 11, '0xC', 'StakingEscrow', 'Slashed', '0x2']),
+        ResultSet({'statement_id': 0}),  # no events already collected
+        legacy_events([1602720060, 'staker:"0xC"', 11, '0xC', 'StakingEscrow', 'Slashed', '0x3']),
+        ResultSet({'statement_id': 0}),
+        legacy_events(),
+    ]
+
+    storage = InfluxDBStorage(host='localhost', port=8086)
+    assert list(storage.migrate_legacy_events(chunk_size=2)) == [2, 1]
+
+    queries = [call[0][0] for call in mock_influxdb_client.query.call_args_list]
+    assert f'FROM "{Crawler.LEGACY_EVENT_MEASUREMENT}" WHERE time >= 0s ORDER BY time ASC LIMIT 2 OFFSET 0' in queries[0]
+    assert f'FROM "{Crawler.EVENT_MEASUREMENT}" WHERE time >= 1602720000s AND time <= 1602720060s' in queries[1]
+    assert 'WHERE time >= 1602720060s ORDER BY time ASC LIMIT 2 OFFSET 1' in queries[2]
+    assert 'WHERE time >= 1602720060s ORDER BY time ASC LIMIT 2 OFFSET 2' in queries[4]
+
+    written_lines = [line for call in mock_influxdb_client.request.call_args_list
+                     for line in gzip.decompress(call[1]['data']).decode('utf-8').splitlines()]
+    migrated = [parse_line_protocol(line) for line in written_lines]
+    assert [measurement for measurement, _, _, _ in migrated] == [Crawler.EVENT_MEASUREMENT] * 3
+    assert [fields['txhash'] for _, _, fields, _ in migrated] == ['0x1', '0x2', '0x3']
+    assert [tags['log_index'] for _, tags, _, _ in migrated] == ['0', '0', '1']
+    assert [timestamp for _, _, _, timestamp in migrated] == [1602720000, 1602720060, 1602720060]
+    assert migrated[2][2]['args'] == 'staker:"0xC"'
+
+
+@patch('monitor.storage.InfluxDBClient', autospec=True)
+def test_influxdb_storage_migrate_legacy_events_after_rescan(new_influx_db):
+    mock_influxdb_client = new_influx_db.return_value
+    legacy_columns = ['time', 'args', 'block_number', 'contract_address', 'contract_name', 'event_name', 'txhash']
+    legacy_events = ResultSet({'statement_id': 0,
+                               'series': [{'name': Crawler.LEGACY_EVENT_MEASUREMENT, 'columns': legacy_columns,
+                                           'values': [
+                                               [1602720000, 'staker:0xA', 10, '0xC', 'StakingEscrow', 'Slashed', '0x1'],
+                                               [1602720000, 'staker:0xB', 10, '0xC', 'StakingEscrow', 'Slashed', '0x1'],
+                                               [1602720060, 'staker:0xC', 11, '0xC', 'StakingEscrow', 'Slashed', '0x2']
+                                           ]}]})
+    # events of the first transaction were already collected by a crawler before migration
+    collected_events = ResultSet({'statement_id': 0,
+                                  'series': [{'name': Crawler.EVENT_MEASUREMENT,
+                                              'columns': ['time', 'txhash', 'block_number'],
+                                              'values': [[1602720000, '0x1', 10], [1602720000, '0x1', 10]]}]})
+    mock_influxdb_client.query.side_effect = [legacy_events, collected_events, ResultSet({'statement_id': 0})]
+
+    storage = InfluxDBStorage(host='localhost', port=8086)
+    assert list(storage.migrate_legacy_events(chunk_size=3)) == [1]
+
+    written_lines = [line for call in mock_influxdb_client.request.call_args_list
+                     for line in gzip.decompress(call[1]['data']).decode('utf-8').splitlines()]
+    migrated = [parse_line_protocol(line) for line in written_lines]
+    assert [fields['txhash'] for _, _, fields, _ in migrated] == ['0x2']
+    assert [tags['log_index'] for _, tags, _, _ in migrated] == ['0']
+
+
+@patch('monitor.storage.InfluxDBClient', autospec=True)
+def test_influxdb_storage_last_event_block_number_from_legacy_events(new_influx_db):
+    mock_influxdb_client = new_influx_db.return_value
+    max_block_number = ResultSet({'statement_id': 0,
+                                  'series': [{'name': Crawler.LEGACY_EVENT_MEASUREMENT, 'columns': ['time', 'max'],
+                                              'values': [[0, 11]]}]})
+    # events not yet migrated are not collected again
+    mock_influxdb_client.query.side_effect = [ResultSet({'statement_id': 0}), max_block_number]
+    storage = InfluxDBStorage(host='localhost', port=8086)
+    assert storage.get_last_event_block_number() == 11
+    queries = [call[0][0] for call in mock_influxdb_client.query.call_args_list]
+    assert queries == [f'SELECT MAX(block_number) from "{Crawler.EVENT_MEASUREMENT}"',
+                       f'SELECT MAX(block_number) from "{Crawler.LEGACY_EVENT_MEASUREMENT}"']
+
+    # no events at all
+    mock_influxdb_client.query.side_effect = [ResultSet({'statement_id': 0})] * 2
+    assert storage.get_last_event_block_number() == 0
+
+
+def test_influxdb_storage_select_tier():
+    # daily values are available forever
+    for days in (1, 30, 365, 5*365):
+        tier = InfluxDBStorage._select_tier(tiers=Crawler.NODE_INFO_TIERS, days=days, interval='1d')
+        assert tier == Crawler.NODE_INFO_DAILY_TIER
+
+    # hourly values only kept for a year
+    tier = InfluxDBStorage._select_tier(tiers=Crawler.NODE_INFO_TIERS, days=7, interval='6h')
+    assert tier == Crawler.NODE_INFO_HOURLY_TIER
+    tier = InfluxDBStorage._select_tier(tiers=Crawler.NODE_INFO_TIERS, days=2*365, interval='6h')
+    assert tier == Crawler.NODE_INFO_RAW_TIER
+
+    # finer than hourly granularity requires raw data
+    tier = InfluxDBStorage._select_tier(tiers=Crawler.NODE_INFO_TIERS, days=1, interval='10m')
+    assert tier == Crawler.NODE_INFO_RAW_TIER
+
+    # network information is only downsampled daily
+    tier = InfluxDBStorage._select_tier(tiers=Crawler.NETWORK_INFO_TIERS, days=365, interval='1d')
+    assert tier == Crawler.NETWORK_INFO_DAILY_TIER
+    tier = InfluxDBStorage._select_tier(tiers=Crawler.NETWORK_INFO_TIERS, days=7, interval='6h')
+    assert tier == Crawler.NETWORK_INFO_RAW_TIER
+
+
+@patch('monitor.storage.InfluxDBClient', autospec=True)
+def test_influxdb_storage_node_info_aggregate_from_finer_tier(new_influx_db):
+    mock_influxdb_client = new_influx_db.return_value
+    mock_influxdb_client.query.return_value = ResultSet({'statement_id': 0})
+    storage = InfluxDBStorage(host='localhost', port=8086)
+
+    range_begin, range_end = CrawlerInfluxClient._get_range_bookends(days=7)
+    storage.query_node_info_aggregates(range_begin=range_begin,
+                                       range_end=range_end,
+                                       aggregates={'locked_stake': ('SUM', 'locked_stake'),
+                                                   'num_stakers': ('COUNT', 'locked_stake')},
+                                       interval='6h')
+
+    # hourly tier has multiple values per staker for each interval - latest value per staker used
+    hourly_tier = Crawler.NODE_INFO_HOURLY_TIER
+    query = mock_influxdb_client.query.call_args_list[0][0][0]
+    assert query.startswith("SELECT SUM(locked_stake) AS locked_stake, COUNT(locked_stake) AS num_stakers "
+                            "FROM (SELECT LAST(locked_stake) AS locked_stake "
+                            f'FROM "{hourly_tier.retention_policy}"."{hourly_tier.measurement}" WHERE')
+    assert "GROUP BY staker_address, time(6h)) WHERE" in query
+    assert query.endswith("GROUP BY time(6h)")
+    assert mock_influxdb_client.query.call_args_list[0][1]['epoch'] == 's'
+
+
+@patch('monitor.storage.InfluxDBClient', autospec=True)
+def test_influxdb_storage_current_day_from_raw_tier(new_influx_db):
+    mock_influxdb_client = new_influx_db.return_value
+    storage = InfluxDBStorage(host='localhost', port=8086)
+    range_begin, range_end, day_starts = get_day_starts(days=3)
+
+    def daily_result(values):
+        return ResultSet({'statement_id': 0,
+                          'series': [{'name': Crawler.NETWORK_MEASUREMENT, 'columns': ['time', 'locked_stake'],
+                                      'values': values}]})
+
+    # completed days from the daily tier, and today (not yet downsampled) from the raw tier
+    mock_influxdb_client.query.side_effect = [daily_result([[day_starts[0], 1.0], [day_starts[1], 2.0]]),
+                                              daily_result([[day_starts[2], 3.0]])]
+    columns = storage.query_network_info(range_begin=range_begin, range_end=range_end, fields=['locked_stake'])
+    assert columns == {'time': day_starts, 'locked_stake': [1.0, 2.0, 3.0]}
+
+    today = datetime.utcfromtimestamp(day_starts[2])
+    queries = [call[0][0] for call in mock_influxdb_client.query.call_args_list]
+    for query, tier, begin, end in ((queries[0], Crawler.NETWORK_INFO_DAILY_TIER, range_begin, today),
+                                    (queries[1], Crawler.NETWORK_INFO_RAW_TIER, today, range_end)):
+        assert (f'FROM "{tier.retention_policy}"."{tier.measurement}" '
+                f"WHERE time >= '{MayaDT.from_datetime(begin).rfc3339()}' AND "
+                f"time < '{MayaDT.from_datetime(end).rfc3339()}'") in query
+
+    # node information of today is the latest value per staker from the raw tier
+    mock_influxdb_client.query.reset_mock(side_effect=True)
+    mock_influxdb_client.query.return_value = ResultSet({'statement_id': 0})
+    storage.query_node_info_aggregates(range_begin=today,
+                                       range_end=range_end,
+                                       aggregates={'locked_stake': ('SUM', 'locked_stake')})
+    mock_influxdb_client.query.assert_called_once()
+    raw_tier = Crawler.NODE_INFO_RAW_TIER
+    assert (f'FROM (SELECT LAST(locked_stake) AS locked_stake '
+            f'FROM "{raw_tier.retention_policy}"."{raw_tier.measurement}" WHERE') \
+        in mock_influxdb_client.query.call_args[0][0]
+
+    # ranges of completed days only read from the daily tier
+    mock_influxdb_client.query.reset_mock()
+    storage.query_node_info_aggregates(range_begin=range_begin,
+                                       range_end=today,
+                                       aggregates={'locked_stake': ('SUM', 'locked_stake')})
+    mock_influxdb_client.query.assert_called_once()
+    daily_tier = Crawler.NODE_INFO_DAILY_TIER
+    assert f'FROM "{daily_tier.retention_policy}"."{daily_tier.measurement}" WHERE' \
+        in mock_influxdb_client.query.call_args[0][0]
+
+
+def test_influxdb_storage_decode_columns():
+    raw_series = {'statement_id': 0,
+                  'series': [{'name': Crawler.NODE_INFO_DAILY_TIER.measurement,
+                              'columns': ['time', 'sum'],
+                              'values': [[1602720000, 10], [1602806400, None]]}]}
+    columns = InfluxDBStorage._decode_columns(ResultSet(raw_series))
+    assert columns == {'time': [1602720000, 1602806400], 'sum': [10, None]}
+
+    # no values
+    raw_series['series'][0]['values'] = []
+    assert InfluxDBStorage._decode_columns(ResultSet(raw_series)) == {'time': [], 'sum': []}
+
+    # no series
+    assert InfluxDBStorage._decode_columns(ResultSet({'statement_id': 0})) == {}
+
+
+#
+# SQLiteTimeSeriesStorage
+#
+
+def test_sqlite_storage_daily_rollup_outlives_raw_retention(tempfile_path):
+    storage = SQLiteTimeSeriesStorage(db_filepath=tempfile_path)
+    storage.initialize()
+
+    days = 60
+    range_begin, range_end, day_starts = get_day_starts(days=days)
+    storage.write([create_node_info_line(staker_address='0xA', timestamp=day_start + 60, locked_stake=i)
+                   for i, day_start in enumerate(day_starts)])
+
+    # raw data older than the retention period removed
+    db_conn = sqlite3.connect(tempfile_path)
+    try:
+        oldest = db_conn.execute(f'SELECT MIN(time) FROM "{Crawler.NODE_MEASUREMENT}"').fetchone()[0]
+        assert oldest >= maya.now().epoch - storage.RETENTION
+    finally:
+        db_conn.close()
+
+    # daily aggregates still available from rollup
+    columns = storage.query_node_info_aggregates(range_begin=range_begin,
+                                                 range_end=range_end,
+                                                 aggregates={'locked_stake': ('SUM', 'locked_stake')})
+    assert columns['time'] == day_starts
+    assert columns['locked_stake'] == list(range(days))
+
+    # finer intervals use raw data
+    columns = storage.query_node_info_aggregates(range_begin=range_begin,
+                                                 range_end=range_end,
+                                                 aggregates={'locked_stake': ('SUM', 'locked_stake')},
+                                                 interval='12h')
+    assert columns['locked_stake'][0] is None
+    assert columns['locked_stake'][-2] == days - 1
+
+
+def test_sqlite_storage_new_and_unknown_fields(tempfile_path):
+    storage = SQLiteTimeSeriesStorage(db_filepath=tempfile_path)
+    storage.initialize()
+
+    range_begin, range_end, day_starts = get_day_starts(days=1)
+    storage.write([create_node_info_line(staker_address='0xA', timestamp=day_starts[0] + 60, locked_stake=1.0)])
+
+    # field never written
+    aggregates = {'work_orders': ('SUM', 'work_orders')}
+    columns = storage.query_node_info_aggregates(range_begin=range_begin, range_end=range_end, aggregates=aggregates)
+    assert columns['work_orders'] == [None]
+
+    # field added by later points
+    storage.write([f'{Crawler.NODE_MEASUREMENT},staker_address=0xA work_orders=3i {day_starts[0] + 120}'])
+    columns = storage.query_node_info_aggregates(range_begin=range_begin, range_end=range_end, aggregates=aggregates)
+    assert columns['work_orders'] == [3]
+
+    with pytest.raises(ValueError):
+        storage.query_node_info_aggregates(range_begin=range_begin,
+                                           range_end=range_end,
+                                           aggregates={'locked_stake': ('PERCENTILE', 'locked_stake')})
+
+    with pytest.raises(ValueError):
+        storage.write(['bad-measurement,staker_address=0xA locked_stake=1 1602720000'])
+
+    # tags are fixed when the measurement is first written
+    with pytest.raises(ValueError):
+        storage.write([f'{Crawler.NODE_MEASUREMENT},staker_address=0xA,worker_address=0xB work_orders=4i '
+                       f'{day_starts[0] + 180}'])
+    columns = storage.query_node_info_aggregates(range_begin=range_begin, range_end=range_end, aggregates=aggregates)
+    assert columns['work_orders'] == [3]
+
+
+def test_crawler_influx_client_with_embedded_storage(tempfile_path):
+    storage = SQLiteTimeSeriesStorage(db_filepath=tempfile_path)
+    storage.initialize()
+    influx_client = CrawlerInfluxClient(None, None, None, storage=storage)
+
+    days = 3
+    _, _, day_starts = get_day_starts(days=days)
+    storage.write([create_node_info_line(staker_address=f'0x{i}', timestamp=day_starts[i] + 60, locked_stake=100.0)
+                   for i in range(days)])
+    storage.write([create_event_line(txhash='0x1', timestamp=maya.now().epoch - 60, block_number=1)])
+
+    network_metrics = influx_client.get_historical_network_metrics(days=days)
+    assert network_metrics['time'] == day_starts
+    assert network_metrics['locked_stake'] == [100.0, 100.0, 100.0]
+    assert network_metrics['num_stakers'] == [1, 1, 1]
+
+    events = influx_client.get_historical_events(days=1)
+    assert [event['txhash'] for event in events] == ['0x1']
+
+
+def test_crawler_influx_client_network_info_with_node_info_fallback(tempfile_path):
+    storage = SQLiteTimeSeriesStorage(db_filepath=tempfile_path)
+    storage.initialize()
+    influx_client = CrawlerInfluxClient(None, None, None, storage=storage)
+
+    # network information only written from the second day; per-staker node information used before then
+    days = 3
+    _, _, day_starts = get_day_starts(days=days)
+    storage.write([create_node_info_line(staker_address=f'0x{i}', timestamp=day_starts[0] + 60, locked_stake=100.0)
+                   for i in range(4)])
+    storage.write([create_network_info_line(timestamp=day_start + 60, locked_stake=500.0, num_stakers=5)
+                   for day_start in day_starts[1:]])
+
+    network_metrics = influx_client.get_historical_network_metrics(days=days)
+    assert network_metrics['time'] == day_starts
+    assert network_metrics['locked_stake'] == [400.0, 500.0, 500.0]
+    assert network_metrics['num_stakers'] == [4, 5, 5]
@@ -1,16 +1,21 @@
+import json
 from collections import OrderedDict
 from typing import Dict
 from unittest.mock import MagicMock, patch
 
 import maya
 import pytest
+from flask import Flask
 from maya import MayaDT
 from nucypher.blockchain.eth.token import NU
 
 from monitor.supply import LAUNCH_DATE, vesting_remaining_factor, DAYS_PER_MONTH, calculate_supply_information, \
     INITIAL_SUPPLY, UNIVERSITY_INITIAL_SUPPLY, CASI_SUPPLY, months_transpired_since_launch, SAFT2_INITIAL_SUPPLY, \
     TEAM_INITIAL_SUPPLY, NUCO_INITIAL_SUPPLY, SAFT1_SUPPLY, NUCO_VESTING_MONTHS, WORKLOCK_VESTING_MONTHS, \
-    UNIVERSITY_VESTING_MONTHS, SAFT2_TEAM_VESTING_MONTHS, calculate_current_total_supply, calculate_circulating_supply
+    UNIVERSITY_VESTING_MONTHS, SAFT2_TEAM_VESTING_MONTHS, calculate_current_total_supply, calculate_circulating_supply, \
+    months_transpired_since_launch_series, locked_nunits_series, calculate_vesting_schedule, \
+    SupplyInformationCache, SECONDS_PER_DAY
+from monitor.dashboard import Dashboard
 
 # initial values
 MAX_SUPPLY = NU(3_890_000_000, 'NU')
@@ -288,3 +293,103 @@ def test_calculate_circulating_supply(months_transpired):
 
         est_circulating_supply = calculate_circulating_supply(economics)
         assert supply_information['est_circulating_supply'] == est_circulating_supply
+
+
+def test_months_transpired_series():
+    timestamps = [LAUNCH_DATE.add(days=days_transpired) for days_transpired in range(0, 6*365, 7)]
+    months_transpired = months_transpired_since_launch_series(timestamps)
+    assert months_transpired == [months_transpired_since_launch(timestamp) for timestamp in timestamps]
+
+
+def test_months_transpired_series_month_boundaries():
+    # days around each month boundary, including before launch, at the start and the end of the day
+    timestamps = [LAUNCH_DATE.add(days=round(months * DAYS_PER_MONTH) + day_offset, seconds=seconds)
+                  for months in range(-3, 70)
+                  for day_offset in (-1, 0, 1)
+                  for seconds in (0, SECONDS_PER_DAY - 1)]
+    months_transpired = months_transpired_since_launch_series(timestamps)
+    assert months_transpired == [months_transpired_since_launch(timestamp) for timestamp in timestamps]
+    assert months_transpired_since_launch_series(list(reversed(timestamps))) == list(reversed(months_transpired))
+    assert months_transpired_since_launch_series([]) == []
+
+
+@pytest.mark.parametrize('vesting_months', [3, 6, 24, 60])
+def test_locked_nunits_series(vesting_months):
+    nunits = SAFT2_INITIAL_SUPPLY.to_nunits()
+    timestamps = [LAUNCH_DATE.add(days=round(months * DAYS_PER_MONTH)) for months in range(0, 70)]
+    months_transpired = months_transpired_since_launch_series(timestamps)
+    for cliff in (True, False):
+        locked = locked_nunits_series(nunits, vesting_months, months_transpired, cliff=cliff)
+        assert all(isinstance(locked_nunits, int) for locked_nunits in locked)
+        assert locked[0] == nunits  # exact
+        assert locked == pytest.approx([nunits * vesting_remaining_factor(vesting_months=vesting_months,
+                                                                          cliff=cliff,
+                                                                          now=timestamp)
+                                        for timestamp in timestamps])
+
+
+def test_calculate_vesting_schedule():
+    economics = MagicMock(total_supply=MAX_SUPPLY.to_nunits(),
+                          worklock_supply=WORKLOCK_SUPPLY.to_nunits(),
+                          initial_supply=INITIAL_SUPPLY.to_nunits())  # no rewards - not part of vesting schedule
+
+    months = [0, 3, 5, 11, 13, 23, 29, 31, 37, 42, 54, 67]
+    timestamps = [LAUNCH_DATE.add(days=round(month * DAYS_PER_MONTH)) for month in months]
+    schedule = calculate_vesting_schedule(economics, timestamps)
+
+    assert schedule['timestamps'] == [timestamp.iso8601() for timestamp in timestamps]
+    for i, timestamp in enumerate(timestamps):
+        with patch.object(maya, 'now', return_value=timestamp):
+            supply_information = calculate_supply_information(economics)
+
+        locked_allocations = supply_information['initial_supply']['locked_allocations']
+        for name, locked_amount in locked_allocations.items():
+            assert schedule['locked_allocations'][name][i] == pytest.approx(locked_amount)
+
+        vested = supply_information['initial_supply']['unlocked_allocations']['vested']
+        assert schedule['vested'][i] == pytest.approx(vested)
+        assert schedule['est_circulating_supply'][i] == pytest.approx(supply_information['est_circulating_supply'])
+
+
+def test_supply_information_cache():
+    economics = MagicMock(total_supply=MAX_SUPPLY.to_nunits(),
+                          worklock_supply=WORKLOCK_SUPPLY.to_nunits(),
+                          initial_supply=INITIAL_SUPPLY.to_nunits())
+
+    cache = SupplyInformationCache()
+    assert not cache.is_populated
+    assert cache.economics is None
+    assert cache.period is None
+
+    with patch.object(maya, 'now', return_value=LAUNCH_DATE):
+        cache.update(economics=economics, period=18550)
+        supply_information = calculate_supply_information(economics)
+
+    assert cache.is_populated
+    assert cache.economics == economics
+    assert cache.period == 18550
+
+    assert json.loads(cache.get()) == json.loads(json.dumps(supply_information))
+    for parameter in SupplyInformationCache.QUERY_PARAMETERS:
+        assert cache.get(parameter) == str(supply_information[parameter]).encode()
+
+
+def test_supply_endpoints_unavailable_until_populated():
+    economics = MagicMock(total_supply=MAX_SUPPLY.to_nunits(),
+                          worklock_supply=WORKLOCK_SUPPLY.to_nunits(),
+                          initial_supply=INITIAL_SUPPLY.to_nunits())
+
+    # eg. blockchain unreachable - refresh leaves the cache unpopulated
+    dashboard = MagicMock(supply_cache=SupplyInformationCache(),
+                          SUPPLY_HISTORY_DEFAULT_STEP=Dashboard.SUPPLY_HISTORY_DEFAULT_STEP,
+                          SUPPLY_HISTORY_MAX_POINTS=Dashboard.SUPPLY_HISTORY_MAX_POINTS)
+    flask_server = Flask(__name__)
+    Dashboard.add_supply_endpoint(dashboard, flask_server=flask_server)
+    client = flask_server.test_client()
+    for url in ('/supply_information', '/supply_information?q=est_circulating_supply', '/supply_information/history'):
+        assert client.get(url).status_code == 503
+    dashboard.refresh_supply_information.assert_called_with(threaded=False)
+
+    dashboard.supply_cache.update(economics=economics, period=18550)
+    for url in ('/supply_information', '/supply_information?q=est_circulating_supply', '/supply_information/history'):
+        assert client.get(url).status_code == 200
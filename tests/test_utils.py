@@ -1,9 +1,19 @@
+import os
+import sqlite3
+import threading
+import time
 from unittest import mock
 
 import pytest
 from nucypher.blockchain.eth.networks import NetworksInventory
 
-from monitor.utils import get_etherscan_url, EtherscanURLType
+from monitor.utils import (
+    get_etherscan_url,
+    EtherscanURLType,
+    CircuitBreaker,
+    CircuitBreakerOpen,
+    SQLiteConnectionPool
+)
 
 ADDRESS_OR_TX_HASH = "0xdeadbeef"
 
@@ -77,3 +87,79 @@ def test_etherscan_url_goerli(chain_id_func):
                             url_type=EtherscanURLType.TRANSACTION,
                             address_or_tx_hash=ADDRESS_OR_TX_HASH)
     assert url == f"https://goerli.etherscan.io/tx/{ADDRESS_OR_TX_HASH}"
+
+
+def test_circuit_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60, failure_exceptions=(ConnectionError, ))
+    unhealthy = mock.Mock(side_effect=ConnectionError('unavailable'))
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            breaker.call(unhealthy)
+    assert breaker.state == CircuitBreaker.OPEN
+
+    # fails fast without calling the operation
+    with pytest.raises(CircuitBreakerOpen):
+        breaker.call(unhealthy)
+    assert unhealthy.call_count == 2
+
+    # exceptions other than failures are raised, but not counted
+    breaker = CircuitBreaker(failure_threshold=1, failure_exceptions=(ConnectionError, ))
+    with pytest.raises(ValueError):
+        breaker.call(mock.Mock(side_effect=ValueError('bad query')))
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_circuit_breaker_half_open_trial():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    with pytest.raises(ConnectionError):
+        breaker.call(mock.Mock(side_effect=ConnectionError('unavailable')))
+    assert breaker.state == CircuitBreaker.OPEN
+
+    # failed trial opens the breaker again
+    time.sleep(0.1)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(ConnectionError):
+        breaker.call(mock.Mock(side_effect=ConnectionError('still unavailable')))
+    assert breaker.state == CircuitBreaker.OPEN
+
+    # successful trial closes the breaker
+    time.sleep(0.1)
+    assert breaker.call(mock.Mock(return_value=5)) == 5
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_sqlite_connection_pool(tempfile_path):
+    connections = SQLiteConnectionPool(db_filepath=tempfile_path)
+    db_conn = connections.get()
+    assert connections.get() is db_conn  # long-lived
+    assert db_conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+    with db_conn:
+        db_conn.execute('CREATE TABLE test (value int)')
+        db_conn.execute('INSERT INTO test VALUES (1)')
+
+    # one connection per thread
+    thread_connections = list()
+    thread = threading.Thread(target=lambda: thread_connections.append(connections.get()))
+    thread.start()
+    thread.join()
+    assert thread_connections[0] is not db_conn
+
+    # read-only connections see committed writes, but cannot write
+    read_only_connections = SQLiteConnectionPool(db_filepath=tempfile_path, read_only=True)
+    read_only_conn = read_only_connections.get()
+    with db_conn:
+        db_conn.execute('INSERT INTO test VALUES (2)')
+    assert read_only_conn.execute('SELECT value FROM test ORDER BY value').fetchall() == [(1, ), (2, )]
+    with pytest.raises(sqlite3.OperationalError):
+        read_only_conn.execute('INSERT INTO test VALUES (3)')
+
+    # re-opened once the database file is replaced
+    connections.close()
+    os.remove(tempfile_path)
+    with connections.get() as db_conn:
+        db_conn.execute('CREATE TABLE test (value int)')
+    assert read_only_connections.get() is not read_only_conn
+    assert read_only_connections.get().execute('SELECT value FROM test').fetchall() == []
+    read_only_connections.close()
+    connections.close()
@@ -0,0 +1,182 @@
+import os
+from unittest.mock import MagicMock
+
+from influxdb.exceptions import InfluxDBServerError
+
+from monitor.storage import TimeSeriesStorage
+from monitor.writer import ChangeTracker, MeasurementWriter
+
+
+def create_lines(num_lines, offset=0):
+    return [f'crawler_node_info,staker_address=0x{i} stake=1.0 {i}' for i in range(offset, offset + num_lines)]
+
+
+def get_written_lines(storage):
+    written_lines = list()
+    for call in storage.write.call_args_list:
+        written_lines.extend(call[0][0])
+    return written_lines
+
+
+def test_writer_batched_writes(tmpdir):
+    storage = MagicMock(spec=TimeSeriesStorage)
+    writer = MeasurementWriter(storage=storage,
+                               spool_filepath=os.path.join(tmpdir, 'spool.lp'),
+                               batch_size=10)
+
+    lines = create_lines(25)
+    assert writer.write(lines)
+    assert writer.stats['queue_size'] == 1
+
+    writer.flush()
+    assert storage.write.call_count == 3  # batches of 10, 10, 5
+    assert get_written_lines(storage) == lines
+    stats = writer.stats
+    assert stats['written'] == len(lines)
+    assert stats['queue_size'] == 0
+    assert not stats['spool_pending']
+
+
+def test_writer_spool_and_replay(tmpdir):
+    spool_filepath = os.path.join(tmpdir, 'spool.lp')
+    storage = MagicMock(spec=TimeSeriesStorage)
+    writer = MeasurementWriter(storage=storage,
+                               spool_filepath=spool_filepath,
+                               batch_size=10)
+    writer.MIN_BACKOFF = 0  # retry immediately
+
+    # database unavailable - points spooled to disk
+    storage.write.side_effect = InfluxDBServerError('unavailable')
+    first_lines = create_lines(15)
+    writer.write(first_lines)
+    writer.flush()
+    assert os.path.exists(spool_filepath)
+    with open(spool_filepath, 'r') as spool_file:
+        assert spool_file.read().splitlines() == first_lines
+    assert writer.stats['spooled'] == len(first_lines)
+    assert writer.stats['written'] == 0
+
+    # database available again - spooled points written first, then new points
+    storage.write.reset_mock()
+    storage.write.side_effect = None
+    second_lines = create_lines(5, offset=len(first_lines))
+    writer.write(second_lines)
+    writer.flush()
+    assert not os.path.exists(spool_filepath)
+    assert get_written_lines(storage) == first_lines + second_lines
+    assert writer.stats['replayed'] == len(first_lines)
+
+
+def test_writer_partial_replay_keeps_remaining_points(tmpdir):
+    spool_filepath = os.path.join(tmpdir, 'spool.lp')
+    storage = MagicMock(spec=TimeSeriesStorage)
+    writer = MeasurementWriter(storage=storage,
+                               spool_filepath=spool_filepath,
+                               batch_size=10)
+
+    lines = create_lines(25)
+    writer._spool(lines)
+
+    # first batch succeeds, second fails
+    storage.write.side_effect = [None, InfluxDBServerError('unavailable')]
+    assert not writer._replay_spool()
+    with open(spool_filepath, 'r') as spool_file:
+        assert spool_file.read().splitlines() == lines[10:]
+
+
+def test_writer_retains_points_that_cannot_be_spooled(tmpdir):
+    # spool file cannot be created since its parent directory is a file
+    not_a_directory = os.path.join(tmpdir, 'not-a-directory')
+    open(not_a_directory, 'w').close()
+    storage = MagicMock(spec=TimeSeriesStorage)
+    writer = MeasurementWriter(storage=storage,
+                               spool_filepath=os.path.join(not_a_directory, 'spool.lp'),
+                               batch_size=10)
+    writer.MIN_BACKOFF = 0  # retry immediately
+    writer.MAX_RETAINED_POINTS = 10
+
+    # database unavailable and spooling fails - points kept in memory, oldest beyond the limit dropped
+    storage.write.side_effect = InfluxDBServerError('unavailable')
+    first_lines = create_lines(15)
+    assert writer.write(first_lines)
+    writer.flush()
+    stats = writer.stats
+    assert stats['spooled'] == 0
+    assert stats['retained'] == 10
+    assert stats['dropped'] == 5
+
+    # database available again - retained points written ahead of new points
+    storage.write.reset_mock()
+    storage.write.side_effect = None
+    second_lines = create_lines(5, offset=len(first_lines))
+    writer.write(second_lines)
+    writer.flush()
+    assert get_written_lines(storage) == first_lines[5:] + second_lines
+    stats = writer.stats
+    assert stats['retained'] == 0
+    assert stats['dropped'] == 5
+
+
+def test_writer_queue_full_spools(tmpdir):
+    spool_filepath = os.path.join(tmpdir, 'spool.lp')
+    storage = MagicMock(spec=TimeSeriesStorage)
+    writer = MeasurementWriter(storage=storage,
+                               spool_filepath=spool_filepath,
+                               queue_size=1,
+                               enqueue_timeout=0.01)
+
+    first_lines = create_lines(5)
+    second_lines = create_lines(5, offset=5)
+    assert writer.write(first_lines)
+    assert writer.write(second_lines)  # queue full - spooled instead
+    with open(spool_filepath, 'r') as spool_file:
+        assert spool_file.read().splitlines() == second_lines
+
+    # spooled points are replayed ahead of queued points
+    writer.flush()
+    assert get_written_lines(storage) == second_lines + first_lines
+    assert not os.path.exists(spool_filepath)
+
+
+def test_writer_thread_stop_flushes_queue(tmpdir):
+    storage = MagicMock(spec=TimeSeriesStorage)
+    writer = MeasurementWriter(storage=storage,
+                               spool_filepath=os.path.join(tmpdir, 'spool.lp'),
+                               flush_interval=0.01)
+    writer.start()
+    assert writer.is_running
+
+    lines = create_lines(20)
+    writer.write(lines)
+    writer.stop(timeout=5)
+    assert not writer.is_running
+    assert get_written_lines(storage) == lines
+
+
+def test_change_tracker_writes_changes_and_keyframes():
+    tracker = ChangeTracker(keyframe_interval=100)
+
+    # first point for a series is always written
+    assert tracker.should_write('0xA', (1.0, 2), timestamp=110)
+    tracker.written('0xA', (1.0, 2), timestamp=110)
+
+    # unchanged within the keyframe interval
+    assert not tracker.should_write('0xA', (1.0, 2), timestamp=150)
+    assert not tracker.should_write('0xA', (1.0, 2), timestamp=199)
+
+    # changed values
+    assert tracker.should_write('0xA', (1.5, 2), timestamp=160)
+
+    # unchanged, but first point in the next keyframe interval
+    assert tracker.should_write('0xA', (1.0, 2), timestamp=200)
+
+    # values not recorded as written are written again
+    assert tracker.should_write('0xA', (1.0, 2), timestamp=200)
+    tracker.written('0xA', (1.0, 2), timestamp=200)
+    assert not tracker.should_write('0xA', (1.0, 2), timestamp=210)
+
+    stats = tracker.stats
+    assert stats['series'] == 1
+    assert stats['changed'] == 2
+    assert stats['keyframes'] == 2
+    assert stats['unchanged'] == 3
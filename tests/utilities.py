@@ -10,8 +10,14 @@ from nucypher.acumen.nicknames import Nickname
 from nucypher.blockchain.eth.agents import StakingEscrowAgent
 from nucypher.blockchain.eth.constants import NULL_ADDRESS
 from nucypher.blockchain.eth.registry import BaseContractRegistry
+from nucypher.characters.lawful import Ursula
 from nucypher.crypto.keypairs import HostingKeypair
 from nucypher.network.nodes import Teacher
+from umbral.keys import UmbralPrivateKey
+from umbral.signing import Signer
+
+from monitor.crawler import Crawler
+from monitor.utils import escape_field_string
 
 COLORS = ['red', 'green', 'yellow', 'blue', 'black', 'brown', 'purple']
 
@@ -82,6 +88,26 @@ def create_specific_mock_node(generate_certificate: bool = False,
     return node
 
 
+def create_serializable_mock_node(host: str = '127.0.0.1'):
+    """Mock node whose bytes and certificate are those of a node with the same address and host."""
+    node = create_specific_mock_node(generate_certificate=True, checksum_address=create_eth_address(), host=host)
+
+    Teacher.set_federated_mode(False)
+    signing_key = UmbralPrivateKey.gen_key()
+    ursula = Ursula.from_public_keys(verifying_key=signing_key.get_pubkey(),
+                                     encrypting_key=UmbralPrivateKey.gen_key().get_pubkey(),
+                                     rest_host=host,
+                                     rest_port=9151,
+                                     checksum_address=node.checksum_address,
+                                     timestamp=node.timestamp,
+                                     certificate=node.certificate,
+                                     interface_signature=Signer(signing_key)(b'interface'),
+                                     decentralized_identity_evidence=b'')
+    node_bytes = bytes(ursula)
+    type(node).__bytes__ = lambda self: node_bytes  # each mock has its own class
+    return node
+
+
 def create_random_mock_state(seed=None):
     updated = maya.now().subtract(minutes=(random.randrange(0, 59)))
     return create_specific_mock_state(nickname=Nickname.from_seed(seed=seed), updated=updated)
@@ -96,6 +122,44 @@ def create_specific_mock_state(nickname: Nickname = Nickname.from_seed(seed=None
     return state
 
 
+def create_node_info_line(staker_address: str, timestamp: int, locked_stake: float, stake: float = None):
+    stake = locked_stake if stake is None else stake
+    return Crawler.NODE_LINE_PROTOCOL.format(measurement=Crawler.NODE_MEASUREMENT,
+                                             staker_address=staker_address,
+                                             worker_address=NULL_ADDRESS,
+                                             start_date=timestamp - 86400,
+                                             end_date=timestamp + 86400,
+                                             stake=stake,
+                                             locked_stake=locked_stake,
+                                             current_period=1,
+                                             last_confirmed_period=1,
+                                             timestamp=timestamp)
+
+
+def create_network_info_line(timestamp: int, locked_stake: float, num_stakers: int, known_nodes: int = None):
+    return Crawler.NETWORK_LINE_PROTOCOL.format(measurement=Crawler.NETWORK_MEASUREMENT,
+                                                locked_stake=locked_stake,
+                                                num_stakers=num_stakers,
+                                                active_stakers=num_stakers,
+                                                pending_stakers=0,
+                                                inactive_stakers=0,
+                                                known_nodes=num_stakers if known_nodes is None else known_nodes,
+                                                timestamp=timestamp)
+
+
+def create_event_line(txhash: str, timestamp: int, block_number: int, event_name: str = 'Slashed', args: str = '',
+                      log_index: int = 0):
+    return Crawler.EVENT_LINE_PROTOCOL.format(measurement=Crawler.EVENT_MEASUREMENT,
+                                              contract_name='StakingEscrow',
+                                              event_name=event_name,
+                                              log_index=log_index,
+                                              txhash=txhash,
+                                              contract_address=NULL_ADDRESS,
+                                              block_number=block_number,
+                                              args=escape_field_string(args),
+                                              timestamp=timestamp)
+
+
 class MockContractAgency:
     def __init__(self, staking_agent=MagicMock(spec=StakingEscrowAgent)):
         self.staking_agent = staking_agent